@@ -0,0 +1,278 @@
+"""Cross, trend and volume alerts over a ticker universe.
+
+analyze() turns the golden/dead-cross, trend and volume rules into report text
+for one ticker. scan() evaluates the same signals.py rules for every ticker of
+a (tickers x bars) matrix in one vectorized pass and reports only what changed
+since the last scan, as a compact event list:
+
+    MSFT MA50/MA200 golden cross on 2026-10-16
+    PLTR trend 상승 -> 강한 상승 on 2026-10-16
+    AAPL volume surge (2.13x VolumeMA20) on 2026-10-16
+
+Per ticker, the states of the previous scan (trend code, which side of MA50 the
+MA20 is on and of MA200 the MA50 is on, volume code and bar timestamp) are kept
+by AlertStateStore. A cross is reported when the side flipped since then, dated
+at the bar where the MAs last crossed; a trend when its code changed; volume when
+it entered the surge (>1.5x VolumeMA20), active (>1.1x) or low (<0.7x) state.
+Tickers the store doesn't know yet are compared with their previous bar, so a
+first scan reports what happened on the latest bar, like analyze() does.
+
+    python analysis-code/alert_scanner.py --tickers-file tickers.txt
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) # Add repo root to path
+from data_api import ApiClient
+
+from analysis_pipeline import fetch_chart_raw
+from cross_section import build_bar_matrix, rolling_mean
+from output_writer import write_bytes
+from resample import INTERVALS, RANGES, resample_chart, source_interval
+from response_cache import ResponseCache, CachedApiClient, DEFAULT_CACHE_PATH
+from signals import (
+    CROSS_ABOVE, CROSS_BELOW, CROSS_NO_DATA, TREND_LABELS, TREND_NO_DATA,
+    VOLUME_ACTIVE, VOLUME_LOW, VOLUME_NO_DATA, VOLUME_SURGE, trend_codes, volume_codes,
+)
+from stock_analyzer import load_tickers
+
+DEFAULT_ALERT_STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "alert_state")
+
+# MA pairs whose crosses are reported: (state key, fast window, slow window, bars required)
+CROSS_PAIRS = (("short_cross", 20, 50, 50), ("long_cross", 50, 200, 200))
+# Volume states that raise an alert when entered (going back to normal doesn't)
+VOLUME_EVENTS = {VOLUME_SURGE: "surge", VOLUME_ACTIVE: "active", VOLUME_LOW: "low"}
+
+
+def _side_codes(fast, slow, has_enough_data):
+    """CROSS_ABOVE/CROSS_BELOW for the fast MA against the slow one, CROSS_NO_DATA without enough bars."""
+    return np.where(has_enough_data, np.where(fast > slow, CROSS_ABOVE, CROSS_BELOW), CROSS_NO_DATA)
+
+def _window_mean(values, window, end):
+    """Mean of the non-NaN values in columns end-window+1..end per row, like rolling_mean() at column end."""
+    block = values[:, max(0, end - window + 1):end + 1]
+    valid = ~np.isnan(block)
+    count = valid.sum(axis=1)
+    total = np.where(valid, block, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+def _last_cross_index(fast, slow):
+    """Column of the most recent bar at which fast and slow changed sides (per row, -1 if they never did)."""
+    above = fast > slow
+    flips = above[:, 1:] != above[:, :-1]
+    # NaN (not yet defined) MAs compare as "below"; a flip out of them isn't a cross
+    flips &= ~(np.isnan(fast[:, :-1]) | np.isnan(slow[:, :-1]))
+    if flips.shape[1] == 0:
+        return np.full(len(fast), -1, dtype=np.int64)
+    last = flips.shape[1] - 1 - np.argmax(flips[:, ::-1], axis=1)
+    return np.where(flips.any(axis=1), last + 1, -1)
+
+def scan(tickers, timestamps, close, volume, previous=None):
+    """Evaluates the alert rules for every row of right-aligned bar matrices (see cross_section.build_bar_matrix).
+
+    previous maps tickers to their states from the last scan ({} or None for a first scan).
+    Returns (events, states): the events as dicts, sorted by time, and the new state of
+    every ticker that has bars.
+    """
+    previous = previous or {}
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    n_bars = close.shape[1]
+    if not n_bars:
+        return [], {}
+    bar_count = np.sum(~np.isnan(close), axis=1)
+    # Latest and previous column (histories are right-aligned; NaN where a row is too short)
+    last = n_bars - 1
+    prev = max(n_bars - 2, 0)
+    has_prev = bar_count >= 2
+    # Only the MAs of these two bars are needed for the states (full series only for the crossed rows below)
+    ma = {(w, column): _window_mean(close, w, column) for w in (20, 50, 200) for column in (last, prev)}
+    volume_ma = {column: _window_mean(volume, 20, column) for column in (last, prev)}
+
+    codes = {
+        "trend": np.where(bar_count > 0, trend_codes(close[:, last], ma[20, last], ma[50, last], ma[200, last]), TREND_NO_DATA),
+        "volume": np.where(bar_count > 0, volume_codes(volume[:, last], volume_ma[last]), VOLUME_NO_DATA),
+    }
+    prev_codes = {
+        "trend": np.where(has_prev, trend_codes(close[:, prev], ma[20, prev], ma[50, prev], ma[200, prev]), TREND_NO_DATA),
+        "volume": np.where(has_prev, volume_codes(volume[:, prev], volume_ma[prev]), VOLUME_NO_DATA),
+    }
+    for key, fast, slow, min_bars in CROSS_PAIRS:
+        codes[key] = _side_codes(ma[fast, last], ma[slow, last], bar_count >= min_bars)
+        # As in analyze(): the previous bar's side counts once the latest bar has enough data
+        prev_codes[key] = _side_codes(ma[fast, prev], ma[slow, prev], has_prev & (bar_count >= min_bars))
+
+    # States of the last scan replace the previous bar's for the tickers the store knows
+    known = np.array([ticker in previous for ticker in tickers], dtype=bool)
+    if known.any():
+        for key in prev_codes:
+            stored = np.array([previous[ticker][key] if ticker in previous else 0 for ticker in tickers], dtype=np.int64)
+            prev_codes[key] = np.where(known, stored, prev_codes[key])
+
+    events = []
+    latest_timestamps = timestamps[:, last]
+    for key, fast, slow, _ in CROSS_PAIRS:
+        flipped = (codes[key] != prev_codes[key]) & (codes[key] != CROSS_NO_DATA) & (prev_codes[key] != CROSS_NO_DATA)
+        rows = np.flatnonzero(flipped)
+        if not len(rows):
+            continue
+        cross_at = _last_cross_index(rolling_mean(close[rows], fast), rolling_mean(close[rows], slow))
+        above = codes[key][rows] == CROSS_ABOVE
+        for row, column, is_above in zip(rows.tolist(), cross_at.tolist(), above.tolist()):
+            events.append({
+                "ticker": tickers[row],
+                # Bars revised since the last scan may leave no crossing bar; the latest one is used then
+                "timestamp": int(timestamps[row, column if column >= 0 else last]),
+                "type": "golden_cross" if is_above else "dead_cross",
+                "pair": f"MA{fast}/MA{slow}",
+            })
+    trend_changed = (codes["trend"] != prev_codes["trend"]) & (codes["trend"] != TREND_NO_DATA) & (prev_codes["trend"] != TREND_NO_DATA)
+    for row in np.flatnonzero(trend_changed).tolist():
+        events.append({
+            "ticker": tickers[row],
+            "timestamp": int(latest_timestamps[row]),
+            "type": "trend",
+            "from": TREND_LABELS[int(prev_codes["trend"][row])],
+            "to": TREND_LABELS[int(codes["trend"][row])],
+        })
+    volume_entered = (codes["volume"] != prev_codes["volume"]) & np.isin(codes["volume"], list(VOLUME_EVENTS))
+    for row in np.flatnonzero(volume_entered).tolist():
+        events.append({
+            "ticker": tickers[row],
+            "timestamp": int(latest_timestamps[row]),
+            "type": "volume",
+            "state": VOLUME_EVENTS[int(codes["volume"][row])],
+            "ratio": round(float(volume[row, last] / volume_ma[last][row]), 2),
+        })
+    events.sort(key=lambda event: (event["timestamp"], event["ticker"]))
+
+    states = {}
+    rows = np.flatnonzero(bar_count > 0).tolist()
+    columns = {key: values.tolist() for key, values in codes.items()}
+    latest = latest_timestamps.tolist()
+    for row in rows:
+        state = {key: columns[key][row] for key in columns}
+        state["timestamp"] = latest[row]
+        states[tickers[row]] = state
+    return events, states
+
+def format_event(event, utc_offset=0):
+    """One line of text for an event ("MSFT MA50/MA200 golden cross on 2026-10-16")."""
+    date = time.strftime("%Y-%m-%d", time.gmtime(event["timestamp"] + utc_offset))
+    if event["type"] in ("golden_cross", "dead_cross"):
+        what = f"{event['pair']} {event['type'].replace('_', ' ')}"
+    elif event["type"] == "trend":
+        what = f"trend {event['from']} -> {event['to']}"
+    else:
+        what = f"volume {event['state']} ({event['ratio']:.2f}x VolumeMA20)"
+    return f"{event['ticker']} {what} on {date}"
+
+
+class AlertStateStore:
+    """Persists the per-ticker states of the last scan as one JSON file per interval."""
+
+    def __init__(self, directory=DEFAULT_ALERT_STATE_DIR):
+        self.directory = directory
+
+    def _path(self, interval):
+        return os.path.join(self.directory, f"{interval}.json")
+
+    def load(self, interval="1d"):
+        """The stored states ({ticker: state}), or {} before the first scan."""
+        try:
+            with open(self._path(interval), "r", encoding="utf-8") as f:
+                return json.load(f)["tickers"]
+        except FileNotFoundError:
+            return {}
+
+    def save(self, states, interval="1d"):
+        """Merges the states of a scan into the stored ones (tickers not scanned keep theirs)."""
+        merged = self.load(interval)
+        merged.update(states)
+        os.makedirs(self.directory, exist_ok=True)
+        data = {"scanned_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "tickers": merged}
+        write_bytes(self._path(interval), json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+
+
+# --- Command line ---
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Scan a ticker universe for MA cross, trend and volume alerts")
+    ticker_group = parser.add_mutually_exclusive_group(required=True)
+    ticker_group.add_argument("--ticker", help="Stock ticker symbol (e.g., AAPL, PLTR)")
+    ticker_group.add_argument("--tickers", help="Comma-separated ticker symbols (e.g., AAPL,MSFT,PLTR)")
+    ticker_group.add_argument("--tickers-file", help="File with one ticker symbol per line ('#' starts a comment)")
+    parser.add_argument("--interval", choices=INTERVALS, default="1d", help="Bar interval (default: 1d)")
+    parser.add_argument("--range", dest="range_str", choices=RANGES, default="1y", help="How far back the bars go (default: 1y; MA200 needs 200 bars)")
+    parser.add_argument("--fetch-workers", type=int, default=16, help="Number of threads fetching charts (default: 16)")
+    parser.add_argument("--state-dir", default=DEFAULT_ALERT_STATE_DIR, help="Directory keeping the states of the last scan")
+    parser.add_argument("--reset", action="store_true", help="Ignore the stored states (report only what happened on the latest bar)")
+    parser.add_argument("--dry-run", action="store_true", help="Don't update the stored states")
+    parser.add_argument("--output", default=None, help="Also write the events to this JSON lines file")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk API response cache entirely")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="SQLite file for the API response cache")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the dummy ApiClient (same seed = identical payloads)")
+    return parser.parse_args()
+
+def fetch_charts(api_client, tickers, interval="1d", range_str="1y", workers=16):
+    """Fetches (and if needed resamples) the charts of many tickers; returns {ticker: payload} in ticker order."""
+    fetch_interval = source_interval(interval)
+    charts = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_chart_raw, api_client, ticker, fetch_interval, range_str): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                _, payload = future.result()
+            except Exception as e:
+                print(f"[alerts] {ticker}: {e}")
+                continue
+            if not payload or not payload.get("chart", {}).get("result"):
+                print(f"[alerts] {ticker}: chart data is missing or invalid")
+                continue
+            charts[ticker] = resample_chart(payload, interval) if fetch_interval != interval else payload
+    return {ticker: charts[ticker] for ticker in tickers if ticker in charts}
+
+def main():
+    args = parse_arguments()
+    try:
+        tickers = load_tickers(args)
+    except OSError as e:
+        print(f"Error reading tickers file: {e}")
+        sys.exit(1)
+    api_client = ApiClient(seed=args.seed)
+    if not args.no_cache:
+        api_client = CachedApiClient(api_client, ResponseCache(args.cache_path))
+
+    start = time.perf_counter()
+    charts = fetch_charts(api_client, tickers, args.interval, args.range_str, workers=args.fetch_workers)
+    fetched = time.perf_counter()
+    store = AlertStateStore(args.state_dir)
+    previous = {} if args.reset else store.load(args.interval)
+    names, timestamps, close, volume = build_bar_matrix(charts)
+    events, states = scan(names, timestamps, close, volume, previous)
+    scanned = time.perf_counter()
+
+    offsets = {ticker: payload["chart"]["result"][0].get("meta", {}).get("gmtoffset") or 0 for ticker, payload in charts.items()}
+    for event in events:
+        print(format_event(event, offsets.get(event["ticker"], 0)))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    if not args.dry_run:
+        store.save(states, args.interval)
+    print(f"Scanned {len(names)}/{len(tickers)} tickers ({close.size:,} bar slots) in {scanned - fetched:.3f}s after {fetched - start:.2f}s of fetching: {len(events)} events"
+          + ("" if previous or args.reset else " (first scan)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,788 @@
+"""Reusable stock analysis pipeline.
+
+The analysis is split into stages that callers can run or skip independently:
+
+- fetch(): get the chart, insights and holders payloads of a ticker from an ApiClient
+- analyze(): turn the payloads into the analysis result (pure computation, no I/O)
+- render_chart(), save_chart_data(), save_result_json(), save_technical_indicators(), save_raw_payloads():
+  persist the outputs the front end reads (matplotlib is only loaded by render_chart)
+- archive_payloads(): keep the raw payloads in the compressed payload archive (payload_archive.py)
+
+Outputs are written atomically and left untouched when unchanged (see output_writer.py).
+No stage prints or exits. Fatal problems raise TickerAnalysisError and degraded
+inputs are reported in `warnings`, so a long-lived worker can analyze many
+tickers in one process. stock_analyzer.py is the command-line front end.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+# pandas, numpy and matplotlib are imported inside the stages that use them, so importing
+# this module (or running a JSON-only analysis) doesn't pay for the ones it never needs.
+from bar_store import fetch_chart_incremental
+# chart_renderer imports matplotlib only when the first chart is drawn; its options,
+# template and matplotlib setup are re-exported for callers of this module
+import chart_renderer
+from chart_renderer import ChartOptions, chart_template, configure_matplotlib # noqa: F401
+from chart_data import build_chart_payload, DEFAULT_MAX_POINTS
+from chart_stream import decode_chart
+from indicator_engine import MA_WINDOWS
+from indicator_output import INDICATOR_EXTENSIONS, write_indicators, write_indicator_dataset
+from price_store import PriceSlice
+from output_writer import atomic_path, bars_fingerprint, write_bytes
+from resample import resample_chart, source_interval
+from metrics import incr, span, timed
+
+# Seconds each API call may take before it is abandoned (applies to the three calls of a ticker in parallel)
+DEFAULT_FETCH_TIMEOUT = 30.0
+
+# Columns written to *_technical_indicators.csv
+TECHNICAL_INDICATOR_COLUMNS = ["RSI", "Upper_BB", "Lower_BB", "MACD", "Signal_Line", "MA20_BB", "close"]
+
+
+class TickerAnalysisError(Exception):
+    """Raised when a ticker cannot be analyzed (e.g. its chart data is missing)."""
+    pass
+
+
+class FetchedData:
+    """Raw API payloads of one ticker, as returned by fetch().
+
+    `raw_chart` is the chart response body (JSON bytes) when it was fetched undecoded;
+    `chart` is then the chart_stream.decode_chart() payload with NumPy bar arrays.
+    For derived intervals (see resample.py) `chart` holds the resampled bars and
+    `source_chart` the payload fetched at `fetch_interval`; otherwise both are the same.
+    `indicator_snapshot` is the persisted IndicatorState snapshot after the chart's bars
+    (incremental fetches only; see indicator_engine.py), which analyze() can take the
+    latest-bar indicators from.
+    """
+
+    def __init__(self, ticker, chart, insights, holders, warnings=None, raw_chart=None, interval="1d", range_str="1y", source_chart=None, indicator_snapshot=None):
+        self.ticker = ticker
+        self.chart = chart
+        self.insights = insights
+        self.holders = holders
+        self.warnings = warnings or []
+        self.raw_chart = raw_chart
+        self.interval = interval
+        self.range_str = range_str
+        self.fetch_interval = source_interval(interval)
+        self.source_chart = source_chart if source_chart is not None else chart
+        self.indicator_snapshot = indicator_snapshot
+
+
+class AnalysisResult:
+    """Output of analyze().
+
+    `result` is the JSON document the front end reads; `price_frame` is the OHLCV
+    DataFrame (with MA20/50/200 and VolumeMA20 columns) the chart and CSV stages use.
+    When analyze() took the latest values from an indicator snapshot, those columns are
+    only computed once a stage reads price_frame.
+    """
+
+    def __init__(self, ticker, result, price_frame, warnings=None):
+        self.ticker = ticker
+        self.result = result
+        self._price_frame = price_frame
+        self.warnings = warnings or []
+        self._technical_indicators = None
+
+    @property
+    def price_frame(self):
+        if not self._price_frame.empty and "MA20" not in self._price_frame.columns:
+            add_moving_averages(self._price_frame)
+        return self._price_frame
+
+    @property
+    def has_price_data(self):
+        return not self._price_frame.empty
+
+    def technical_indicators(self):
+        """RSI, Bollinger Bands and MACD over the whole price history (computed once)."""
+        if self._technical_indicators is None:
+            with span("indicators", ticker=self.ticker):
+                self._technical_indicators = compute_technical_indicators(self.price_frame)
+        return self._technical_indicators
+
+
+# --- Stage 1: Fetch ---
+
+def _await_fetch(future, deadline):
+    """Waits for a fetch future until its deadline; raises TimeoutError once the deadline has passed."""
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FuturesTimeoutError:
+        future.cancel()
+        raise TimeoutError("request timed out")
+
+def _timed_fetch(endpoint, ticker, func, /, *args, **kwargs):
+    """Runs one API call inside a "fetch" span labelled with its endpoint."""
+    with span("fetch", ticker=ticker, endpoint=endpoint):
+        return func(*args, **kwargs)
+
+def fetch_chart_raw(api_client, ticker, interval="1d", range_str="1y"):
+    """Fetches the chart response body and stream-decodes it. Returns (raw bytes, payload)."""
+    raw = api_client.get_stock_chart_raw(ticker=ticker, interval=interval, range=range_str)
+    if not raw:
+        return raw, None
+    return raw, decode_chart(raw)
+
+def fetch(api_client, ticker, timeout=DEFAULT_FETCH_TIMEOUT, bar_store=None, indicator_store=None, interval="1d", range_str="1y"):
+    """Fetches chart, insights and holders data for a ticker.
+
+    The three requests are independent, so they are issued concurrently and each one is
+    given `timeout` seconds; wall time is roughly that of the slowest call.
+    interval/range_str select the chart bars (1 year of daily bars by default); weekly,
+    monthly and some intraday intervals are resampled from a finer fetch (see resample.py).
+    With a bar_store, only the chart bars missing since the last run are requested
+    (and the rolling indicator state in indicator_store, if given, is advanced with them).
+    Raises TickerAnalysisError if the chart data (critical) cannot be fetched.
+    Insights/holders failures only degrade the result: they come back as empty dicts
+    and are described in the returned FetchedData.warnings.
+    Clients with get_stock_chart_raw() have the chart decoded straight into NumPy bar
+    arrays (see chart_stream.py), and the response body is kept for save_raw_payloads().
+    """
+    warnings = []
+    raw_chart = None
+    indicator_snapshot = None
+    decode_raw = bar_store is None and hasattr(api_client, "get_stock_chart_raw")
+    requested_interval, interval = interval, source_interval(interval)
+    fetch_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix=f"fetch-{ticker}")
+    try:
+        # The analysis defaults to 1 year of daily bars
+        if bar_store is not None:
+            chart_future = fetch_pool.submit(_timed_fetch, "chart", ticker, fetch_chart_incremental, api_client, bar_store, ticker, interval=interval, range_str=range_str, indicator_store=indicator_store)
+        elif decode_raw:
+            chart_future = fetch_pool.submit(_timed_fetch, "chart", ticker, fetch_chart_raw, api_client, ticker, interval=interval, range_str=range_str)
+        else:
+            chart_future = fetch_pool.submit(_timed_fetch, "chart", ticker, api_client.get_stock_chart, ticker=ticker, interval=interval, range=range_str)
+        insights_future = fetch_pool.submit(_timed_fetch, "insights", ticker, api_client.get_stock_insights, ticker=ticker)
+        holders_future = fetch_pool.submit(_timed_fetch, "holders", ticker, api_client.get_stock_holders, ticker=ticker)
+        deadline = time.monotonic() + timeout
+
+        # Stock Chart Data (critical)
+        try:
+            if decode_raw:
+                raw_chart, stock_data_json = _await_fetch(chart_future, deadline)
+            elif bar_store is not None:
+                stock_data_json, indicator_snapshot = _await_fetch(chart_future, deadline)
+            else:
+                stock_data_json = _await_fetch(chart_future, deadline)
+        except Exception as e:
+            raise TickerAnalysisError(f"Error fetching stock chart data for {ticker}: {e}") from e
+        if not stock_data_json or "chart" not in stock_data_json or not stock_data_json["chart"]["result"]:
+            raise TickerAnalysisError(f"Error: Stock chart data for {ticker} is missing or invalid.")
+        source_chart = stock_data_json
+        if interval != requested_interval:
+            with span("resample", ticker=ticker, interval=requested_interval):
+                stock_data_json = resample_chart(source_chart, requested_interval)
+            # The indicator state follows the source bars, not the resampled ones
+            indicator_snapshot = None
+
+        # Stock Insights Data
+        try:
+            stock_insights_json = _await_fetch(insights_future, deadline)
+            if not stock_insights_json or "finance" not in stock_insights_json or not stock_insights_json["finance"]["result"]:
+                warnings.append(f"Warning: Stock insights data for {ticker} is missing or invalid. Some analysis parts might be affected.")
+        except Exception as e:
+            warnings.append(f"Error fetching stock insights data for {ticker}: {e}")
+            stock_insights_json = {} # Ensure it's an empty dict to avoid None errors later
+
+        # Stock Holders Data
+        try:
+            stock_holders_json = _await_fetch(holders_future, deadline)
+            if not stock_holders_json or "finance" not in stock_holders_json or not stock_holders_json["finance"]["result"]:
+                warnings.append(f"Warning: Stock holders data for {ticker} is missing or invalid. Some analysis parts might be affected.")
+        except Exception as e:
+            warnings.append(f"Error fetching stock holders data for {ticker}: {e}")
+            stock_holders_json = {} # Ensure it's an empty dict
+    finally:
+        # Don't block on calls that already timed out; their threads finish in the background.
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+
+    return FetchedData(ticker, stock_data_json, stock_insights_json, stock_holders_json, warnings, raw_chart=raw_chart, interval=requested_interval, range_str=range_str, source_chart=source_chart, indicator_snapshot=indicator_snapshot)
+
+
+# --- Stage 2: Compute ---
+
+def build_price_frame(stock_data_json):
+    """Builds the OHLCV DataFrame from a chart payload or a price_store.PriceSlice. Returns (meta, df, warnings)."""
+    import pandas as pd
+
+    if isinstance(stock_data_json, PriceSlice):
+        # Bars already decoded into the shared memory-mapped store
+        if stock_data_json.length:
+            warnings = []
+        elif stock_data_json.meta:
+            warnings = ["Error: Timestamps or OHLCV data is missing in stock_data_json. Cannot proceed with price/MA analysis."]
+        else:
+            warnings = ["Error: Critical stock chart data is missing. Analysis will be incomplete."]
+        return stock_data_json.meta, stock_data_json.frame(), warnings
+
+    warnings = []
+    meta = {}
+    df = pd.DataFrame()
+
+    if stock_data_json and stock_data_json.get("chart", {}).get("result"):
+        chart_result = stock_data_json["chart"]["result"][0]
+        meta = chart_result.get("meta", {})
+        
+        timestamps = chart_result.get("timestamp")
+        ohlcv = chart_result.get("indicators", {}).get("quote", [{}])[0]
+
+        # Lists from json.loads() or NumPy arrays from chart_stream.decode_chart()
+        if timestamps is not None and len(timestamps) and ohlcv:
+            df = pd.DataFrame({
+                "timestamp": pd.to_datetime(timestamps, unit="s"),
+                "open": ohlcv.get("open"),
+                "high": ohlcv.get("high"),
+                "low": ohlcv.get("low"),
+                "close": ohlcv.get("close"),
+                "volume": ohlcv.get("volume")
+            })
+            df.set_index("timestamp", inplace=True)
+            df.dropna(subset=["close", "volume"], inplace=True) # Ensure essential data is present
+        else:
+            warnings.append("Error: Timestamps or OHLCV data is missing in stock_data_json. Cannot proceed with price/MA analysis.")
+            # If df is empty, subsequent operations will fail or produce empty results.
+            # This should be handled gracefully by checks like `if not df.empty:`.
+    else:
+        warnings.append("Error: Critical stock chart data is missing. Analysis will be incomplete.")
+
+    return meta, df, warnings
+
+def add_moving_averages(df):
+    """Adds the MA20/MA50/MA200 and VolumeMA20 columns (min_periods=1) to a price frame in place."""
+    df["MA20"] = df["close"].rolling(window=20, min_periods=1).mean()
+    df["MA50"] = df["close"].rolling(window=50, min_periods=1).mean()
+    df["MA200"] = df["close"].rolling(window=200, min_periods=1).mean()
+    if "volume" in df.columns:
+        df["VolumeMA20"] = df["volume"].rolling(window=20, min_periods=1).mean()
+
+def _snapshot_matches(snapshot, df):
+    """True if an IndicatorState snapshot describes the last bar of df with the same MA windows."""
+    if not snapshot or not snapshot.get("count") or df.empty:
+        return False
+    if snapshot["timestamp"] != df.index[-1].value // 10**9:
+        return False
+    if snapshot["close"] != df["close"].iloc[-1] or snapshot["volume"] != df["volume"].iloc[-1]:
+        return False
+    # The state may hold more history than the loaded range; past 200 bars (plus the
+    # previous bar for the crosses) every window covers the same bars either way
+    return snapshot["count"] == len(df) or len(df) > max(MA_WINDOWS)
+
+@timed("analyze")
+def analyze(stock_data_json, stock_insights_json, stock_holders_json, ticker=None, indicator_snapshot=None):
+    """Runs the full analysis on already fetched payloads and returns an AnalysisResult.
+
+    Pure computation: nothing is written and no network access happens. The chart may
+    also be a price_store.PriceSlice. `ticker` defaults to the symbol in the chart metadata.
+    With the IndicatorState snapshot of an incremental fetch (FetchedData.indicator_snapshot),
+    the latest and previous MAs and the volume MA come from the snapshot instead of
+    rolling over the whole frame, as long as it matches the frame's last bar.
+    """
+    from signals import (
+        TREND_LABELS, SHORT_CROSS_LABELS, LONG_CROSS_LABELS,
+        SHORT_CROSS_MIN_BARS, LONG_CROSS_MIN_BARS, trend_codes, cross_codes,
+        volume_code, volume_label,
+    )
+
+    warnings = []
+    # Initialize analysis_result with default/empty values
+    analysis_result = {
+        "basic_info": {},
+        "current_price": {},
+        "technical_analysis": {},
+        "volume_analysis": {},
+        "investment_recommendation": {},
+        "key_developments": [],
+        "insider_trading": [],
+        "conclusion": {}
+    }
+
+    # Process Stock Chart Data (Primary source for price, volume, MAs)
+    meta, df, frame_warnings = build_price_frame(stock_data_json)
+    warnings.extend(frame_warnings)
+    if ticker is None:
+        ticker = meta.get("symbol", "N/A")
+
+    # Basic Info
+    analysis_result["basic_info"] = {
+        "company_name": meta.get("longName", meta.get("shortName", ticker)), # Fallback to ticker if longName not present
+        "symbol": meta.get("symbol", ticker),
+        "exchange": meta.get("fullExchangeName", meta.get("exchangeName", "N/A")),
+        "currency": meta.get("currency", "N/A")
+    }
+
+    # Current Price
+    if not df.empty:
+        latest_data = df.iloc[-1]
+        previous_data = df.iloc[-2] if len(df) >= 2 else latest_data # Handle case with only one data point
+
+        price_change = latest_data["close"] - previous_data["close"]
+        price_change_pct = (price_change / previous_data["close"]) * 100 if previous_data["close"] else 0
+
+        analysis_result["current_price"] = {
+            "price": meta.get("regularMarketPrice", latest_data["close"]), # Prefer meta, fallback to latest close
+            "week52_high": meta.get("fiftyTwoWeekHigh", df["high"].rolling(window=252, min_periods=1).max().iloc[-1] if not df.empty else None),
+            "week52_low": meta.get("fiftyTwoWeekLow", df["low"].rolling(window=252, min_periods=1).min().iloc[-1] if not df.empty else None),
+            "day_high": meta.get("regularMarketDayHigh", latest_data["high"]),
+            "day_low": meta.get("regularMarketDayLow", latest_data["low"]),
+            "volume": int(meta.get("regularMarketVolume", latest_data["volume"])), # Ensure volume is int
+            "prev_close": meta.get("regularMarketPreviousClose", previous_data["close"]),
+            "price_change": price_change,
+            "price_change_pct": price_change_pct
+        }
+    else: # df is empty, try to populate from meta if available, else N/A
+        analysis_result["current_price"] = {
+            "price": meta.get("regularMarketPrice"),
+            "week52_high": meta.get("fiftyTwoWeekHigh"),
+            "week52_low": meta.get("fiftyTwoWeekLow"),
+            "day_high": meta.get("regularMarketDayHigh"),
+            "day_low": meta.get("regularMarketDayLow"),
+            "volume": int(meta.get("regularMarketVolume", 0)),
+            "prev_close": meta.get("regularMarketPreviousClose"),
+            "price_change": None, # Cannot calculate without historical data
+            "price_change_pct": None
+        }
+
+
+    # Latest-bar MAs: from the persisted indicator state when it matches the frame,
+    # otherwise rolled over the frame (the MA columns are then there for the charts too)
+    use_snapshot = _snapshot_matches(indicator_snapshot, df)
+    if not df.empty and not use_snapshot:
+        add_moving_averages(df)
+
+    # Technical Analysis
+    if not df.empty:
+        if use_snapshot:
+            latest_ma20 = indicator_snapshot["MA20"]
+            latest_ma50 = indicator_snapshot["MA50"]
+            latest_ma200 = indicator_snapshot["MA200"]
+        else:
+            latest_ma20 = df["MA20"].iloc[-1]
+            latest_ma50 = df["MA50"].iloc[-1]
+            latest_ma200 = df["MA200"].iloc[-1]
+        latest_close = df["close"].iloc[-1]
+
+        # MA Cross Status (rules and wording live in signals.py, shared with the vectorized scanners)
+        # Golden Cross: the faster MA crosses above the slower one; Dead Cross: it crosses below
+        if use_snapshot:
+            # The state has no previous MAs before its second bar; compare the first bar with itself
+            prev_ma20 = indicator_snapshot["prev_MA20"] if indicator_snapshot["prev_MA20"] is not None else latest_ma20
+            prev_ma50 = indicator_snapshot["prev_MA50"] if indicator_snapshot["prev_MA50"] is not None else latest_ma50
+            prev_ma200 = indicator_snapshot["prev_MA200"] if indicator_snapshot["prev_MA200"] is not None else latest_ma200
+        else:
+            prev_ma20 = df["MA20"].iloc[-2] if len(df) >= 2 else latest_ma20
+            prev_ma50 = df["MA50"].iloc[-2] if len(df) >= 2 else latest_ma50
+            prev_ma200 = df["MA200"].iloc[-2] if len(df) >= 2 else latest_ma200
+        # Need enough data for MA50 (20/50 cross) and MA200 (50/200 cross)
+        ma_cross_status = SHORT_CROSS_LABELS[int(cross_codes(prev_ma20, prev_ma50, latest_ma20, latest_ma50, len(df) >= SHORT_CROSS_MIN_BARS))]
+        ma_long_cross_status = LONG_CROSS_LABELS[int(cross_codes(prev_ma50, prev_ma200, latest_ma50, latest_ma200, len(df) >= LONG_CROSS_MIN_BARS))]
+
+        # Trend (simplified based on MA positions)
+        trend = TREND_LABELS[int(trend_codes(latest_close, latest_ma20, latest_ma50, latest_ma200))]
+
+        analysis_result["technical_analysis"] = {
+            "ma_20": latest_ma20,
+            "ma_50": latest_ma50,
+            "ma_200": latest_ma200,
+            "ma_cross_status": ma_cross_status,
+            "ma_long_cross_status": ma_long_cross_status,
+            "trend": trend,
+            "support_level": None, # To be filled from insights
+            "resistance_level": None, # To be filled from insights
+            "stop_loss": None # To be filled from insights (or calculated if logic provided)
+        }
+    else: # df is empty
+         analysis_result["technical_analysis"] = {
+            "ma_20": None, "ma_50": None, "ma_200": None,
+            "ma_cross_status": "데이터 부족", "ma_long_cross_status": "데이터 부족",
+            "trend": "데이터 부족",
+            "support_level": None, "resistance_level": None, "stop_loss": None
+        }
+
+
+    # Volume Analysis
+    if not df.empty and 'volume' in df.columns:
+        latest_volume = df["volume"].iloc[-1]
+        latest_volume_ma20 = indicator_snapshot["VolumeMA20"] if use_snapshot else df["VolumeMA20"].iloc[-1]
+        
+        volume_change_pct = ((latest_volume / latest_volume_ma20) - 1) * 100 if latest_volume_ma20 else 0
+        
+        # Thresholds (1.5x / 1.1x / 0.7x the 20-day average) and wording live in signals.py
+        volume_text = volume_label(volume_code(latest_volume, latest_volume_ma20), latest_volume, latest_volume_ma20, volume_change_pct)
+
+        analysis_result["volume_analysis"] = {
+            "volume_latest": int(latest_volume),
+            "volume_ma_20": int(latest_volume_ma20),
+            "volume_change_pct": volume_change_pct,
+            "volume_analysis": volume_text
+        }
+    else: # df is empty or no volume
+        analysis_result["volume_analysis"] = {
+            "volume_latest": analysis_result["current_price"].get("volume"), # Try to get from current_price if available
+            "volume_ma_20": None,
+            "volume_change_pct": None,
+            "volume_analysis": "거래량 데이터 부족"
+        }
+
+
+    # Process Stock Insights Data
+    insights_data = {}
+    key_technicals = {}
+    recommendation_trend = []
+    company_snapshot = {}
+    if stock_insights_json and stock_insights_json.get("finance", {}).get("result"):
+        insights_data = stock_insights_json["finance"]["result"]
+        key_technicals = insights_data.get("instrumentInfo", {}).get("keyTechnicals", {})
+        recommendation_trend_data = insights_data.get("recommendationTrend", {}).get("trend", [])
+        # Ensure recommendation_trend is a list of dicts, not a single dict
+        if isinstance(recommendation_trend_data, list):
+            recommendation_trend = recommendation_trend_data
+        elif isinstance(recommendation_trend_data, dict): # Sometimes it might be a single dict
+             recommendation_trend = [recommendation_trend_data]
+
+
+        company_snapshot = insights_data.get("companySnapshot", {})
+        # Extract key developments
+        # Assuming 'news' or 'events' might be part of companySnapshot or a dedicated section
+        # For now, using a placeholder if specific path isn't clear from pltr_analysis_code.md
+        # The example showed "key_developments": insights_result.get("finance", {}).get("result", {}).get("companySnapshot", {}).get("company", {}).get("hiring", [])
+        # This seems like an example, let's look for something more generic like 'news'
+        # For PLTR example, "key_developments" was empty. Let's try to find a common path.
+        # Yahoo Finance API often has 'secFilings' or 'news'. 'companyEvents' might be under 'esgScores'.
+        # Let's use a placeholder structure for now and assume insights data might have a 'companyEvents' or similar.
+        # Based on typical Yahoo Finance structures, 'news' is often found under quoteSummary.
+        # Since `get_stock_insights` structure is not fully detailed, we'll make a best guess.
+        # Let's assume insights_data.get("news") or similar.
+        # The example used 'company.hiring' which is very specific.
+        # A more robust approach might be to look for a news/events list.
+        # If `pltr_analysis_code.md`'s "key_developments" was derived from a specific part of the API response,
+        # that path should be used. The previous script used `insights_result.get("finance", {}).get("result", {}).get("companySnapshot", {}).get("company", {}).get("hiring", [])`
+        # Let's stick to that for now if that's what the example implied.
+        hiring_info = insights_data.get("companySnapshot", {}).get("company", {}).get("hiring", [])
+        if hiring_info and isinstance(hiring_info, list): # Ensure it's a list
+             for item in hiring_info: # This path seems too specific for general "key developments"
+                 # Let's try to find a more generic news source if available, else use this.
+                 # For now, the `pltr_analysis_code.md` implies this path, so we'll use it.
+                 # A real "key development" would have a date and headline. Hiring info might not.
+                 # Re-evaluating: `pltr_analysis_code.md` had `key_developments: []`
+                 # Let's assume we need to find a proper news source.
+                 # `getSummary` endpoint often has news. `get_stock_insights` might be different.
+                 # Let's assume `insights_data.get("news")` or `insights_data.get("companyNews")`
+                 # For now, if not found, it will be an empty list.
+                 pass # Placeholder, will refine if a specific path for news is identified
+        
+        # Based on the PLTR example, "key_developments" was an empty list.
+        # If the API provided a news section (e.g., `insights_data.get('news', [])`), it would be processed here.
+        # Example:
+        # raw_news = insights_data.get('news', [])
+        # for news_item in raw_news:
+        # analysis_result["key_developments"].append({
+        # "date": news_item.get("providerPublishTime") # Needs conversion to date string
+        # "headline": news_item.get("title")
+        # })
+        # For now, it remains empty as per PLTR example unless data is found.
+
+
+    # Populate from key_technicals if available
+    if key_technicals:
+        analysis_result["technical_analysis"]["support_level"] = key_technicals.get("support")
+        analysis_result["technical_analysis"]["resistance_level"] = key_technicals.get("resistance")
+        analysis_result["technical_analysis"]["stop_loss"] = key_technicals.get("stopLossPrice") # Or "stopLoss"
+    
+    # Investment Recommendation
+    # The PLTR example had target_price, provider, rating.
+    # This usually comes from recommendationTrend or financialData.
+    target_price = insights_data.get("financialData", {}).get("targetMeanPrice", {}).get("raw")
+    provider = "Multiple Analysts" # Default if specific provider isn't in recommendationTrend
+    rating = "N/A" # Default
+    
+    if recommendation_trend: # This is a list of dicts
+        # Use the latest recommendation (assuming sorted or take the first one)
+        latest_rec = recommendation_trend[0] if recommendation_trend else {}
+        rating_map = {"BUY": "매수", "STRONG_BUY": "적극 매수", "HOLD": "중립", "SELL": "매도", "STRONG_SELL": "적극 매도", "UNDERPERFORM": "시장수익률 하회", "OVERWEIGHT": "비중 확대"}
+        raw_rating = latest_rec.get("strongBuy", 0) > 0 and "STRONG_BUY" or \
+                     latest_rec.get("buy", 0) > 0 and "BUY" or \
+                     latest_rec.get("hold", 0) > 0 and "HOLD" or \
+                     latest_rec.get("sell", 0) > 0 and "SELL" or \
+                     latest_rec.get("strongSell", 0) > 0 and "STRONG_SELL" or "N/A"
+        
+        # The `recommendationTrend` array usually has `period`, `strongBuy`, `buy`, `hold`, `sell`, `strongSell` counts.
+        # We need to derive a single 'rating' like "BUY".
+        # A common way is to see which rating has the highest count for the most recent period.
+        # Or, some APIs provide `recommendations.rating`.
+        # The `pltr_analysis_code.md` implies a single "rating" field.
+        # Let's try to get `financialData.recommendationKey`
+        api_rating = insights_data.get("financialData", {}).get("recommendationKey")
+        if api_rating and api_rating.upper() in rating_map:
+            rating = rating_map[api_rating.upper()]
+        elif raw_rating != "N/A": # Fallback to derived from counts
+             rating = rating_map.get(raw_rating, "N/A")
+
+
+        # Provider might be more general if derived from recommendationTrend.
+        # If `insights_data.get("quoteSummary", {}).get("recommendationTrend", {}).get("trend")` has provider info, use it.
+        # For now, "Multiple Analysts" is a safe bet.
+    
+    investment_opinion = f"{analysis_result['basic_info']['company_name']}에 대한 투자 의견은 현재 '{rating}'입니다."
+    if target_price:
+        investment_opinion += f" 분석가들은 평균적으로 {target_price:.2f} {analysis_result['basic_info']['currency']}의 목표 주가를 제시하고 있습니다."
+    else:
+        investment_opinion += " 현재 구체적인 목표 주가 정보는 제공되지 않았습니다."
+
+    if rating in ["매수", "적극 매수"]:
+        investment_opinion += " 이는 현재 주가 수준에서 상승 잠재력이 있다고 판단될 수 있습니다."
+    elif rating in ["매도", "적극 매도"]:
+        investment_opinion += " 이는 현재 주가 수준에서 하락 위험이 있거나 고평가 되었다고 판단될 수 있습니다."
+    else: # 중립
+        investment_opinion += " 이는 현재 주가가 적정 수준이거나, 뚜렷한 상승/하락 요인이 부족하다고 판단될 수 있습니다."
+
+
+    analysis_result["investment_recommendation"] = {
+        "target_price": target_price,
+        "provider": provider, # This might need to be extracted if available, else 'Multiple Analysts'
+        "rating": rating,
+        "investment_opinion": investment_opinion
+    }
+
+    # Process Stock Holders Data
+    if stock_holders_json and stock_holders_json.get("finance", {}).get("result"):
+        holders_result = stock_holders_json["finance"]["result"]
+        # Insider Trading (Example structure, may need adjustment based on actual API response)
+        # The PLTR example had: [{'name': ..., 'relation': ..., 'transaction': ..., 'date': ..., 'position': ...}]
+        # This usually comes from `insiderTransactions.transactions`
+        insider_transactions_raw = holders_result.get("insiderTransactions", {}).get("transactions", [])
+        if isinstance(insider_transactions_raw, list): # Ensure it's a list
+            for trans in insider_transactions_raw:
+                if not isinstance(trans, dict): continue # Skip if not a dict
+                # Date conversion: 'startDate.fmt' is usually 'YYYY-MM-DD'
+                transaction_date = trans.get("startDate", {}).get("fmt", "N/A")
+                # Transaction text: 'transactionText' or build from 'shares' and 'value'
+                transaction_text = trans.get("transactionText", "")
+                if not transaction_text and trans.get("shares", {}).get("raw") and trans.get("value", {}).get("raw"):
+                    action = "매수" if trans.get("value", {}).get("raw") > 0 else "매도" # Assuming positive value is buy
+                    transaction_text = f"{abs(trans['shares']['raw']):,}주 {action} (약 {abs(trans['value']['raw']):,} {analysis_result['basic_info']['currency']})"
+                elif not transaction_text and trans.get("ownership", {}).get("raw") in [1,4]: # 1 for Direct, 4 for Indirect. Check API docs.
+                    # This might be a holding report, not a transaction.
+                    transaction_text = f"보유 변동: {trans.get('shares', {}).get('longFmt', 'N/A')}"
+
+
+                analysis_result["insider_trading"].append({
+                    "name": trans.get("filerName", "N/A"),
+                    "relation": trans.get("filerRelation", "N/A"),
+                    "transaction": transaction_text,
+                    "date": transaction_date,
+                    "position": trans.get("filerTitle", "N/A") # 'filerTitle' or 'position'
+                })
+        else:
+            warnings.append(f"Warning: Insider transactions data for {ticker} is not in the expected list format.")
+
+
+    # Conclusion - This should synthesize information
+    conc_trend = analysis_result["technical_analysis"].get("trend", "데이터 부족")
+    conc_trend_analysis = f"{analysis_result['basic_info']['company_name']}의 현재 주가 추세는 '{conc_trend}'으로 평가됩니다. "
+    if conc_trend == "강한 상승":
+        conc_trend_analysis += "모든 주요 이동평균선(20일, 50일, 200일)이 정배열을 이루고 주가가 그 위에 있어 매우 긍정적인 신호입니다."
+    elif conc_trend == "상승":
+        conc_trend_analysis += "단기 및 중기 이동평균선(20일, 50일)이 상승세를 보이고 있으며, 주가가 이들 선 위에 위치해 긍정적입니다."
+    elif conc_trend == "하락":
+        conc_trend_analysis += "단기 및 중기 이동평균선(20일, 50일)이 하락세를 보이고 있으며, 주가가 이들 선 아래에 위치해 주의가 필요합니다."
+    elif conc_trend == "강한 하락":
+        conc_trend_analysis += "모든 주요 이동평균선(20일, 50일, 200일)이 역배열을 이루고 주가가 그 아래에 있어 부정적인 신호가 강합니다."
+    else: # 중립 or 데이터 부족
+        conc_trend_analysis += "주가가 이동평균선들 사이에서 혼조세를 보이거나, 뚜렷한 방향성을 찾기 어렵습니다. 추가적인 분석이 필요합니다."
+    
+    # Add MA cross status to trend analysis
+    ma_cross_status_text = analysis_result["technical_analysis"].get("ma_cross_status", "")
+    if "골든크로스" in ma_cross_status_text:
+        conc_trend_analysis += f" 특히, {ma_cross_status_text}는 단기적으로 긍정적인 모멘텀을 시사합니다."
+    elif "데드크로스" in ma_cross_status_text:
+        conc_trend_analysis += f" 특히, {ma_cross_status_text}는 단기적으로 부정적인 모멘텀을 시사합니다."
+
+    ma_long_cross_status_text = analysis_result["technical_analysis"].get("ma_long_cross_status", "")
+    if "골든크로스" in ma_long_cross_status_text:
+        conc_trend_analysis += f" 또한, {ma_long_cross_status_text}는 장기적으로도 긍정적인 전망을 강화합니다."
+    elif "데드크로스" in ma_long_cross_status_text:
+        conc_trend_analysis += f" 또한, {ma_long_cross_status_text}는 장기적으로도 주의가 필요함을 나타냅니다."
+
+
+    analysis_result["conclusion"] = {
+        "trend": conc_trend,
+        "trend_analysis": conc_trend_analysis,
+        "volume_analysis": analysis_result["volume_analysis"].get("volume_analysis", "거래량 분석 데이터 부족"),
+        "investment_opinion": analysis_result["investment_recommendation"].get("investment_opinion", "투자 의견 정보 부족")
+    }
+
+    return AnalysisResult(ticker, analysis_result, df, warnings)
+
+def compute_technical_indicators(df):
+    """Computes RSI, Bollinger Bands and MACD over a price frame (the *_technical_indicators.csv columns)."""
+    import pandas as pd
+
+    df_tech = pd.DataFrame(index=df.index) # Use original df index
+    df_tech["close"] = df["close"] # Ensure 'close' is present for calculations
+
+    # RSI
+    delta = df_tech["close"].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14, min_periods=1).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14, min_periods=1).mean()
+    rs = gain / loss
+    df_tech["RSI"] = 100 - (100 / (1 + rs))
+    df_tech["RSI"] = df_tech["RSI"].fillna(50) # Fill initial NaNs with 50 (neutral)
+
+    # Bollinger Bands
+    df_tech["MA20_BB"] = df_tech["close"].rolling(window=20, min_periods=1).mean()
+    df_tech["STD20_BB"] = df_tech["close"].rolling(window=20, min_periods=1).std().fillna(0) # Fill NaN std with 0
+    df_tech["Upper_BB"] = df_tech["MA20_BB"] + (df_tech["STD20_BB"] * 2)
+    df_tech["Lower_BB"] = df_tech["MA20_BB"] - (df_tech["STD20_BB"] * 2)
+
+    # MACD
+    df_tech["EMA12"] = df_tech["close"].ewm(span=12, adjust=False, min_periods=1).mean()
+    df_tech["EMA26"] = df_tech["close"].ewm(span=26, adjust=False, min_periods=1).mean()
+    df_tech["MACD"] = df_tech["EMA12"] - df_tech["EMA26"]
+    df_tech["Signal_Line"] = df_tech["MACD"].ewm(span=9, adjust=False, min_periods=1).mean()
+
+    # Select relevant columns and last 1 year of data (approx 252 trading days)
+    # Or, as per pltr_analysis_code.md, it saved for the whole period.
+    # The original script saved tail(30). Let's save the whole period available from df.
+    return df_tech[TECHNICAL_INDICATOR_COLUMNS]
+
+
+# --- Stage 3: Render and persist ---
+
+def output_paths(output_dir, ticker, chart_options=None, indicator_format="csv"):
+    """Paths of every per-ticker output file (the chart and indicator extensions follow their formats)."""
+    chart_extension = chart_options.extension if chart_options else ".png"
+    return {
+        "result_json": os.path.join(output_dir, f"{ticker}_analysis_result.json"),
+        "chart": os.path.join(output_dir, f"{ticker}_stock_chart{chart_extension}"),
+        "chart_data": os.path.join(output_dir, f"{ticker}_chart_data.json"),
+        "technical_indicators": os.path.join(output_dir, f"{ticker}_technical_indicators{INDICATOR_EXTENSIONS[indicator_format]}"),
+        "raw_chart": os.path.join(output_dir, f"{ticker}_stock_data_raw.json"),
+        "raw_insights": os.path.join(output_dir, f"{ticker}_stock_insights_raw.json"),
+        "raw_holders": os.path.join(output_dir, f"{ticker}_stock_holders_raw.json"),
+    }
+
+def save_raw_payloads(fetched, output_dir):
+    """Saves the raw API payloads for inspection (atomically, see output_writer.py); returns their paths."""
+    paths = output_paths(output_dir, fetched.ticker)
+    written = []
+    with span("write", ticker=fetched.ticker, output="raw"):
+        for key, payload in (("raw_chart", fetched.source_chart), ("raw_insights", fetched.insights), ("raw_holders", fetched.holders)):
+            if key == "raw_chart" and fetched.raw_chart is not None:
+                # The response body as received, instead of re-serializing the decoded payload
+                data = bytes(fetched.raw_chart)
+            else:
+                data = json.dumps(payload).encode("utf-8")
+            write_bytes(paths[key], data)
+            written.append(paths[key])
+    return written
+
+def archive_payloads(fetched, archive_run):
+    """Adds the raw payloads to a payload_archive.ArchiveRun; returns their digests by endpoint."""
+    digests = {}
+    with span("write", ticker=fetched.ticker, output="archive"):
+        # The chart response body as received when there is one, like save_raw_payloads()
+        # The payload as fetched (before any resampling), so a replay makes the same request
+        chart = fetched.raw_chart if fetched.raw_chart is not None else json.dumps(fetched.source_chart, separators=(",", ":")).encode("utf-8")
+        digests["chart"] = archive_run.add(fetched.ticker, "chart", chart, fetched.fetch_interval, fetched.range_str, analysis_interval=fetched.interval)
+        for endpoint, payload in (("insights", fetched.insights), ("holders", fetched.holders)):
+            # Failed calls come back as {}; there is nothing to replay
+            if payload:
+                digests[endpoint] = archive_run.add(fetched.ticker, endpoint, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    return digests
+
+def _chart_labels(analysis):
+    """The parts of the result that appear in the chart besides the bars (its titles and axis label)."""
+    basic_info = analysis.result.get("basic_info", {})
+    return {"ticker": analysis.ticker, "company_name": basic_info.get("company_name"), "currency": basic_info.get("currency")}
+
+def _is_current(fingerprints, path, fingerprint, output):
+    if fingerprints is None or not fingerprints.is_current(path, fingerprint):
+        return False
+    incr("outputs_skipped_total", output=output)
+    return True
+
+def save_result_json(analysis, path):
+    """Writes the analysis result JSON read by the front end; returns False if the file already held it."""
+    with span("write", ticker=analysis.ticker, output="result_json"):
+        # Ensure utf-8 for Korean characters
+        data = json.dumps(analysis.result, indent=4, ensure_ascii=False).encode("utf-8")
+        return write_bytes(path, data)
+
+def render_chart(analysis, path, options=None, fingerprints=None):
+    """Renders the price/MA and volume chart of an analysis to path (see chart_renderer.ChartOptions).
+
+    path may also be a binary file object. With an output_writer.FingerprintStore the render is
+    skipped (returning False) when the chart was already drawn from the same bars and options.
+    """
+    options = options or ChartOptions()
+    if not isinstance(path, (str, os.PathLike)):
+        with span("render_chart", ticker=analysis.ticker):
+            chart_renderer.render_chart(analysis, path, options)
+        return True
+    fingerprint = bars_fingerprint(analysis.price_frame, "chart", fmt=options.fmt, dpi=options.dpi, decimate=options.decimate, **_chart_labels(analysis))
+    if _is_current(fingerprints, path, fingerprint, "chart"):
+        return False
+    with span("render_chart", ticker=analysis.ticker):
+        with atomic_path(path) as temp_path:
+            chart_renderer.render_chart(analysis, temp_path, options)
+    if fingerprints is not None:
+        fingerprints.record(path, fingerprint)
+    return True
+
+def save_chart_data(analysis, path, max_points=DEFAULT_MAX_POINTS, fingerprints=None):
+    """Writes the compact chart payload the front end draws client-side (see chart_data.py); returns False if skipped."""
+    fingerprint = bars_fingerprint(analysis.price_frame, "chart_data", max_points=max_points, **_chart_labels(analysis))
+    if _is_current(fingerprints, path, fingerprint, "chart_data"):
+        return False
+    with span("chart_data", ticker=analysis.ticker):
+        payload = build_chart_payload(analysis, max_points=max_points)
+    with span("write", ticker=analysis.ticker, output="chart_data"):
+        write_bytes(path, json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    if fingerprints is not None:
+        fingerprints.record(path, fingerprint)
+    return True
+
+def save_technical_indicators(analysis, path, fmt="csv", fingerprints=None):
+    """Writes the technical indicators of the whole price history as CSV, Parquet or Arrow IPC; returns False if skipped."""
+    fingerprint = bars_fingerprint(analysis.price_frame, "technical_indicators", fmt=fmt)
+    if _is_current(fingerprints, path, fingerprint, "technical_indicators"):
+        return False
+    indicators = analysis.technical_indicators()
+    with span("write", ticker=analysis.ticker, output="technical_indicators"):
+        with atomic_path(path) as temp_path:
+            write_indicators(indicators, temp_path, fmt)
+    if fingerprints is not None:
+        fingerprints.record(path, fingerprint)
+    return True
+
+def save_indicator_dataset(analysis, root, fmt="parquet"):
+    """Replaces the ticker's partitions in a ticker/year partitioned indicator dataset; returns the files written."""
+    indicators = analysis.technical_indicators()
+    with span("write", ticker=analysis.ticker, output="indicator_dataset"):
+        return write_indicator_dataset(indicators, analysis.ticker, root, fmt)
+
+def run_pipeline(api_client, ticker, output_dir, timeout=DEFAULT_FETCH_TIMEOUT, save_raw=False, chart=True, chart_data=True, indicators=True, archive_run=None):
+    """Convenience wrapper: fetch, analyze and persist one ticker. Returns the AnalysisResult."""
+    fetched = fetch(api_client, ticker, timeout=timeout)
+    if archive_run is not None:
+        archive_payloads(fetched, archive_run)
+    if save_raw:
+        save_raw_payloads(fetched, output_dir)
+    analysis = analyze(fetched.chart, fetched.insights, fetched.holders, ticker=ticker, indicator_snapshot=fetched.indicator_snapshot)
+    analysis.warnings[:0] = fetched.warnings
+    paths = output_paths(output_dir, ticker)
+    save_result_json(analysis, paths["result_json"])
+    if analysis.has_price_data:
+        if chart:
+            render_chart(analysis, paths["chart"])
+        if chart_data:
+            save_chart_data(analysis, paths["chart_data"])
+        if indicators:
+            save_technical_indicators(analysis, paths["technical_indicators"])
+    return analysis
@@ -0,0 +1,360 @@
+"""Resident analysis server for the front end.
+
+Keeps one ApiClient (with its response cache), the pandas/matplotlib imports and
+recent results warm in a single process and answers over HTTP/JSON:
+
+- GET /analysis/{ticker}            analysis result JSON (same schema as *_analysis_result.json)
+- GET /analysis/{ticker}/chart.json compact chart data the front end draws (see chart_data.py)
+- GET /analysis/{ticker}/chart.png  price/volume chart of the latest analysis, rendered server-side
+- GET /stats                        request counts and p50/p99 latencies
+- GET /metrics                      stage/request histograms and counters (Prometheus text)
+- GET /healthz                      liveness check
+
+Concurrent requests for the same ticker are coalesced into one computation, and a
+result is reused for --result-ttl seconds. At most --max-results analyses (and
+their charts) are kept, least recently used first out. Runs against the dummy ApiClient, so it
+can be exercised locally with no network:
+
+    python analysis-code/analysis_server.py --port 8765
+    curl localhost:8765/analysis/PLTR
+"""
+import argparse
+import io
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) # Add repo root to path
+from data_api import ApiClient
+
+import analysis_pipeline
+from analysis_pipeline import TickerAnalysisError, DEFAULT_FETCH_TIMEOUT
+from response_cache import ResponseCache, CachedApiClient, DEFAULT_CACHE_PATH
+import metrics
+
+DEFAULT_PORT = 8765
+DEFAULT_RESULT_TTL = 60.0
+DEFAULT_MAX_RESULTS = 256
+
+# Symbols like PLTR, BRK.B, ^GSPC, EURUSD=X, BTC-USD
+TICKER_PATTERN = re.compile(r"^[A-Z0-9.\-^=]{1,16}$")
+ROUTE_PATTERN = re.compile(r"^/analysis/([^/]+)(?:/chart\.(png|json))?/?$")
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers of the same key share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, func):
+        """Returns func()'s result, or waits for the identical call already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call["result"] = func()
+            except Exception as e:
+                call["error"] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call["done"].set()
+        else:
+            call["done"].wait()
+
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+
+class LatencyRecorder:
+    """Keeps the most recent request durations per route and reports percentiles."""
+
+    def __init__(self, window=10000):
+        self._lock = threading.Lock()
+        self._window = window
+        self._samples = {}
+        self._counts = {}
+
+    def record(self, route, status, seconds):
+        with self._lock:
+            self._samples.setdefault(route, deque(maxlen=self._window)).append(seconds)
+            counts = self._counts.setdefault(route, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        # Nearest-rank percentile
+        return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: sorted(samples) for route, samples in self._samples.items()}
+            counts = {route: dict(c) for route, c in self._counts.items()}
+        stats = {}
+        for route, ordered in routes.items():
+            stats[route] = {
+                "requests": sum(counts[route].values()),
+                "status": {str(code): n for code, n in sorted(counts[route].items())},
+                "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 2),
+                "p99_ms": round(self._percentile(ordered, 0.99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+        return stats
+
+
+class AnalysisService:
+    """Computes and caches analyses for the HTTP handler (thread-safe)."""
+
+    def __init__(self, api_client, fetch_timeout=DEFAULT_FETCH_TIMEOUT, result_ttl=DEFAULT_RESULT_TTL, max_results=DEFAULT_MAX_RESULTS):
+        self.api_client = api_client
+        self.fetch_timeout = fetch_timeout
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+        self.started_at = time.time()
+        self.computations = 0
+        self.result_hits = 0
+        self.latency = LatencyRecorder()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        # Both are LRU ordered (oldest first) and bounded, so arbitrary tickers can't grow them forever
+        self._results = OrderedDict() # ticker -> (computed_at, AnalysisResult)
+        self._charts = OrderedDict() # (ticker, "png"|"json") -> (AnalysisResult, body bytes)
+
+    def warm_up(self):
+        """Imports the heavy libraries and builds the chart template before the first request."""
+        import pandas # noqa: F401
+        analysis_pipeline.chart_template()
+
+    def _cached_result(self, ticker):
+        with self._lock:
+            entry = self._results.get(ticker)
+            if entry and time.monotonic() - entry[0] < self.result_ttl:
+                self._results.move_to_end(ticker)
+                return entry[1]
+        return None
+
+    def _drop_result(self, ticker):
+        # Caller holds self._lock; the charts of a result go with it
+        self._results.pop(ticker, None)
+        for kind in ("png", "json"):
+            self._charts.pop((ticker, kind), None)
+
+    def _store_result(self, ticker, analysis):
+        # Caller holds self._lock
+        now = time.monotonic()
+        self._drop_result(ticker)
+        self._results[ticker] = (now, analysis)
+        expired = [t for t, (computed_at, _) in self._results.items() if now - computed_at >= self.result_ttl]
+        for t in expired:
+            self._drop_result(t)
+        while len(self._results) > self.max_results:
+            self._drop_result(next(iter(self._results)))
+
+    def _compute(self, ticker):
+        # Another caller may have finished the same ticker while we queued for the flight
+        analysis = self._cached_result(ticker)
+        if analysis is not None:
+            return analysis
+        fetched = analysis_pipeline.fetch(self.api_client, ticker, timeout=self.fetch_timeout)
+        analysis = analysis_pipeline.analyze(fetched.chart, fetched.insights, fetched.holders, ticker=ticker, indicator_snapshot=fetched.indicator_snapshot)
+        analysis.warnings[:0] = fetched.warnings
+        with self._lock:
+            self.computations += 1
+            self._store_result(ticker, analysis)
+        return analysis
+
+    def analysis(self, ticker):
+        """Returns the AnalysisResult of a ticker, computing it at most once per TTL window."""
+        analysis = self._cached_result(ticker)
+        if analysis is not None:
+            with self._lock:
+                self.result_hits += 1
+            return analysis
+        return self._flight.do(("analysis", ticker), lambda: self._compute(ticker))
+
+    def _chart(self, ticker, kind, build):
+        # Charts are cached per analysis, so they expire together with the result
+        analysis = self.analysis(ticker)
+        if not analysis.has_price_data:
+            return None
+        key = (ticker, kind)
+        with self._lock:
+            entry = self._charts.get(key)
+        if entry and entry[0] is analysis:
+            return entry[1]
+
+        def compute():
+            body = build(analysis)
+            with self._lock:
+                # Only cache charts of the ticker's current result, so evicted results don't leave charts behind
+                current = self._results.get(ticker)
+                if current and current[1] is analysis:
+                    self._charts[key] = (analysis, body)
+            return body
+        return self._flight.do(("chart",) + key, compute)
+
+    def chart_png(self, ticker):
+        """Returns the chart of the ticker's current analysis as PNG bytes (None without price data)."""
+        def render(analysis):
+            buffer = io.BytesIO()
+            # The shared chart template serializes renders itself
+            analysis_pipeline.render_chart(analysis, buffer)
+            return buffer.getvalue()
+        return self._chart(ticker, "png", render)
+
+    def chart_data(self, ticker):
+        """Returns the chart payload of the ticker's current analysis as JSON bytes (None without price data)."""
+        def build(analysis):
+            payload = analysis_pipeline.build_chart_payload(analysis)
+            return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return self._chart(ticker, "json", build)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "computations": self.computations,
+                "result_cache_hits": self.result_hits,
+                "results_cached": len(self._results),
+                "charts_cached": len(self._charts),
+            }
+        stats["coalesced_requests"] = self._flight.coalesced
+        if isinstance(self.api_client, CachedApiClient):
+            cache = self.api_client.cache
+            stats["api_cache"] = {"hits": cache.hits, "misses": cache.misses}
+        stats["routes"] = self.latency.snapshot()
+        return stats
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Routes GET requests to the AnalysisService attached to the server."""
+
+    server_version = "AnalysisServer/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+        return status
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        return self._send(status, body, "application/json; charset=utf-8")
+
+    def do_GET(self):
+        service = self.server.service
+        start = time.perf_counter()
+        path = urlsplit(self.path).path
+        route = path
+        try:
+            match = ROUTE_PATTERN.match(path)
+            if match:
+                chart = match.group(2)
+                route = f"/analysis/{{ticker}}/chart.{chart}" if chart else "/analysis/{ticker}"
+                status = self._handle_analysis(service, match.group(1).upper(), chart)
+            elif path == "/stats":
+                status = self._send_json(200, service.stats())
+            elif path == "/metrics":
+                body = metrics.METRICS.render_prometheus().encode("utf-8")
+                status = self._send(200, body, "text/plain; version=0.0.4; charset=utf-8")
+            elif path == "/healthz":
+                status = self._send_json(200, {"status": "ok"})
+            else:
+                route = "other"
+                status = self._send_json(404, {"message": f"Unknown path: {path}"})
+        except Exception as e:
+            status = self._send_json(500, {"message": f"Internal error: {e}"})
+        duration = time.perf_counter() - start
+        service.latency.record(route, status, duration)
+        metrics.METRICS.observe("http_request_duration_seconds", duration, route=route, status=status)
+
+    def _handle_analysis(self, service, ticker, chart):
+        if not TICKER_PATTERN.match(ticker):
+            return self._send_json(400, {"message": f"Invalid ticker symbol: {ticker}"})
+        try:
+            if chart:
+                if chart == "png":
+                    body, content_type = service.chart_png(ticker), "image/png"
+                else:
+                    body, content_type = service.chart_data(ticker), "application/json; charset=utf-8"
+                if body is None:
+                    return self._send_json(404, {"message": f"No price data to chart for {ticker}."})
+                return self._send(200, body, content_type)
+            return self._send_json(200, service.analysis(ticker).result)
+        except TickerAnalysisError as e:
+            # Upstream data problem, not a server bug
+            return self._send_json(502, {"message": str(e)})
+
+
+def create_server(api_client, host="127.0.0.1", port=DEFAULT_PORT, fetch_timeout=DEFAULT_FETCH_TIMEOUT, result_ttl=DEFAULT_RESULT_TTL, max_results=DEFAULT_MAX_RESULTS, warm=True, verbose=False):
+    """Builds the HTTP server (port 0 picks a free port; see server.server_address)."""
+    service = AnalysisService(api_client, fetch_timeout=fetch_timeout, result_ttl=result_ttl, max_results=max_results)
+    if warm:
+        service.warm_up()
+    server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Resident stock analysis HTTP server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (0 = any free port)")
+    parser.add_argument("--fetch-timeout", type=float, default=DEFAULT_FETCH_TIMEOUT, help="Seconds each API call may take")
+    parser.add_argument("--result-ttl", type=float, default=DEFAULT_RESULT_TTL, help="Seconds a computed analysis is reused")
+    parser.add_argument("--max-results", type=int, default=DEFAULT_MAX_RESULTS, help=f"Most analyses (with their charts) kept in memory (default: {DEFAULT_MAX_RESULTS})")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the on-disk API response cache")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="Location of the API response cache database")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the dummy ApiClient (same seed = identical payloads)")
+    parser.add_argument("--metrics-log", default=None, help="Append per-stage spans to this JSON lines file")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    metrics.configure(args.metrics_log)
+    api_client = ApiClient(seed=args.seed)
+    if not args.no_cache:
+        api_client = CachedApiClient(api_client, ResponseCache(args.cache_path))
+    server = create_server(api_client, host=args.host, port=args.port, fetch_timeout=args.fetch_timeout, result_ttl=args.result_ttl, max_results=args.max_results, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Analysis server listening on http://{host}:{port} (GET /analysis/{{ticker}}, /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down.")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Vectorized historical backtests of the analyzer's trend, cross and volume signals.
+
+analyze() evaluates its rules on the latest bar only. Here the same rules are
+replayed over the full (tickers x bars) history (right-aligned matrices, see
+cross_section.build_bar_matrix) as long/flat position matrices, with NumPy
+operations along whole matrices and no per-bar Python loop:
+
+- ma_cross: long while the fast MA is above the slow one (golden cross in, dead
+  cross out), once the slow window is filled, as in analyze()
+- trend: long while signals.trend_codes() is in long_states (strong up / up by default)
+- volume_breakout: long for `hold` bars after a bar closing up on volume above
+  ratio x its moving average (the 1.5x/1.1x thresholds of the volume analysis)
+
+Any rule takes a stop: a fraction below the entry close (0.08 = 8%) or, per
+ticker, the distance of keyTechnicals' stopLossPrice below the latest close.
+The API only gives today's levels, so they are replayed as that relative
+distance from each entry rather than as absolute prices.
+
+A position decided on bar t's close earns bar t+1's return, so there is no
+lookahead. Per rule, summarize() reports compounded returns, max drawdown,
+trade count and hit rate (share of winning trades) across the universe:
+
+    universe = Universe(close, volume)
+    summarize(universe, "ma_cross", fast=50, slow=200)
+    sweep(universe, "volume_breakout", {"ratio": [1.1, 1.5, 2.0], "hold": [5, 10]})
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) # Add repo root to path
+from data_api import ApiClient, generate_dummy_bar_matrix
+
+from alert_scanner import fetch_charts
+from cross_section import build_bar_matrix, rolling_mean
+from resample import INTERVALS, RANGES
+from response_cache import ResponseCache, CachedApiClient, DEFAULT_CACHE_PATH
+from signals import TREND_STRONG_UP, TREND_UP, VOLUME_SURGE_RATIO, trend_codes
+from stock_analyzer import load_tickers
+
+# Rules run by default: (rule, parameters)
+DEFAULT_RULES = (
+    ("ma_cross", {"fast": 20, "slow": 50}),
+    ("ma_cross", {"fast": 50, "slow": 200}),
+    ("trend", {}),
+    ("volume_breakout", {}),
+)
+
+
+class Universe:
+    """Bar matrices of a ticker universe plus the indicators the rules share (computed once per window)."""
+
+    def __init__(self, close, volume=None, tickers=None, stop_levels=None):
+        self.close = np.asarray(close, dtype=float)
+        self.volume = np.asarray(volume, dtype=float) if volume is not None else None
+        self.tickers = tickers
+        self.valid = ~np.isnan(self.close)
+        # Bars seen so far per row (histories are right-aligned behind NaN padding)
+        self.bar_count = np.cumsum(self.valid, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = self.close[:, 1:] / self.close[:, :-1] - 1.0
+        self.returns = np.zeros_like(self.close)
+        self.returns[:, 1:] = np.where(np.isnan(returns), 0.0, returns)
+        # Per-ticker stop distances derived from keyTechnicals (NaN = no level)
+        self.stop_levels = np.asarray(stop_levels, dtype=float) if stop_levels is not None else None
+        self._ma = {}
+        self._volume_ma = {}
+
+    def ma(self, window):
+        if window not in self._ma:
+            self._ma[window] = rolling_mean(self.close, window)
+        return self._ma[window]
+
+    def volume_ma(self, window):
+        if self.volume is None:
+            raise ValueError("The volume_breakout rule needs volume bars")
+        if window not in self._volume_ma:
+            self._volume_ma[window] = rolling_mean(self.volume, window)
+        return self._volume_ma[window]
+
+
+# --- Rules: each returns a boolean (tickers x bars) matrix, True = long after that bar's close ---
+
+def ma_cross_positions(universe, fast=20, slow=50):
+    return (universe.ma(fast) > universe.ma(slow)) & (universe.bar_count >= slow)
+
+def trend_positions(universe, short=20, mid=50, long=200, long_states=(TREND_STRONG_UP, TREND_UP)):
+    codes = trend_codes(universe.close, universe.ma(short), universe.ma(mid), universe.ma(long))
+    return np.isin(codes, long_states) & universe.valid
+
+def volume_breakout_positions(universe, ratio=VOLUME_SURGE_RATIO, window=20, hold=5):
+    breakout = (universe.volume > universe.volume_ma(window) * ratio) & (universe.returns > 0)
+    # Long while any breakout happened within the last `hold` bars
+    counts = np.cumsum(breakout, axis=1)
+    recent = counts.copy()
+    recent[:, hold:] -= counts[:, :-hold]
+    return (recent > 0) & universe.valid
+
+RULES = {
+    "ma_cross": ma_cross_positions,
+    "trend": trend_positions,
+    "volume_breakout": volume_breakout_positions,
+}
+
+
+def apply_stop(universe, position, stop):
+    """Exits a position for the rest of its run once the close falls `stop` below the entry close.
+
+    stop is a fraction (0.08 = 8%), or "key_technicals" for the per-ticker universe.stop_levels.
+    """
+    if stop == "key_technicals":
+        if universe.stop_levels is None:
+            raise ValueError("No keyTechnicals stop levels were loaded for this universe")
+        stop = universe.stop_levels[:, None]
+    n_bars = position.shape[1]
+    columns = np.arange(n_bars)
+    entries = position & ~np.concatenate([np.zeros((len(position), 1), dtype=bool), position[:, :-1]], axis=1)
+    # Column of the entry bar of the run each bar belongs to
+    entry_column = np.maximum.accumulate(np.where(entries, columns, 0), axis=1)
+    entry_close = np.take_along_axis(universe.close, entry_column, axis=1)
+    with np.errstate(invalid="ignore"):
+        hit = position & (universe.close < entry_close * (1.0 - stop))
+    # Hits since the run's entry: a first hit closes the position until the next entry
+    hits = np.cumsum(hit, axis=1)
+    hits_before_entry = np.take_along_axis(hits - hit, entry_column, axis=1)
+    return position & (hits - hits_before_entry == 0)
+
+def positions(universe, rule, stop=None, **params):
+    """The position matrix of a rule with its parameters, with an optional stop applied."""
+    if rule not in RULES:
+        raise ValueError(f"Unknown rule: {rule} (expected one of {', '.join(RULES)})")
+    position = RULES[rule](universe, **params)
+    if stop is not None:
+        position = apply_stop(universe, position, stop)
+    return position
+
+
+# --- Metrics ---
+
+def strategy_returns(universe, position, cost_bps=0.0):
+    """Per-bar returns of holding `position` (decided at each close, earning the next bar), net of costs."""
+    held = np.zeros_like(universe.returns)
+    held[:, 1:] = position[:, :-1]
+    returns = held * universe.returns
+    if cost_bps:
+        # One cost per position change, charged on the bar the trade happens
+        changes = np.abs(np.diff(position.astype(np.int8), axis=1, prepend=0))
+        returns[:, 1:] -= changes[:, :-1] * (cost_bps / 10000.0)
+    return returns
+
+def trade_returns(position, log_equity):
+    """(row, compounded return) of every trade: a run of consecutive long bars."""
+    n_rows, n_bars = position.shape
+    padded = np.zeros((n_rows, n_bars + 2), dtype=np.int8)
+    padded[:, 1:-1] = position
+    edges = np.diff(padded, axis=1)
+    # np.nonzero walks row by row, so the k-th entry and the k-th exit belong to the same trade
+    rows, entry_columns = np.nonzero(edges == 1)
+    _, exit_columns = np.nonzero(edges == -1)
+    # A trade earns the bars after its entry up to the one after its last long bar (open trades: the last bar)
+    exit_columns = np.minimum(exit_columns, n_bars - 1)
+    return rows, np.expm1(log_equity[rows, exit_columns] - log_equity[rows, entry_columns])
+
+def evaluate(universe, position, cost_bps=0.0):
+    """Per-ticker metrics of a position matrix: {name: (tickers,) array}, plus the trade returns."""
+    returns = strategy_returns(universe, position, cost_bps)
+    log_equity = np.cumsum(np.log1p(returns), axis=1)
+    equity = np.exp(log_equity)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    rows, trades = trade_returns(position, log_equity)
+    n_bars = np.maximum(universe.bar_count[:, -1], 1)
+    return {
+        "total_return": equity[:, -1] - 1.0,
+        "max_drawdown": np.min(equity / peak, axis=1) - 1.0,
+        "exposure": position.sum(axis=1) / n_bars,
+        "trades": np.bincount(rows, minlength=len(position)),
+        "wins": np.bincount(rows, weights=trades > 0, minlength=len(position)),
+    }, trades
+
+def _summary(universe, position, cost_bps):
+    metrics, trades = evaluate(universe, position, cost_bps)
+    has_bars = universe.bar_count[:, -1] > 0
+    total_return = metrics["total_return"][has_bars]
+    drawdown = metrics["max_drawdown"][has_bars]
+    return {
+        "tickers": int(has_bars.sum()),
+        "trades": int(len(trades)),
+        "hit_rate": float(np.mean(trades > 0)) if len(trades) else None,
+        "mean_trade_return": float(np.mean(trades)) if len(trades) else None,
+        "mean_return": float(np.mean(total_return)) if len(total_return) else None,
+        "median_return": float(np.median(total_return)) if len(total_return) else None,
+        "mean_max_drawdown": float(np.mean(drawdown)) if len(drawdown) else None,
+        "worst_drawdown": float(np.min(drawdown)) if len(drawdown) else None,
+        "exposure": float(np.mean(metrics["exposure"][has_bars])) if has_bars.any() else None,
+    }
+
+def summarize(universe, rule, stop=None, cost_bps=0.0, **params):
+    """Universe-wide metrics of one rule and parameter set (see the module docstring)."""
+    summary = {"rule": rule, "params": dict(params, **({"stop": stop} if stop is not None else {}))}
+    summary.update(_summary(universe, positions(universe, rule, stop=stop, **params), cost_bps))
+    return summary
+
+def buy_and_hold(universe):
+    """Summary of holding every ticker over its whole history (the baseline the rules compare to)."""
+    summary = {"rule": "buy_and_hold", "params": {}}
+    summary.update(_summary(universe, universe.valid, 0.0))
+    return summary
+
+def sweep(universe, rule, grid, stop=None, cost_bps=0.0):
+    """Summaries of a rule for every combination of the parameter lists in grid ({name: [values]})."""
+    names = list(grid)
+    results = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        if rule == "ma_cross" and params.get("fast", 20) >= params.get("slow", 50):
+            continue
+        results.append(summarize(universe, rule, stop=stop, cost_bps=cost_bps, **params))
+    return results
+
+
+# --- Command line ---
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Backtest the analyzer's trend, cross and volume signals over a ticker universe")
+    ticker_group = parser.add_mutually_exclusive_group(required=True)
+    ticker_group.add_argument("--tickers", help="Comma-separated ticker symbols (e.g., AAPL,MSFT,PLTR)")
+    ticker_group.add_argument("--tickers-file", help="File with one ticker symbol per line ('#' starts a comment)")
+    ticker_group.add_argument("--universe", type=int, help="Generate this many dummy tickers straight into matrices (no API calls)")
+    parser.add_argument("--interval", choices=INTERVALS, default="1d", help="Bar interval (default: 1d)")
+    parser.add_argument("--range", dest="range_str", choices=RANGES, default="5y", help="History to replay (default: 5y)")
+    parser.add_argument("--rule", choices=RULES, default=None, help="Backtest only this rule (default: the built-in rule set)")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2", help="Rule parameter values; several values sweep them (e.g. --param fast=10,20 --param slow=50,200)")
+    parser.add_argument("--stop", default=None, help="Exit when the close falls this fraction below the entry (e.g. 0.08), or 'key' for each ticker's keyTechnicals stop-loss distance")
+    parser.add_argument("--cost-bps", type=float, default=0.0, help="Cost per position change in basis points (default: 0)")
+    parser.add_argument("--fetch-workers", type=int, default=16, help="Number of threads fetching charts (default: 16)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk API response cache entirely")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="SQLite file for the API response cache")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the dummy ApiClient / --universe bars")
+    parser.add_argument("--output", default=None, help="Also write the summaries to this JSON file")
+    return parser.parse_args()
+
+def _parse_value(text):
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+def parse_grid(specs):
+    """{"fast": [10, 20], ...} from NAME=V1,V2 strings."""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not name or not values:
+            raise ValueError(f"Expected NAME=V1,V2,... but got {spec!r}")
+        grid[name.strip()] = [_parse_value(v.strip()) for v in values.split(",")]
+    return grid
+
+def _fetch_insights(api_client, ticker):
+    try:
+        return api_client.get_stock_insights(ticker)
+    except Exception as e:
+        print(f"[backtest] {ticker}: insights unavailable ({e}); no keyTechnicals stop")
+        return None
+
+def stop_distances(insights, tickers, latest_close):
+    """Fraction each ticker's keyTechnicals stopLossPrice lies below its latest close (NaN if unknown)."""
+    distances = np.full(len(tickers), np.nan)
+    for row, ticker in enumerate(tickers):
+        result = (insights.get(ticker) or {}).get("finance", {}).get("result") or {}
+        level = result.get("instrumentInfo", {}).get("keyTechnicals", {}).get("stopLossPrice")
+        if level and latest_close[row] > 0:
+            distances[row] = max(0.0, 1.0 - level / latest_close[row])
+    return distances
+
+def load_universe(args):
+    """Builds the Universe selected on the command line."""
+    if args.universe:
+        tickers = [f"ZZB{i:05d}" for i in range(args.universe)]
+        _, bars = generate_dummy_bar_matrix(tickers, args.interval, args.range_str, seed=args.seed)
+        return Universe(bars["close"], bars["volume"], tickers)
+
+    args.ticker = None
+    tickers = load_tickers(args)
+    api_client = ApiClient(seed=args.seed)
+    if not args.no_cache:
+        api_client = CachedApiClient(api_client, ResponseCache(args.cache_path))
+    charts = fetch_charts(api_client, tickers, args.interval, args.range_str, workers=args.fetch_workers)
+    tickers, _, close, volume = build_bar_matrix(charts)
+    stop_levels = None
+    if args.stop == "key":
+        with ThreadPoolExecutor(max_workers=args.fetch_workers) as pool:
+            insights = dict(zip(tickers, pool.map(_fetch_insights, [api_client] * len(tickers), tickers)))
+        stop_levels = stop_distances(insights, tickers, close[:, -1] if close.size else [])
+    return Universe(close, volume, tickers, stop_levels=stop_levels)
+
+def _format_pct(value):
+    return "-" if value is None else f"{value * 100:7.2f}%"
+
+def print_summaries(summaries):
+    print(f"{'rule':<16} {'params':<34} {'trades':>7} {'hit rate':>9} {'mean ret':>9} {'median':>9} {'mean DD':>9} {'worst DD':>9} {'exposure':>9}")
+    for s in summaries:
+        params = " ".join(f"{k}={v}" for k, v in s["params"].items())
+        print(f"{s['rule']:<16} {params:<34} {s['trades']:>7} {_format_pct(s['hit_rate']):>9} {_format_pct(s['mean_return']):>9} {_format_pct(s['median_return']):>9} {_format_pct(s['mean_max_drawdown']):>9} {_format_pct(s['worst_drawdown']):>9} {_format_pct(s['exposure']):>9}")
+
+def main():
+    args = parse_arguments()
+    try:
+        grid = parse_grid(args.param)
+        stop = "key_technicals" if args.stop == "key" else (float(args.stop) if args.stop is not None else None)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if grid and not args.rule:
+        print("Error: --param needs --rule.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        universe = load_universe(args)
+    except OSError as e:
+        print(f"Error reading tickers file: {e}")
+        sys.exit(1)
+    loaded = time.perf_counter()
+
+    try:
+        if args.rule:
+            summaries = sweep(universe, args.rule, grid, stop=stop, cost_bps=args.cost_bps)
+        else:
+            summaries = [summarize(universe, rule, stop=stop, cost_bps=args.cost_bps, **params) for rule, params in DEFAULT_RULES]
+    except (TypeError, ValueError) as e:
+        # Unknown parameter names or values of the wrong type
+        print(f"Error: invalid rule parameters: {e}")
+        sys.exit(1)
+    summaries.append(buy_and_hold(universe))
+    finished = time.perf_counter()
+
+    print_summaries(summaries)
+    print(f"{universe.close.shape[0]} tickers x {universe.close.shape[1]} bars: {len(summaries) - 1} backtests in {finished - loaded:.2f}s (data loaded in {loaded - start:.2f}s)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"interval": args.interval, "range": args.range_str, "cost_bps": args.cost_bps, "results": summaries}, f, indent=4, ensure_ascii=False)
+        print(f"Backtest results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Local per-ticker OHLCV bar store for incremental chart updates.
+
+Instead of pulling a full year of bars on every run, the store remembers the
+last stored timestamp per (ticker, interval), requests only the missing tail
+with the smallest API range that covers it, and merges it into the stored
+history (de-duplicated by timestamp, newest bar wins). The merged window is
+handed back in the usual `chart.result` layout so the analysis is unchanged.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_BAR_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "bars.sqlite")
+
+# Calendar days covered by each API range, smallest first (used to pick the tail request)
+RANGE_DAYS = [
+    ("1d", 1),
+    ("5d", 7),
+    ("1mo", 30),
+    ("3mo", 91),
+    ("6mo", 182),
+    ("1y", 365),
+    ("2y", 730),
+    ("5y", 1826),
+    ("10y", 3652),
+]
+_RANGE_DAYS = dict(RANGE_DAYS)
+
+QUOTE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def range_days(range_str, now=None):
+    """Calendar days range_str reaches back from now: since Jan 1 for "ytd", None (no lower bound) for "max"."""
+    if range_str == "max":
+        return None
+    if range_str == "ytd":
+        now = time.time() if now is None else now
+        year_start = time.mktime((time.localtime(now).tm_year, 1, 1, 0, 0, 0, 0, 0, -1))
+        return (now - year_start) / 86400.0
+    return _RANGE_DAYS.get(range_str, 365)
+
+def tail_range_for(last_timestamp, range_str, now=None):
+    """Returns the smallest API range covering everything after last_timestamp, capped at range_str."""
+    if last_timestamp is None or range_str not in _RANGE_DAYS and range_str not in ("ytd", "max"):
+        return range_str
+    now = time.time() if now is None else now
+    gap_days = (now - last_timestamp) / 86400.0
+    limit = range_days(range_str, now)
+    for candidate, days in RANGE_DAYS:
+        if limit is not None and days >= limit:
+            break
+        # The range must reach back to the last stored bar too: it may have been a partial (in-session) bar
+        if days > gap_days:
+            return candidate
+    return range_str
+
+
+class BarStore:
+    """SQLite-backed OHLCV history per (ticker, interval). Thread-safe."""
+
+    def __init__(self, path=DEFAULT_BAR_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bars ("
+            " ticker TEXT NOT NULL, interval TEXT NOT NULL, timestamp INTEGER NOT NULL,"
+            " open REAL, high REAL, low REAL, close REAL, volume INTEGER,"
+            " PRIMARY KEY (ticker, interval, timestamp)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chart_meta ("
+            " ticker TEXT NOT NULL, interval TEXT NOT NULL, meta TEXT NOT NULL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (ticker, interval))"
+        )
+        self._conn.commit()
+
+    def last_timestamp(self, ticker, interval):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(timestamp) FROM bars WHERE ticker = ? AND interval = ?", (ticker, interval)
+            ).fetchone()
+        return row[0]
+
+    def merge(self, ticker, interval, stock_data_json):
+        """Merges the bars of a chart payload into the store; returns how many bars were written."""
+        result = stock_data_json["chart"]["result"][0]
+        timestamps = result.get("timestamp") or []
+        quote = (result.get("indicators", {}).get("quote") or [{}])[0]
+        columns = [quote.get(field) or [None] * len(timestamps) for field in QUOTE_FIELDS]
+        rows = [(ticker, interval) + bar for bar in zip(timestamps, *columns)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chart_meta VALUES (?, ?, ?, ?)",
+                (ticker, interval, json.dumps(result.get("meta", {})), time.time()),
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def revised_bars(self, ticker, interval, stock_data_json, before):
+        """Counts the bars of a chart payload older than `before` that are stored with a different close or volume."""
+        result = stock_data_json["chart"]["result"][0]
+        quote = (result.get("indicators", {}).get("quote") or [{}])[0]
+        incoming = {
+            timestamp: (close, volume)
+            for timestamp, close, volume in zip(result.get("timestamp") or [], quote.get("close") or [], quote.get("volume") or [])
+            if timestamp < before
+        }
+        if not incoming:
+            return 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, close, volume FROM bars"
+                " WHERE ticker = ? AND interval = ? AND timestamp >= ? AND timestamp < ?",
+                (ticker, interval, min(incoming), before),
+            ).fetchall()
+        return sum(1 for timestamp, close, volume in rows if timestamp in incoming and incoming[timestamp] != (close, volume))
+
+    def load_chart(self, ticker, interval, range_str, now=None):
+        """Rebuilds a chart payload with the stored bars of the last range_str."""
+        now = time.time() if now is None else now
+        days = range_days(range_str, now)
+        since = now - days * 86400 if days is not None else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, open, high, low, close, volume FROM bars"
+                " WHERE ticker = ? AND interval = ? AND timestamp >= ? ORDER BY timestamp",
+                (ticker, interval, since),
+            ).fetchall()
+            meta_row = self._conn.execute(
+                "SELECT meta FROM chart_meta WHERE ticker = ? AND interval = ?", (ticker, interval)
+            ).fetchone()
+        meta = json.loads(meta_row[0]) if meta_row else {}
+        meta["range"] = range_str
+        columns = list(zip(*rows)) if rows else [()] * 6
+        quote = {field: list(values) for field, values in zip(QUOTE_FIELDS, columns[1:])}
+        return {
+            "chart": {
+                "result": [
+                    {
+                        "meta": meta,
+                        "timestamp": list(columns[0]),
+                        "indicators": {
+                            "quote": [quote],
+                            "adjclose": [{"adjclose": quote["close"]}],
+                        },
+                    }
+                ],
+                "error": None,
+            }
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def fetch_chart_incremental(api_client, bar_store, ticker, interval="1d", range_str="1y", indicator_store=None):
+    """Fetches only the bars missing from bar_store; returns (merged chart payload, indicator snapshot).
+
+    ApiClient only takes a `range`, so the tail is requested with the smallest range that
+    covers the gap since the last stored bar (a daily run fetches "1d" instead of "1y").
+    If an IndicatorStateStore is given, the ticker's rolling indicator state is advanced
+    with the new bars as well and its snapshot returned; otherwise the snapshot is None.
+    The state can only revise its last bar, so if the tail changes older stored bars it
+    is rebuilt from the whole stored history instead.
+    """
+    last_timestamp = bar_store.last_timestamp(ticker, interval)
+    request_range = tail_range_for(last_timestamp, range_str)
+    stock_data_json = api_client.get_stock_chart(ticker=ticker, interval=interval, range=request_range)
+    if not stock_data_json or "chart" not in stock_data_json or not stock_data_json["chart"]["result"]:
+        return stock_data_json, None # Let the caller report the invalid payload
+    revised = bar_store.revised_bars(ticker, interval, stock_data_json, last_timestamp) if last_timestamp is not None else 0
+    bar_store.merge(ticker, interval, stock_data_json)
+    snapshot = None
+    if indicator_store is not None:
+        if revised:
+            snapshot = indicator_store.update_from_chart(ticker, bar_store.load_chart(ticker, interval, "max"), interval, reset=True)
+        else:
+            snapshot = indicator_store.update_from_chart(ticker, stock_data_json, interval)
+    return bar_store.load_chart(ticker, interval, range_str), snapshot
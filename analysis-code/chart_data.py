@@ -0,0 +1,107 @@
+"""Compact chart payload for drawing the price/volume chart in the browser.
+
+Instead of a rendered PNG, the front end can fetch `{ticker}_chart_data.json` and
+draw the chart itself. The series are stored column by column as base64-encoded
+little-endian arrays, which is far smaller than a PNG or a JSON list of floats:
+
+    {
+        "version": 1,
+        "ticker": "PLTR", "company_name": "...", "currency": "USD",
+        "points": 1000,           # length of every column
+        "source_points": 98280,   # bars before downsampling
+        "downsampling": "lttb",   # or null when every bar is kept
+        "time": "<base64 uint32 epoch seconds>",
+        "columns": {"close": "<base64 float32>", "MA20": ..., "MA50": ..., "MA200": ...,
+                    "volume": ..., "VolumeMA20": ...}
+    }
+
+Missing values (e.g. before a moving average has enough bars) are NaN. Long
+histories are reduced with Largest-Triangle-Three-Buckets on the close, and every
+column keeps the same bars, so the series stay aligned.
+"""
+import base64
+
+CHART_DATA_VERSION = 1
+CHART_DATA_COLUMNS = ["close", "MA20", "MA50", "MA200", "volume", "VolumeMA20"]
+# A chart is at most ~2000 px wide, so more points than this are not visible
+DEFAULT_MAX_POINTS = 2000
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps to draw (x, y) with `threshold` points.
+
+    The first and last points are always kept. Returns every index when the series
+    is already short enough.
+    """
+    import numpy as np
+
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # Measured from the first point, so epoch seconds don't swamp the areas
+    x = np.asarray(x, dtype=float) - x[0]
+    y = np.asarray(y, dtype=float)
+    buckets = threshold - 2
+    # Bucket b covers [starts[b], starts[b + 1]) of the points between the first and the last
+    starts = (np.arange(buckets + 1) * ((n - 2) / buckets)).astype(np.int64) + 1
+    starts[-1] = n - 1
+    sizes = np.diff(starts)
+    # The averages each bucket aims at: the next bucket's, and just the last point for the final bucket
+    avg_x = np.append(np.add.reduceat(x[1:n - 1], starts[:-1] - 1) / sizes, x[-1])[1:]
+    avg_y = np.append(np.add.reduceat(y[1:n - 1], starts[:-1] - 1) / sizes, y[-1])[1:]
+    # Candidates as a (buckets, widest bucket) matrix; short rows repeat their first point,
+    # which never beats it in argmax
+    offsets = np.arange(sizes.max())
+    candidates = starts[:-1, None] + np.where(offsets < sizes[:, None], offsets, 0)
+    cand_x, cand_y = x[candidates], y[candidates]
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    ax, ay = x[0], y[0]
+    for bucket in range(buckets):
+        # Twice the area of the triangle (kept point, candidate, next bucket's average)
+        area = np.abs(cand_y[bucket] * (ax - avg_x[bucket]) + cand_x[bucket] * (avg_y[bucket] - ay) + avg_x[bucket] * ay - ax * avg_y[bucket])
+        best = candidates[bucket, area.argmax()]
+        indices[bucket + 1] = best
+        ax, ay = x[best], y[best]
+    return indices
+
+def _encode(array, dtype):
+    import numpy as np
+    return base64.b64encode(np.ascontiguousarray(array, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()).decode("ascii")
+
+def decode_column(encoded, dtype="float32"):
+    """Decodes one base64 column back into a NumPy array (the reverse of the payload encoding)."""
+    import numpy as np
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.dtype(dtype).newbyteorder("<"))
+
+def build_chart_payload(analysis, max_points=DEFAULT_MAX_POINTS):
+    """Builds the chart payload of an analysis (max_points=0 keeps every bar)."""
+    import numpy as np
+
+    df = analysis.price_frame
+    basic_info = analysis.result.get("basic_info", {})
+    seconds = df.index.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    indices = None
+    if max_points and len(df) > max_points:
+        indices = lttb_indices(seconds, df["close"].to_numpy(dtype=float), max_points)
+        seconds = seconds[indices]
+
+    columns = {}
+    for column in CHART_DATA_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df[column].to_numpy(dtype=np.float32)
+        columns[column] = _encode(values if indices is None else values[indices], "float32")
+
+    return {
+        "version": CHART_DATA_VERSION,
+        "ticker": analysis.ticker,
+        "company_name": basic_info.get("company_name"),
+        "currency": basic_info.get("currency"),
+        "points": len(seconds),
+        "source_points": len(df),
+        "downsampling": "lttb" if indices is not None else None,
+        "time": _encode(seconds, "uint32"),
+        "columns": columns,
+    }
@@ -0,0 +1,219 @@
+"""Price/volume chart rendering for the analysis pipeline.
+
+Building a matplotlib figure (axes, ticks, legends, grid, fonts) costs more than
+drawing the data, so each process builds one ChartTemplate per DPI and reuses it:
+a render only swaps the line/volume data, the titles and the axis limits, and then
+saves. Volume is drawn as a single LineCollection instead of one Rectangle per bar,
+and the layout is fixed when the template is built instead of running tight_layout
+on every chart.
+
+With ChartOptions(decimate=True) series longer than the plot is wide are reduced to
+the min/max of each pixel column (volume: the max), which looks the same at the
+saved resolution but keeps intraday/multi-year charts from drawing 100k+ points.
+
+analysis_pipeline.render_chart() is the entry point; matplotlib is only imported
+when the first chart is rendered.
+"""
+import functools
+import threading
+import warnings
+
+CHART_FORMATS = ("png", "webp", "svg")
+DEFAULT_CHART_DPI = 100
+CHART_SIZE = (14, 10) # inches
+
+# Fixed layout of the template (fractions of the figure); roughly what tight_layout
+# produced for the old per-ticker figure, with room for 7-digit price ticks
+LAYOUT = {"left": 0.06, "right": 0.975, "top": 0.965, "bottom": 0.055, "hspace": 0.22}
+
+
+class ChartOptions:
+    """How charts are written: output format, resolution and pixel-level decimation."""
+
+    def __init__(self, fmt="png", dpi=DEFAULT_CHART_DPI, decimate=False):
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"Unsupported chart format: {fmt} (expected one of {', '.join(CHART_FORMATS)})")
+        self.fmt = fmt
+        self.dpi = dpi
+        self.decimate = decimate
+
+    @property
+    def extension(self):
+        return f".{self.fmt}"
+
+
+@functools.lru_cache(maxsize=None)
+def configure_matplotlib():
+    """Sets the Agg backend, chart style and Korean font once per process; returns pyplot."""
+    # Set Matplotlib backend to Agg to avoid GUI issues in headless environments
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib import font_manager
+
+    # The style sets its own font.family, so it must be applied before the font
+    plt.style.use('seaborn-v0_8-darkgrid')
+    # Set Korean font, falling back to a generic sans-serif if NanumGothic is not installed.
+    # findfont() only consults the font cache, which is much cheaper than drawing a test figure.
+    try:
+        font_manager.findfont(font_manager.FontProperties(family='NanumGothic'), fallback_to_default=False)
+        plt.rcParams['font.family'] = 'NanumGothic'
+    except ValueError:
+        # A warning rather than a print: the pipeline stages never write to stdout themselves
+        warnings.warn("NanumGothic font not found. Using default sans-serif. Korean text in charts might not display correctly.", stacklevel=2)
+        plt.rcParams['font.family'] = 'sans-serif'
+    return plt
+
+
+def _pixel_buckets(x, buckets):
+    """Start index of every non-empty bucket when x (sorted) is split into equal-width buckets."""
+    import numpy as np
+    edges = np.linspace(x[0], x[-1], buckets + 1)[1:-1]
+    starts = np.searchsorted(x, edges, side="left")
+    # Buckets without points share a start index with their neighbour
+    return np.unique(np.concatenate(([0], starts)))
+
+def decimate_line(x, y, starts):
+    """Reduces a line to two points (min and max, in the order they occur) per bucket."""
+    import numpy as np
+    ends = np.append(starts[1:], len(y)) - 1
+    # fmin/fmax skip NaNs (e.g. the warm-up of a moving average) unless a whole bucket is NaN
+    low = np.fmin.reduceat(y, starts)
+    high = np.fmax.reduceat(y, starts)
+    rising = ~(y[ends] < y[starts])
+    out_x = np.empty(2 * len(starts))
+    out_y = np.empty(2 * len(starts))
+    out_x[0::2], out_x[1::2] = x[starts], x[ends]
+    out_y[0::2] = np.where(rising, low, high)
+    out_y[1::2] = np.where(rising, high, low)
+    return out_x, out_y
+
+def decimate_bars(x, heights, starts):
+    """Reduces bars to the tallest bar of each bucket."""
+    import numpy as np
+    return x[starts], np.fmax.reduceat(heights, starts)
+
+
+class ChartTemplate:
+    """A prebuilt two-panel (price + MAs, volume) figure whose data is swapped per render.
+
+    One template is shared by every render in a process (see chart_template()); the
+    lock makes it safe to render from several threads.
+    """
+
+    PRICE_LINES = [
+        # (column, label, style)
+        ("close", None, {"color": "blue", "alpha": 0.7}),
+        ("MA20", "MA20", {"color": "orange", "linestyle": "--", "alpha": 0.9}),
+        ("MA50", "MA50", {"color": "green", "linestyle": "--", "alpha": 0.9}),
+        ("MA200", "MA200", {"color": "red", "linestyle": "--", "alpha": 0.9}),
+    ]
+
+    def __init__(self, dpi=DEFAULT_CHART_DPI):
+        configure_matplotlib()
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.collections import LineCollection
+        from matplotlib.figure import Figure
+
+        self.dpi = dpi
+        self._lock = threading.Lock()
+        # A bare Figure is not registered with pyplot, so it is never closed or garbage collected between renders
+        self.figure = Figure(figsize=CHART_SIZE, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        self.price_ax, self.volume_ax = self.figure.subplots(2, 1, gridspec_kw={'height_ratios': [3, 1]})
+        self.figure.subplots_adjust(**LAYOUT)
+
+        # Price Chart with MA20, MA50, MA200
+        self.price_lines = {}
+        for column, label, style in self.PRICE_LINES:
+            self.price_lines[column], = self.price_ax.plot([], [], label=label or "close", **style)
+        self.price_ax.set_ylabel(" ", fontsize=12)
+        # A fixed legend position: "best" scans every vertex of every line on each draw
+        self.price_legend = self.price_ax.legend(fontsize=10, loc="upper left")
+        self.price_ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+
+        # Volume Chart: one collection of vertical segments instead of a Rectangle per bar
+        self.volume_bars = LineCollection([], colors="grey", alpha=0.5, label="거래량")
+        self.volume_ax.add_collection(self.volume_bars)
+        self.volume_line, = self.volume_ax.plot([], [], label="거래량 MA20", color="purple", linestyle="--", alpha=0.9)
+        self.volume_ax.set_ylabel("거래량", fontsize=12)
+        self.volume_legend = self.volume_ax.legend(fontsize=10, loc="upper left")
+        self.volume_ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+        self.volume_ax.set_xlabel("날짜", fontsize=12)
+
+        for ax in (self.price_ax, self.volume_ax):
+            ax.xaxis_date()
+
+    def _plot_width_px(self):
+        return self.price_ax.get_position().width * CHART_SIZE[0] * self.dpi
+
+    def _update(self, analysis, decimate):
+        import numpy as np
+        from matplotlib import dates as mdates
+
+        df = analysis.price_frame
+        ticker = analysis.ticker
+        basic_info = analysis.result['basic_info']
+        x = mdates.date2num(df.index.to_numpy())
+        width_px = self._plot_width_px()
+        starts = _pixel_buckets(x, int(width_px)) if decimate and len(x) > 2 * width_px else None
+
+        def series(column):
+            values = df[column].to_numpy(dtype=float)
+            if starts is None:
+                return x, values
+            return decimate_line(x, values, starts)
+
+        for column, line in self.price_lines.items():
+            if column in df.columns:
+                line.set_data(*series(column))
+            else:
+                line.set_data([], [])
+            line.set_visible(column in df.columns)
+        self.price_legend.get_texts()[0].set_text(f"{ticker} 종가")
+        self.price_ax.set_title(f"{basic_info['company_name']} ({ticker}) 주가 및 이동평균선", fontsize=16)
+        self.price_ax.yaxis.label.set_text(f"주가 ({basic_info['currency']})")
+
+        has_volume = "volume" in df.columns and "VolumeMA20" in df.columns
+        if has_volume:
+            volume = df["volume"].to_numpy(dtype=float)
+            bar_x, bar_heights = (x, volume) if starts is None else decimate_bars(x, volume, starts)
+            segments = np.zeros((len(bar_x), 2, 2))
+            segments[:, :, 0] = bar_x[:, None]
+            segments[:, 1, 1] = bar_heights
+            self.volume_bars.set_segments(segments)
+            # About 80% of the horizontal space each bar gets, like bar()'s default width (in points)
+            self.volume_bars.set_linewidth(max(0.5, 0.8 * width_px / max(len(bar_x), 1) * 72 / self.dpi))
+            self.volume_line.set_data(*series("VolumeMA20"))
+            top = np.nanmax(np.concatenate((bar_heights, df["VolumeMA20"].to_numpy(dtype=float))))
+            self.volume_ax.set_ylim(0, top * 1.05 if top > 0 else 1)
+            self.volume_ax.set_title(f"{ticker} 거래량", fontsize=14)
+        else:
+            self.volume_bars.set_segments([])
+            self.volume_line.set_data([], [])
+            self.volume_ax.set_title("")
+        self.volume_legend.set_visible(has_volume)
+
+        # Lines autoscale; x limits are shared explicitly (collections are ignored by relim)
+        self.price_ax.relim()
+        self.price_ax.autoscale_view(scalex=False)
+        margin = (x[-1] - x[0]) * 0.05 or 1.0
+        for ax in (self.price_ax, self.volume_ax):
+            ax.set_xlim(x[0] - margin, x[-1] + margin)
+
+    def render(self, analysis, path, options):
+        """Draws the analysis into the template and saves it to path (a file path or binary file object)."""
+        with self._lock:
+            self._update(analysis, options.decimate)
+            self.figure.savefig(path, format=options.fmt, dpi=self.dpi)
+
+
+@functools.lru_cache(maxsize=None)
+def chart_template(dpi=DEFAULT_CHART_DPI):
+    """The process-wide ChartTemplate for a DPI (built on first use)."""
+    return ChartTemplate(dpi)
+
+def render_chart(analysis, path, options=None):
+    """Renders the price/MA and volume chart of an analysis to path with a reused template."""
+    options = options or ChartOptions()
+    chart_template(options.dpi).render(analysis, path, options)
@@ -0,0 +1,193 @@
+"""Streaming decoder for chart responses.
+
+json.loads() turns every bar into Python int/float objects in lists (about 32 bytes
+per value), which build_price_frame() then copies again into NumPy. decode_chart()
+reads the response body in chunks instead and parses the bar arrays (`timestamp`
+and the `indicators` series) in bulk straight into NumPy arrays:
+
+    payload = decode_chart(api_client.get_stock_chart_raw("PLTR"))
+    payload["chart"]["result"][0]["timestamp"]   # int64 ndarray
+    payload["chart"]["result"][0]["meta"]        # plain dict, as with json.loads
+
+The result has the response schema, so analyze() takes it like a json.loads()
+payload. Bar arrays keep JSON's typing: all-integer arrays become int64, anything
+else float64 with null as NaN. Everything outside the bar arrays (the meta, error,
+...) is decoded as usual.
+"""
+import codecs
+import io
+import json
+import re
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Arrays decoded in bulk into NumPy (when not inside "meta")
+BAR_KEYS = frozenset(("timestamp", "open", "high", "low", "close", "volume", "adjclose"))
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null")
+_SCALAR_END = re.compile(r"[,\]}\s]")
+_LITERALS = {"true": True, "false": False, "null": None}
+_BAR_VALUE_START = frozenset("-0123456789n]")
+
+
+class _ChartDecoder:
+    """Recursive-descent JSON decoder over a chunked text buffer."""
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Appends the next chunk to the unread part of the buffer; False at the end of the stream."""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if isinstance(chunk, str):
+            text = chunk
+        else:
+            text = self.decoder.decode(chunk, final=not chunk)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        """The next non-whitespace character ("" at the end of the stream), without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the chart response")
+        self.pos += 1
+
+    def value(self, path):
+        char = self._peek()
+        if char == "{":
+            return self._object(path)
+        if char == "[":
+            key = path[-1] if path else None
+            if key in BAR_KEYS and "meta" not in path:
+                return self._bar_array(path)
+            return self._array(path)
+        if char == '"':
+            return self._string()
+        return self._scalar()
+
+    def _object(self, path):
+        self.pos += 1
+        obj = {}
+        if self._peek() == "}":
+            self.pos += 1
+            return obj
+        while True:
+            if self._peek() != '"':
+                raise ValueError(f"Expected a key at offset {self.pos} of the chart response")
+            key = self._string()
+            self._expect(":")
+            obj[key] = self.value(path + (key,))
+            char = self._peek()
+            self.pos += 1
+            if char == "}":
+                return obj
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {self.pos - 1} of the chart response")
+
+    def _array(self, path):
+        self.pos += 1
+        return self._items(path)
+
+    def _items(self, path):
+        items = []
+        if self._peek() == "]":
+            self.pos += 1
+            return items
+        while True:
+            items.append(self.value(path + (None,)))
+            char = self._peek()
+            self.pos += 1
+            if char == "]":
+                return items
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' at offset {self.pos - 1} of the chart response")
+
+    def _string(self):
+        while True:
+            try:
+                value, end = json.decoder.scanstring(self.buffer, self.pos + 1)
+            except json.JSONDecodeError:
+                # Possibly cut off by the end of the chunk
+                if self._fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+    def _scalar(self):
+        # A number at the end of the buffer may continue in the next chunk
+        while _SCALAR_END.search(self.buffer, self.pos) is None and self._fill():
+            pass
+        match = _SCALAR.match(self.buffer, self.pos)
+        if match is None:
+            raise ValueError(f"Unexpected value at offset {self.pos} of the chart response")
+        self.pos = match.end()
+        token = match.group()
+        if token in _LITERALS:
+            return _LITERALS[token]
+        return float(token) if any(c in token for c in ".eE") else int(token)
+
+    def _bar_array(self, path):
+        """Parses a flat array of numbers/nulls with NumPy, one chunk of text at a time."""
+        import numpy as np
+
+        self.pos += 1
+        # e.g. "adjclose": [{"adjclose": [...]}] is a list of objects, decoded as usual
+        if self._peek() not in _BAR_VALUE_START:
+            return self._items(path)
+        pieces = []
+        integer = True
+        while True:
+            end = self.buffer.find("]", self.pos)
+            # Up to the closing bracket, or to the last complete value in the buffer
+            cut = end if end >= 0 else self.buffer.rfind(",", self.pos)
+            if cut >= self.pos:
+                text = self.buffer[self.pos:cut]
+                self.pos = cut + 1
+                if text.strip():
+                    integer = integer and not any(c in text for c in ".eEn")
+                    try:
+                        values = np.fromstring(text.replace("null", "nan"), dtype=np.float64, sep=",")
+                    except ValueError:
+                        values = None
+                    # Older NumPy stops at the first bad value with a warning instead of raising
+                    if values is None or len(values) != text.count(",") + 1:
+                        raise ValueError("Non-numeric value in a bar array of the chart response")
+                    pieces.append(values)
+                if end >= 0:
+                    break
+            if not self._fill():
+                raise ValueError("Unterminated bar array in the chart response")
+        values = np.concatenate(pieces) if pieces else np.empty(0)
+        # Epoch seconds and share counts are exact in float64 (below 2**53)
+        return values.astype(np.int64) if integer and len(values) else values
+
+
+def decode_chart(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Decodes a chart response (bytes, str or a binary/text file object) with the bar arrays as NumPy arrays."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif isinstance(source, str):
+        source = io.StringIO(source)
+    decoder = _ChartDecoder(source, chunk_size)
+    payload = decoder.value(())
+    if decoder._peek() != "":
+        raise ValueError(f"Extra data at offset {decoder.pos} of the chart response")
+    return payload
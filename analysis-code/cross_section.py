@@ -0,0 +1,197 @@
+"""Vectorized cross-sectional indicator computation.
+
+Takes (tickers x dates) close and volume matrices and computes every indicator
+the analyzer uses (MA20/50/200, VolumeMA20, RSI-14, Bollinger 20/2,
+EMA12/26/MACD/Signal) for all symbols at once, plus the trend and MA cross
+classification. Histories of different lengths are right-aligned: the last
+column is each ticker's latest bar and missing leading bars are NaN.
+
+Rolling windows follow the pandas semantics used in stock_analyzer.py
+(min_periods=1, ewm adjust=False), so results match the per-ticker path.
+"""
+import numpy as np
+
+from signals import (
+    TREND_LABELS, TREND_NO_DATA, SHORT_CROSS_LABELS, LONG_CROSS_LABELS,
+    SHORT_CROSS_MIN_BARS, LONG_CROSS_MIN_BARS, trend_codes, cross_codes,
+)
+
+MA_WINDOWS = (20, 50, 200)
+
+
+def build_bar_matrix(charts):
+    """Aligns chart payloads ({ticker: chart json}) into right-aligned timestamp/close/volume matrices.
+
+    Bars with a missing close or volume are dropped, like the analyzer's dropna.
+    Returns (tickers, timestamps, close, volume); close and volume are NaN-padded on
+    the left, timestamps (int64 epoch seconds) 0-padded.
+    """
+    tickers = list(charts)
+    series = []
+    for ticker in tickers:
+        result = charts[ticker]["chart"]["result"][0]
+        quote = (result.get("indicators", {}).get("quote") or [{}])[0]
+        # Lists with None (json.loads) or NumPy arrays with NaN (decode_chart); None becomes NaN
+        close = np.asarray(quote.get("close") if quote.get("close") is not None else [], dtype=float)
+        volume = np.asarray(quote.get("volume") if quote.get("volume") is not None else [], dtype=float)
+        timestamps = np.asarray(result.get("timestamp") if result.get("timestamp") is not None else [], dtype=np.int64)
+        length = min(len(close), len(volume), len(timestamps))
+        keep = ~(np.isnan(close[:length]) | np.isnan(volume[:length]))
+        series.append((timestamps[:length][keep], close[:length][keep], volume[:length][keep]))
+
+    length = max((len(bars[0]) for bars in series), default=0)
+    timestamps = np.zeros((len(tickers), length), dtype=np.int64)
+    close = np.full((len(tickers), length), np.nan)
+    volume = np.full((len(tickers), length), np.nan)
+    for row, (row_timestamps, row_close, row_volume) in enumerate(series):
+        if len(row_close):
+            timestamps[row, length - len(row_close):] = row_timestamps
+            close[row, length - len(row_close):] = row_close
+            volume[row, length - len(row_close):] = row_volume
+    return tickers, timestamps, close, volume
+
+
+def build_price_matrix(charts):
+    """Aligns chart payloads ({ticker: chart json}) into right-aligned close/volume matrices.
+
+    Bars with a missing close or volume are dropped, like the analyzer's dropna.
+    Returns (tickers, close, volume) with NaN padding on the left.
+    """
+    tickers, _, close, volume = build_bar_matrix(charts)
+    return tickers, close, volume
+
+
+def rolling_mean(values, window):
+    """Row-wise rolling mean with min_periods=1; NaN entries are not counted."""
+    valid = ~np.isnan(values)
+    csum = np.cumsum(np.where(valid, values, 0.0), axis=1)
+    ccount = np.cumsum(valid, axis=1)
+    total = csum.copy()
+    count = ccount.astype(float)
+    total[:, window:] -= csum[:, :-window]
+    count[:, window:] -= ccount[:, :-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(valid, total / count, np.nan)
+
+
+def rolling_std(values, window):
+    """Row-wise rolling sample std (ddof=1) with min_periods=1; a single value gives 0."""
+    valid = ~np.isnan(values)
+    # Shift each row by its first valid value so the sums of squares don't lose precision
+    first = values[np.arange(values.shape[0]), np.argmax(valid, axis=1)]
+    shifted = np.where(valid, values - first[:, None], 0.0)
+    csum = np.cumsum(shifted, axis=1)
+    csq = np.cumsum(shifted * shifted, axis=1)
+    ccount = np.cumsum(valid, axis=1).astype(float)
+    s, sq, n = csum.copy(), csq.copy(), ccount.copy()
+    s[:, window:] -= csum[:, :-window]
+    sq[:, window:] -= csq[:, :-window]
+    n[:, window:] -= ccount[:, :-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (sq - s * s / n) / (n - 1)
+    std = np.sqrt(np.clip(var, 0.0, None))
+    std = np.where(n > 1, std, 0.0)
+    return np.where(valid, std, np.nan)
+
+
+def ewm_mean(values, span):
+    """Row-wise exponential moving average (adjust=False), seeded at each row's first valid value.
+
+    The recursion runs along the date axis only; every step is vectorized across tickers.
+    """
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(values)
+    prev = np.full(values.shape[0], np.nan)
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        prev = np.where(np.isnan(prev), x, alpha * x + (1 - alpha) * prev)
+        out[:, t] = prev
+    return out
+
+
+def rsi(close, window=14):
+    """Row-wise RSI from simple rolling means of gains and losses (neutral 50 when flat)."""
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    valid = ~np.isnan(close)
+    # The first bar of each row has no delta; like delta.where(delta > 0, 0) it counts as 0
+    delta = np.where(valid & np.isnan(delta), 0.0, delta)
+    gain = rolling_mean(np.where(delta > 0, delta, np.where(valid, 0.0, np.nan)), window)
+    loss = rolling_mean(np.where(delta < 0, -delta, np.where(valid, 0.0, np.nan)), window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = 100 - (100 / (1 + gain / loss))
+    return np.where(valid & np.isnan(result), 50.0, result)
+
+
+def compute_indicators(close, volume):
+    """Computes every analyzer indicator for all rows; returns {column name: (N, T) array}."""
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    indicators = {f"MA{w}": rolling_mean(close, w) for w in MA_WINDOWS}
+    indicators["VolumeMA20"] = rolling_mean(volume, 20)
+    indicators["RSI"] = rsi(close, 14)
+    std20 = rolling_std(close, 20)
+    indicators["MA20_BB"] = indicators["MA20"]
+    indicators["STD20_BB"] = std20
+    indicators["Upper_BB"] = indicators["MA20"] + std20 * 2
+    indicators["Lower_BB"] = indicators["MA20"] - std20 * 2
+    indicators["EMA12"] = ewm_mean(close, 12)
+    indicators["EMA26"] = ewm_mean(close, 26)
+    indicators["MACD"] = indicators["EMA12"] - indicators["EMA26"]
+    # MACD is NaN exactly where close is, so its EMA seeds at the same bar
+    indicators["Signal_Line"] = ewm_mean(indicators["MACD"], 9)
+    return indicators
+
+
+def classify_latest(close, indicators):
+    """Returns latest-bar trend and cross codes per row: (trend, short_cross, long_cross, bar_count)."""
+    bar_count = np.sum(~np.isnan(close), axis=1)
+    ma20, ma50, ma200 = indicators["MA20"], indicators["MA50"], indicators["MA200"]
+    trend = trend_codes(close[:, -1], ma20[:, -1], ma50[:, -1], ma200[:, -1])
+    trend = np.where(bar_count > 0, trend, TREND_NO_DATA)
+    if close.shape[1] >= 2:
+        short_cross = cross_codes(ma20[:, -2], ma50[:, -2], ma20[:, -1], ma50[:, -1], bar_count >= SHORT_CROSS_MIN_BARS)
+        long_cross = cross_codes(ma50[:, -2], ma200[:, -2], ma50[:, -1], ma200[:, -1], bar_count >= LONG_CROSS_MIN_BARS)
+    else:
+        short_cross = cross_codes(ma20[:, -1], ma50[:, -1], ma20[:, -1], ma50[:, -1], False)
+        long_cross = short_cross
+    return trend, short_cross, long_cross, bar_count
+
+
+def _float_or_none(value):
+    return None if np.isnan(value) else float(value)
+
+
+def technical_analysis_matrix(tickers, close, volume, key_technicals=None):
+    """Scores a whole universe in one pass.
+
+    Returns {ticker: dict shaped like analysis_result["technical_analysis"]}. Support,
+    resistance and stop-loss come from key_technicals ({ticker: keyTechnicals}) if given.
+    """
+    close = np.asarray(close, dtype=float)
+    indicators = compute_indicators(close, volume)
+    trend, short_cross, long_cross, bar_count = classify_latest(close, indicators)
+    key_technicals = key_technicals or {}
+
+    results = {}
+    for row, ticker in enumerate(tickers):
+        levels = key_technicals.get(ticker) or {}
+        if not bar_count[row]:
+            results[ticker] = {
+                "ma_20": None, "ma_50": None, "ma_200": None,
+                "ma_cross_status": SHORT_CROSS_LABELS[-1], "ma_long_cross_status": LONG_CROSS_LABELS[-1],
+                "trend": TREND_LABELS[TREND_NO_DATA],
+                "support_level": levels.get("support"), "resistance_level": levels.get("resistance"), "stop_loss": levels.get("stopLossPrice"),
+            }
+            continue
+        results[ticker] = {
+            "ma_20": _float_or_none(indicators["MA20"][row, -1]),
+            "ma_50": _float_or_none(indicators["MA50"][row, -1]),
+            "ma_200": _float_or_none(indicators["MA200"][row, -1]),
+            "ma_cross_status": SHORT_CROSS_LABELS[int(short_cross[row])],
+            "ma_long_cross_status": LONG_CROSS_LABELS[int(long_cross[row])],
+            "trend": TREND_LABELS[int(trend[row])],
+            "support_level": levels.get("support"),
+            "resistance_level": levels.get("resistance"),
+            "stop_loss": levels.get("stopLossPrice"),
+        }
+    return results
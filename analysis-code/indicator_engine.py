@@ -0,0 +1,317 @@
+"""Incremental technical indicator engine.
+
+Keeps compact rolling state per ticker (running sums, ring buffers and EMA
+accumulators) so MA20/50/200, VolumeMA20, RSI-14, Bollinger 20/2 and
+EMA12/26/MACD/Signal can be updated in O(1) per new bar instead of
+recomputing the whole series with pandas. Results match the pandas formulas
+in stock_analyzer.py (rolling means with min_periods=1, ewm with adjust=False)
+within floating point tolerance.
+
+The state is JSON-serializable, so it can be persisted between runs with
+IndicatorStateStore and updated from the batch path or a live bar feed.
+"""
+import json
+import math
+import os
+
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "indicator_state")
+
+MA_WINDOWS = (20, 50, 200)
+VOLUME_MA_WINDOW = 20
+RSI_WINDOW = 14
+BB_WINDOW = 20
+BB_STD_MULTIPLIER = 2
+EMA_FAST_SPAN = 12
+EMA_SLOW_SPAN = 26
+SIGNAL_SPAN = 9
+
+# Running sums are rebuilt from the ring buffers this often to stop float drift
+_RESYNC_EVERY = 1000
+
+_CLOSE_RING_SIZE = max(MA_WINDOWS + (BB_WINDOW,))
+
+
+def _alpha(span):
+    return 2.0 / (span + 1.0)
+
+
+class IndicatorState:
+    """Rolling indicator state for one ticker, updated one bar at a time.
+
+    `update(timestamp, close, volume)` appends a bar; sending the same timestamp as the
+    last bar again revises that bar (e.g. a partial in-session bar) instead of appending.
+    Older timestamps are ignored, so replaying overlapping data is harmless.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.last_timestamp = None
+        self.last_close = None
+        self.last_volume = None
+        self.head = 0 # Next slot to write in the close ring
+        self.closes = [0.0] * _CLOSE_RING_SIZE
+        self.volumes = [0.0] * VOLUME_MA_WINDOW
+        self.gains = [0.0] * RSI_WINDOW
+        self.losses = [0.0] * RSI_WINDOW
+        self.ma_sums = {w: 0.0 for w in MA_WINDOWS}
+        self.volume_sum = 0.0
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        # Bollinger variance uses sums of (close - shift) to avoid cancellation at high prices
+        self.bb_shift = None
+        self.bb_sum = 0.0
+        self.bb_sum_sq = 0.0
+        self.ema_fast = None
+        self.ema_slow = None
+        self.signal = None
+        self.prev_ma = {w: None for w in MA_WINDOWS} # MA values of the previous bar, for cross detection
+        self._undo = None
+
+    # --- Updates ---
+
+    def update(self, timestamp, close, volume):
+        """Applies one bar and returns the snapshot of all indicators after it."""
+        timestamp = int(timestamp)
+        if self.last_timestamp is not None:
+            if timestamp < self.last_timestamp:
+                return self.snapshot()
+            if timestamp == self.last_timestamp:
+                self._rollback()
+        self._apply(timestamp, float(close), float(volume))
+        return self.snapshot()
+
+    def _apply(self, timestamp, close, volume):
+        n = self.count
+        slot = self.head
+        vol_slot = n % VOLUME_MA_WINDOW
+        rsi_slot = n % RSI_WINDOW
+        # Everything needed to take this bar back again (only scalars, so still O(1))
+        self._undo = {
+            "last_timestamp": self.last_timestamp,
+            "last_close": self.last_close,
+            "last_volume": self.last_volume,
+            "close_slot": self.closes[slot],
+            "volume_slot": self.volumes[vol_slot],
+            "gain_slot": self.gains[rsi_slot],
+            "loss_slot": self.losses[rsi_slot],
+            "ma_sums": dict(self.ma_sums),
+            "volume_sum": self.volume_sum,
+            "gain_sum": self.gain_sum,
+            "loss_sum": self.loss_sum,
+            "bb_shift": self.bb_shift,
+            "bb_sum": self.bb_sum,
+            "bb_sum_sq": self.bb_sum_sq,
+            "ema_fast": self.ema_fast,
+            "ema_slow": self.ema_slow,
+            "signal": self.signal,
+            "prev_ma": dict(self.prev_ma),
+        }
+
+        if n:
+            self.prev_ma = {w: self.ma_sums[w] / min(n, w) for w in MA_WINDOWS}
+        if self.bb_shift is None:
+            self.bb_shift = close
+
+        # Moving averages and Bollinger sums over the close ring
+        for w in MA_WINDOWS:
+            self.ma_sums[w] += close
+            if n >= w:
+                self.ma_sums[w] -= self.closes[(slot - w) % _CLOSE_RING_SIZE]
+        shifted = close - self.bb_shift
+        self.bb_sum += shifted
+        self.bb_sum_sq += shifted * shifted
+        if n >= BB_WINDOW:
+            leaving = self.closes[(slot - BB_WINDOW) % _CLOSE_RING_SIZE] - self.bb_shift
+            self.bb_sum -= leaving
+            self.bb_sum_sq -= leaving * leaving
+        self.closes[slot] = close
+        self.head = (slot + 1) % _CLOSE_RING_SIZE
+
+        # Volume MA
+        self.volume_sum += volume - (self.volumes[vol_slot] if n >= VOLUME_MA_WINDOW else 0.0)
+        self.volumes[vol_slot] = volume
+
+        # RSI: the first bar has no delta and counts as zero gain/loss, like delta.where(...) in pandas
+        delta = close - self.last_close if n else 0.0
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if n >= RSI_WINDOW:
+            self.gain_sum -= self.gains[rsi_slot]
+            self.loss_sum -= self.losses[rsi_slot]
+        self.gain_sum += gain
+        self.loss_sum += loss
+        self.gains[rsi_slot] = gain
+        self.losses[rsi_slot] = loss
+
+        # EMAs (adjust=False: seeded with the first value)
+        if n:
+            a_fast = _alpha(EMA_FAST_SPAN)
+            a_slow = _alpha(EMA_SLOW_SPAN)
+            self.ema_fast = a_fast * close + (1 - a_fast) * self.ema_fast
+            self.ema_slow = a_slow * close + (1 - a_slow) * self.ema_slow
+            a_signal = _alpha(SIGNAL_SPAN)
+            self.signal = a_signal * (self.ema_fast - self.ema_slow) + (1 - a_signal) * self.signal
+        else:
+            self.ema_fast = self.ema_slow = close
+            self.signal = 0.0
+
+        self.count = n + 1
+        self.last_timestamp = timestamp
+        self.last_close = close
+        self.last_volume = volume
+        if self.count % _RESYNC_EVERY == 0:
+            self._resync()
+
+    def _rollback(self):
+        """Undoes the last applied bar so it can be replaced by a revised one."""
+        undo = self._undo
+        if undo is None:
+            raise ValueError("The last bar cannot be revised: no undo information is kept for it")
+        self.count -= 1
+        n = self.count
+        self.head = (self.head - 1) % _CLOSE_RING_SIZE
+        self.closes[self.head] = undo["close_slot"]
+        self.volumes[n % VOLUME_MA_WINDOW] = undo["volume_slot"]
+        self.gains[n % RSI_WINDOW] = undo["gain_slot"]
+        self.losses[n % RSI_WINDOW] = undo["loss_slot"]
+        self.last_timestamp = undo["last_timestamp"]
+        self.last_close = undo["last_close"]
+        self.last_volume = undo["last_volume"]
+        self.ma_sums = {int(w): v for w, v in undo["ma_sums"].items()}
+        self.volume_sum = undo["volume_sum"]
+        self.gain_sum = undo["gain_sum"]
+        self.loss_sum = undo["loss_sum"]
+        self.bb_shift = undo["bb_shift"]
+        self.bb_sum = undo["bb_sum"]
+        self.bb_sum_sq = undo["bb_sum_sq"]
+        self.ema_fast = undo["ema_fast"]
+        self.ema_slow = undo["ema_slow"]
+        self.signal = undo["signal"]
+        self.prev_ma = {int(w): v for w, v in undo["prev_ma"].items()}
+        self._undo = None
+
+    def _window(self, ring, size, w):
+        """Returns the last min(count, w) values of a ring buffer whose newest entry is at count - 1."""
+        n = min(self.count, w)
+        return [ring[(self.count - 1 - i) % size] for i in range(n)]
+
+    def _resync(self):
+        for w in MA_WINDOWS:
+            self.ma_sums[w] = sum(self._closes_window(w))
+        window = [c - self.bb_shift for c in self._closes_window(BB_WINDOW)]
+        self.bb_sum = sum(window)
+        self.bb_sum_sq = sum(c * c for c in window)
+        self.volume_sum = sum(self._window(self.volumes, VOLUME_MA_WINDOW, VOLUME_MA_WINDOW))
+        self.gain_sum = sum(self._window(self.gains, RSI_WINDOW, RSI_WINDOW))
+        self.loss_sum = sum(self._window(self.losses, RSI_WINDOW, RSI_WINDOW))
+
+    def _closes_window(self, w):
+        n = min(self.count, w)
+        return [self.closes[(self.head - 1 - i) % _CLOSE_RING_SIZE] for i in range(n)]
+
+    # --- Results ---
+
+    def snapshot(self):
+        """Returns the latest value of every indicator (column names as in stock_analyzer.py)."""
+        n = self.count
+        if not n:
+            return {"count": 0, "timestamp": None}
+        result = {"count": n, "timestamp": self.last_timestamp, "close": self.last_close, "volume": self.last_volume}
+        for w in MA_WINDOWS:
+            result[f"MA{w}"] = self.ma_sums[w] / min(n, w)
+            result[f"prev_MA{w}"] = self.prev_ma[w]
+        result["VolumeMA20"] = self.volume_sum / min(n, VOLUME_MA_WINDOW)
+
+        k = min(n, RSI_WINDOW)
+        gain = max(self.gain_sum, 0.0) / k
+        loss = max(self.loss_sum, 0.0) / k
+        if loss > 1e-12:
+            result["RSI"] = 100 - (100 / (1 + gain / loss))
+        elif gain > 1e-12:
+            result["RSI"] = 100.0
+        else:
+            result["RSI"] = 50.0 # No movement in the window: neutral, like the fillna(50) in pandas
+
+        k = min(n, BB_WINDOW)
+        mean = self.bb_shift + self.bb_sum / k
+        std = math.sqrt(max(0.0, (self.bb_sum_sq - self.bb_sum * self.bb_sum / k) / (k - 1))) if k > 1 else 0.0
+        result["MA20_BB"] = mean
+        result["STD20_BB"] = std
+        result["Upper_BB"] = mean + std * BB_STD_MULTIPLIER
+        result["Lower_BB"] = mean - std * BB_STD_MULTIPLIER
+
+        result["EMA12"] = self.ema_fast
+        result["EMA26"] = self.ema_slow
+        result["MACD"] = self.ema_fast - self.ema_slow
+        result["Signal_Line"] = self.signal
+        return result
+
+    # --- Persistence ---
+
+    def to_dict(self):
+        data = dict(self.__dict__)
+        data["ma_sums"] = {str(w): v for w, v in self.ma_sums.items()}
+        data["prev_ma"] = {str(w): v for w, v in self.prev_ma.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        for key, value in data.items():
+            setattr(state, key, value)
+        state.ma_sums = {int(w): v for w, v in data["ma_sums"].items()}
+        state.prev_ma = {int(w): v for w, v in data["prev_ma"].items()}
+        return state
+
+    @classmethod
+    def from_history(cls, timestamps, closes, volumes):
+        """Builds the state by replaying a full history once."""
+        state = cls()
+        state.extend(timestamps, closes, volumes)
+        return state
+
+    def extend(self, timestamps, closes, volumes):
+        """Applies many bars; bars at or before the last applied timestamp (except a revision) are skipped."""
+        for timestamp, close, volume in zip(timestamps, closes, volumes):
+            if close is None or volume is None:
+                continue # Same as dropna(subset=["close", "volume"]) in the analyzer
+            self.update(timestamp, close, volume)
+        return self.snapshot()
+
+
+class IndicatorStateStore:
+    """Persists one IndicatorState per (ticker, interval) as a small JSON file."""
+
+    def __init__(self, directory=DEFAULT_STATE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.directory, f"{ticker}_{interval}.json")
+
+    def load(self, ticker, interval="1d"):
+        """Returns the stored state, or a fresh one if none exists yet."""
+        try:
+            with open(self._path(ticker, interval), "r", encoding="utf-8") as f:
+                return IndicatorState.from_dict(json.load(f))
+        except FileNotFoundError:
+            return IndicatorState()
+
+    def save(self, ticker, state, interval="1d"):
+        path = self._path(ticker, interval)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    def update_from_chart(self, ticker, stock_data_json, interval="1d", reset=False):
+        """Feeds the bars of a chart payload into the ticker's stored state; returns the new snapshot.
+
+        With reset=True the stored state is discarded and rebuilt from the payload alone.
+        """
+        chart_result = stock_data_json["chart"]["result"][0]
+        quote = (chart_result.get("indicators", {}).get("quote") or [{}])[0]
+        state = IndicatorState() if reset else self.load(ticker, interval)
+        snapshot = state.extend(chart_result.get("timestamp") or [], quote.get("close") or [], quote.get("volume") or [])
+        self.save(ticker, state, interval)
+        return snapshot
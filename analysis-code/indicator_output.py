@@ -0,0 +1,102 @@
+"""Columnar (Parquet / Arrow IPC) output of the technical indicators.
+
+`*_technical_indicators.csv` is full-precision text that every consumer has to
+parse back. The columnar formats store the same columns typed:
+
+- timestamp: int64 timestamp (seconds in Arrow IPC; milliseconds in Parquet, which has no seconds unit)
+- close, RSI, Upper_BB, Lower_BB, MACD, Signal_Line, MA20_BB: float32
+
+Formats:
+- "parquet": zstd-compressed Parquet, the smallest, with column statistics for predicate push-down
+- "arrow": uncompressed Arrow IPC (Feather v2), which readers can memory-map without a copy
+
+Instead of one file per ticker, write_indicator_dataset() adds each ticker to a single
+Hive-partitioned dataset (`<root>/ticker=PLTR/year=2025/part-0.parquet`), so a job
+over thousands of tickers can open it once and filter by ticker/date:
+
+    dataset = open_indicator_dataset("indicators")
+    table = dataset.to_table(filter=(pc.field("ticker") == "PLTR") & (pc.field("year") >= 2025))
+
+pyarrow is optional: it is only imported when one of these formats is requested.
+"""
+import os
+
+INDICATOR_FORMATS = ("csv", "parquet", "arrow")
+INDICATOR_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+PARQUET_COMPRESSION = "zstd"
+
+
+def require_pyarrow():
+    """Imports pyarrow, with an installation hint if it is missing."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("The parquet/arrow indicator output needs pyarrow (pip install pyarrow).") from e
+    return pyarrow
+
+def indicator_table(frame):
+    """Converts a technical indicator frame to a typed Arrow table."""
+    pa = require_pyarrow()
+    import numpy as np
+
+    arrays = [pa.array(frame.index.to_numpy(dtype="datetime64[s]"), type=pa.timestamp("s"))]
+    names = ["timestamp"]
+    for column in frame.columns:
+        arrays.append(pa.array(frame[column].to_numpy(dtype=np.float32)))
+        names.append(column)
+    return pa.Table.from_arrays(arrays, names=names)
+
+def write_indicators(frame, path, fmt):
+    """Writes one ticker's indicators to path as "csv", "parquet" or "arrow"."""
+    if fmt == "csv":
+        frame.to_csv(path)
+        return
+    table = indicator_table(frame)
+    _write_table(table, path, fmt)
+
+def _write_table(table, path, fmt):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression=PARQUET_COMPRESSION)
+    elif fmt == "arrow":
+        import pyarrow.feather as feather
+        # Uncompressed, so readers can memory-map the columns
+        feather.write_feather(table, path, compression="uncompressed")
+    else:
+        raise ValueError(f"Unsupported indicator format: {fmt}")
+
+def write_indicator_dataset(frame, ticker, root, fmt="parquet"):
+    """Replaces the ticker's partitions of the dataset under root with these indicators; returns the files written."""
+    pa = require_pyarrow()
+    import pyarrow.compute as pc
+
+    table = indicator_table(frame)
+    years = pc.year(table["timestamp"]).cast(pa.int16())
+    ticker_dir = os.path.join(root, f"ticker={ticker}")
+    written = []
+    # Each ticker only ever touches its own directory, so batch workers can write concurrently
+    for year in sorted(set(years.to_pylist())):
+        year_dir = os.path.join(ticker_dir, f"year={year}")
+        os.makedirs(year_dir, exist_ok=True)
+        path = os.path.join(year_dir, f"part-0{INDICATOR_EXTENSIONS[fmt]}")
+        # Dataset discovery skips dot files, so readers never see a half-written part
+        temp_path = os.path.join(year_dir, f".part-0.tmp.{os.getpid()}")
+        _write_table(table.filter(pc.equal(years, year)), temp_path, fmt)
+        os.replace(temp_path, path)
+        written.append(path)
+    # Years that dropped out of the window since the last run
+    if os.path.isdir(ticker_dir):
+        keep = {os.path.dirname(path) for path in written}
+        for entry in os.listdir(ticker_dir):
+            stale = os.path.join(ticker_dir, entry)
+            if stale not in keep and entry.startswith("year="):
+                for name in os.listdir(stale):
+                    os.remove(os.path.join(stale, name))
+                os.rmdir(stale)
+    return written
+
+def open_indicator_dataset(root, fmt="parquet"):
+    """Opens the partitioned indicator dataset under root (ticker and year become columns)."""
+    require_pyarrow()
+    import pyarrow.dataset as ds
+    return ds.dataset(root, format="ipc" if fmt == "arrow" else "parquet", partitioning="hive")
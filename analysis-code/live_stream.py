@@ -0,0 +1,428 @@
+"""Streaming analysis of a live tick or 1-minute bar feed.
+
+Instead of fetching a year of bars, analyzing and exiting, LiveAnalyzer consumes
+a feed of events for a watchlist and keeps the analysis of every symbol current:
+
+- ticks ({"ticker", "timestamp", "price", "size"}) and finer bars ({"ticker",
+  "timestamp", "open", "high", "low", "close", "volume"}) are folded into bars of
+  the chosen interval (bins counted from each session's first bar, as in resample.py)
+- each update feeds the bar into the symbol's IndicatorState (an in-progress bar
+  is revised, not appended), so MA20/50/200, VolumeMA20, RSI, Bollinger and MACD
+  cost O(1) per update
+- trend, golden/dead cross and volume wording come from the same signals.py rules
+  as analyze()
+- subscribers receive only what changed in the analysis_result sections
+  ("current_price", "technical_analysis", "volume_analysis", plus the latest
+  "technical_indicators" columns)
+
+    engine = LiveAnalyzer(interval="5m")
+    engine.subscribe(print, tickers=["PLTR"])
+    for event in chart_bar_feed(archived_charts(PayloadArchive(), run_id)):
+        engine.on_event(event)
+
+A delta looks like:
+
+    {"ticker": "PLTR", "timestamp": 1760621400, "new_bar": false,
+     "bar": {"open": 181.2, "high": 181.9, "low": 181.0, "close": 181.7, "volume": 84210},
+     "changes": {"current_price": {"price": 181.7, ...}, "technical_analysis": {"ma_20": ...}}}
+
+Everything runs on one thread; an update takes a few tens of microseconds, so one
+core keeps up with hundreds of symbols. Run it from the command line against the
+dummy ApiClient, an archived run or a JSON lines feed (see --help).
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) # Add repo root to path
+from data_api import ApiClient
+
+from chart_stream import decode_chart
+from indicator_engine import IndicatorState
+from payload_archive import PayloadArchive, DEFAULT_ARCHIVE_PATH
+from signals import (
+    TREND_LABELS, SHORT_CROSS_LABELS, LONG_CROSS_LABELS, SHORT_CROSS_MIN_BARS, LONG_CROSS_MIN_BARS,
+    CROSS_GOLDEN, CROSS_DEAD, trend_code, cross_code, volume_code, volume_label,
+)
+
+# Bar intervals the stream can aggregate to, in seconds
+STREAM_INTERVALS = {"1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800, "60m": 3600, "90m": 5400, "1h": 3600, "1d": 86400}
+DEFAULT_LATENCY_WINDOW = 100000
+
+
+class _LiveSymbol:
+    """Aggregation, indicator state and last published sections of one symbol."""
+
+    __slots__ = (
+        "ticker", "seconds", "utc_offset", "state", "day", "session_open", "key", "bar",
+        "prev_close", "day_high", "day_low", "day_volume", "published",
+    )
+
+    def __init__(self, ticker, seconds, utc_offset, state):
+        self.ticker = ticker
+        self.seconds = seconds
+        self.utc_offset = utc_offset
+        self.state = state
+        self.day = None # Local day number of the current session
+        self.session_open = None # Timestamp of the session's first event
+        self.key = None # Bin of the current bar
+        self.bar = None # [timestamp, open, high, low, close, volume] of the current bar
+        self.prev_close = None # Close of the bar before the current one
+        self.day_high = None
+        self.day_low = None
+        self.day_volume = 0.0 # Volume of the session's finished bars
+        self.published = {}
+
+    def add(self, timestamp, open_, high, low, close, volume):
+        """Folds an event into the current bar; returns whether it started a new bar (None if it was stale)."""
+        day = (timestamp + self.utc_offset) // 86400
+        if self.day is not None and day < self.day:
+            return None
+        new_day = day != self.day
+        if new_day:
+            self.day = day
+            self.session_open = timestamp
+            self.day_high = high
+            self.day_low = low
+            self.day_volume = 0.0
+        key = day if self.seconds >= 86400 else (day, (timestamp - self.session_open) // self.seconds)
+        bar = self.bar
+        if key == self.key:
+            if bar[2] < high:
+                bar[2] = high
+            if bar[3] > low:
+                bar[3] = low
+            bar[4] = close
+            bar[5] += volume
+            new_bar = False
+        else:
+            if self.key is not None and key < self.key:
+                return None
+            if bar is not None:
+                self.prev_close = bar[4]
+                if not new_day:
+                    self.day_volume += bar[5]
+            self.key = key
+            self.bar = [timestamp, open_, high, low, close, volume]
+            new_bar = True
+        if high > self.day_high:
+            self.day_high = high
+        if low < self.day_low:
+            self.day_low = low
+        return new_bar
+
+    def sections(self, snapshot):
+        """The streamed analysis_result sections for the current bar (indicator values from snapshot)."""
+        close, volume = self.bar[4], self.bar[5]
+        n = snapshot["count"]
+        prev_close = self.prev_close if self.prev_close is not None else close
+        price_change = close - prev_close
+        ma20, ma50, ma200 = snapshot["MA20"], snapshot["MA50"], snapshot["MA200"]
+        # The first bar has no previous MAs; like analyze(), it is compared with itself
+        prev_ma20 = snapshot["prev_MA20"] if snapshot["prev_MA20"] is not None else ma20
+        prev_ma50 = snapshot["prev_MA50"] if snapshot["prev_MA50"] is not None else ma50
+        prev_ma200 = snapshot["prev_MA200"] if snapshot["prev_MA200"] is not None else ma200
+        volume_ma20 = snapshot["VolumeMA20"]
+        volume_change_pct = ((volume / volume_ma20) - 1) * 100 if volume_ma20 else 0
+        return {
+            "current_price": {
+                "price": close,
+                "day_high": self.day_high,
+                "day_low": self.day_low,
+                "volume": int(self.day_volume + volume),
+                "prev_close": prev_close,
+                "price_change": price_change,
+                "price_change_pct": (price_change / prev_close) * 100 if prev_close else 0,
+            },
+            "technical_analysis": {
+                "ma_20": ma20,
+                "ma_50": ma50,
+                "ma_200": ma200,
+                "ma_cross_status": SHORT_CROSS_LABELS[cross_code(prev_ma20, prev_ma50, ma20, ma50, n >= SHORT_CROSS_MIN_BARS)],
+                "ma_long_cross_status": LONG_CROSS_LABELS[cross_code(prev_ma50, prev_ma200, ma50, ma200, n >= LONG_CROSS_MIN_BARS)],
+                "trend": TREND_LABELS[trend_code(close, ma20, ma50, ma200)],
+            },
+            "volume_analysis": {
+                "volume_latest": int(volume),
+                "volume_ma_20": int(volume_ma20),
+                "volume_change_pct": volume_change_pct,
+                "volume_analysis": volume_label(volume_code(volume, volume_ma20), volume, volume_ma20, volume_change_pct),
+            },
+            "technical_indicators": {
+                "RSI": snapshot["RSI"],
+                "Upper_BB": snapshot["Upper_BB"],
+                "Lower_BB": snapshot["Lower_BB"],
+                "MA20_BB": snapshot["MA20_BB"],
+                "MACD": snapshot["MACD"],
+                "Signal_Line": snapshot["Signal_Line"],
+            },
+        }
+
+
+class LiveAnalyzer:
+    """Keeps the streamed analysis of every symbol in a feed current and publishes the changes.
+
+    `interval` is the bar size to aggregate to; events must be no coarser than that.
+    `states` optionally maps tickers to an IndicatorState to continue from (e.g.
+    IndicatorStateStore().load(ticker, interval)), and `utc_offsets` maps tickers to
+    their exchange's meta["gmtoffset"], which decides where a session (day) starts.
+    Events older than a symbol's current bar are counted as stale and ignored.
+    """
+
+    def __init__(self, interval="1m", utc_offsets=None, states=None, latency_window=DEFAULT_LATENCY_WINDOW):
+        if interval not in STREAM_INTERVALS:
+            raise ValueError(f"Unsupported stream interval: {interval} (expected one of {', '.join(STREAM_INTERVALS)})")
+        self.interval = interval
+        self.seconds = STREAM_INTERVALS[interval]
+        self.utc_offsets = dict(utc_offsets or {})
+        self.states = dict(states or {})
+        self.symbols = {}
+        self.subscribers = []
+        self.updates = 0
+        self.published = 0
+        self.stale = 0
+        # Processing time of the most recent updates (ns), without the subscriber callbacks
+        self._latencies = deque(maxlen=latency_window)
+
+    def subscribe(self, callback, tickers=None):
+        """Calls callback(delta) for every published change, optionally only for some tickers."""
+        self.subscribers.append((callback, frozenset(tickers) if tickers is not None else None))
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers = [(cb, tickers) for cb, tickers in self.subscribers if cb is not callback]
+
+    def _symbol(self, ticker):
+        symbol = self.symbols.get(ticker)
+        if symbol is None:
+            state = self.states.pop(ticker, None) or IndicatorState()
+            symbol = _LiveSymbol(ticker, self.seconds, self.utc_offsets.get(ticker, 0), state)
+            self.symbols[ticker] = symbol
+        return symbol
+
+    def on_event(self, event):
+        """Applies one feed event (a tick if it has "price", a bar otherwise); returns the delta or None."""
+        if "price" in event:
+            return self.on_tick(event["ticker"], event["timestamp"], event["price"], event.get("size") or 0)
+        return self.on_bar(event["ticker"], event["timestamp"], event["open"], event["high"], event["low"], event["close"], event.get("volume") or 0)
+
+    def on_tick(self, ticker, timestamp, price, size=0):
+        """Applies one trade."""
+        return self.on_bar(ticker, timestamp, price, price, price, price, size)
+
+    def on_bar(self, ticker, timestamp, open_, high, low, close, volume=0):
+        """Applies one finished bar of the feed's interval; returns the published delta (None if nothing changed)."""
+        started = time.perf_counter_ns()
+        symbol = self._symbol(ticker)
+        new_bar = symbol.add(int(timestamp), float(open_), float(high), float(low), float(close), float(volume))
+        if new_bar is None:
+            self.stale += 1
+            return None
+        bar = symbol.bar
+        # Same timestamp as the last bar: IndicatorState revises it instead of appending
+        snapshot = symbol.state.update(bar[0], bar[4], bar[5])
+        changes = {}
+        published = symbol.published
+        for section, values in symbol.sections(snapshot).items():
+            previous = published.get(section)
+            if previous is None:
+                changed = values
+            else:
+                changed = {key: value for key, value in values.items() if previous[key] != value}
+            if changed:
+                changes[section] = changed
+                published[section] = values
+        self.updates += 1
+        if not changes:
+            self._latencies.append(time.perf_counter_ns() - started)
+            return None
+        delta = {
+            "ticker": ticker,
+            "timestamp": bar[0],
+            "new_bar": new_bar,
+            "bar": {"open": bar[1], "high": bar[2], "low": bar[3], "close": bar[4], "volume": bar[5]},
+            "changes": changes,
+        }
+        self._latencies.append(time.perf_counter_ns() - started)
+        self.published += 1
+        for callback, tickers in self.subscribers:
+            if tickers is None or ticker in tickers:
+                callback(delta)
+        return delta
+
+    def run(self, feed):
+        """Applies every event of an iterable feed; returns the number of events."""
+        events = 0
+        for event in feed:
+            self.on_event(event)
+            events += 1
+        return events
+
+    def result(self, ticker):
+        """The full streamed sections of a ticker (what a new subscriber starts from), or None."""
+        symbol = self.symbols.get(ticker)
+        if symbol is None or not symbol.published:
+            return None
+        return {section: dict(values) for section, values in symbol.published.items()}
+
+    def stats(self):
+        """Update counts and per-update processing latency percentiles (microseconds)."""
+        stats = {"symbols": len(self.symbols), "updates": self.updates, "published": self.published, "stale": self.stale}
+        if self._latencies:
+            ordered = sorted(self._latencies)
+            for name, fraction in (("p50_us", 0.50), ("p99_us", 0.99)):
+                # Nearest-rank percentile
+                stats[name] = round(ordered[max(0, math.ceil(fraction * len(ordered)) - 1)] / 1000, 1)
+            stats["max_us"] = round(ordered[-1] / 1000, 1)
+        return stats
+
+
+# --- Feeds ---
+
+def _chart_bars(ticker, stock_data_json):
+    """(timestamp, ticker, event) for every complete bar of a chart payload."""
+    if not stock_data_json or not stock_data_json.get("chart", {}).get("result"):
+        return
+    result = stock_data_json["chart"]["result"][0]
+    quote = (result.get("indicators", {}).get("quote") or [{}])[0] or {}
+    timestamps = result.get("timestamp")
+    if timestamps is None or not quote:
+        return
+    for timestamp, open_, high, low, close, volume in zip(timestamps, quote["open"], quote["high"], quote["low"], quote["close"], quote["volume"]):
+        # Missing bars are None (json.loads) or NaN (decode_chart)
+        if close is None or close != close or open_ is None or open_ != open_:
+            continue
+        timestamp = int(timestamp)
+        yield timestamp, ticker, {
+            "ticker": ticker,
+            "timestamp": timestamp,
+            "open": float(open_),
+            "high": float(high),
+            "low": float(low),
+            "close": float(close),
+            "volume": float(volume) if volume is not None and volume == volume else 0.0,
+        }
+
+def chart_bar_feed(charts):
+    """Replays the bars of several chart payloads ({ticker: payload}) as one feed in timestamp order."""
+    merged = heapq.merge(*(_chart_bars(ticker, payload) for ticker, payload in charts.items()), key=lambda item: item[:2])
+    for _, _, event in merged:
+        yield event
+
+def archived_charts(archive, run_id, tickers=None):
+    """The chart payloads of an archived run as {ticker: payload} (the last one per ticker)."""
+    charts = {}
+    for entry in archive.manifest(run_id):
+        if entry["endpoint"] == "chart" and (tickers is None or entry["ticker"] in tickers):
+            charts[entry["ticker"]] = decode_chart(archive.get(entry["digest"]))
+    return charts
+
+def jsonl_feed(lines):
+    """Events from JSON lines (one tick or bar object per line)."""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+def utc_offsets(charts):
+    """Each ticker's meta["gmtoffset"] from chart payloads."""
+    offsets = {}
+    for ticker, payload in charts.items():
+        if payload and payload.get("chart", {}).get("result"):
+            offsets[ticker] = payload["chart"]["result"][0].get("meta", {}).get("gmtoffset") or 0
+    return offsets
+
+
+# --- Command line ---
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Stream a tick/bar feed through the incremental analysis")
+    parser.add_argument("--tickers", default="PLTR", help="Comma-separated watchlist (default: PLTR); with --replay/--feed, limits the feed to these (use 'all' for every ticker)")
+    parser.add_argument("--interval", choices=STREAM_INTERVALS, default="1m", help="Bar interval to aggregate the feed to (default: 1m)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--replay", metavar="RUN_ID", help="Replay the chart payloads of an archived run ('latest' for the most recent)")
+    source.add_argument("--feed", metavar="PATH", help="Read tick/bar events from a JSON lines file ('-' for stdin)")
+    parser.add_argument("--archive-path", default=DEFAULT_ARCHIVE_PATH, help=f"Payload archive for --replay (default: {DEFAULT_ARCHIVE_PATH})")
+    parser.add_argument("--source-interval", default="1m", help="Bar interval the dummy ApiClient replays (default: 1m)")
+    parser.add_argument("--range", dest="range_str", default="5d", help="Range the dummy ApiClient replays (default: 5d)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the dummy ApiClient")
+    parser.add_argument("--output", default=None, help="Write every published delta to this JSON lines file ('-' for stdout)")
+    return parser.parse_args()
+
+def load_feed(args, tickers):
+    """Returns (feed, utc_offsets) for the source selected on the command line."""
+    if args.feed:
+        lines = sys.stdin if args.feed == "-" else open(args.feed, "r", encoding="utf-8")
+        feed = jsonl_feed(lines)
+        if tickers is not None:
+            feed = (event for event in feed if event["ticker"] in tickers)
+        return feed, {}
+    if args.replay:
+        archive = PayloadArchive(args.archive_path)
+        runs = archive.runs()
+        run_id = runs[-1] if args.replay == "latest" and runs else args.replay
+        if run_id not in runs:
+            raise ValueError(f"No archived run {args.replay} in {args.archive_path}")
+        print(f"Replaying the chart payloads of archived run {run_id}")
+        charts = archived_charts(archive, run_id, tickers)
+    else:
+        api_client = ApiClient(seed=args.seed, latency=False)
+        print(f"Replaying dummy {args.source_interval} bars ({args.range_str}) for {len(tickers)} tickers")
+        charts = {ticker: decode_chart(api_client.get_stock_chart_raw(ticker, args.source_interval, args.range_str)) for ticker in tickers}
+    return chart_bar_feed(charts), utc_offsets(charts)
+
+def main():
+    args = parse_arguments()
+    tickers = None if args.tickers == "all" else [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    if tickers is None and not (args.replay or args.feed):
+        print("Error: --tickers all needs --replay or --feed.")
+        sys.exit(1)
+    try:
+        feed, offsets = load_feed(args, tickers)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    engine = LiveAnalyzer(args.interval, utc_offsets=offsets)
+
+    def report_cross(delta):
+        # Golden/dead crosses are worth a line even without --output
+        technical = delta["changes"].get("technical_analysis", {})
+        for key, labels in (("ma_cross_status", SHORT_CROSS_LABELS), ("ma_long_cross_status", LONG_CROSS_LABELS)):
+            if technical.get(key) in (labels[CROSS_GOLDEN], labels[CROSS_DEAD]):
+                when = time.strftime("%Y-%m-%d %H:%M", time.gmtime(delta["timestamp"] + engine.utc_offsets.get(delta["ticker"], 0)))
+                print(f"{when} {delta['ticker']}: {technical[key]}")
+    engine.subscribe(report_cross)
+
+    output = None
+    if args.output:
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        engine.subscribe(lambda delta: output.write(json.dumps(delta, ensure_ascii=False) + "\n"))
+
+    start = time.perf_counter()
+    try:
+        events = engine.run(feed)
+    except KeyboardInterrupt:
+        events = None
+        print("Stream interrupted.")
+    finally:
+        if output is not None and output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+
+    stats = engine.stats()
+    if events is not None:
+        print(f"Processed {events} events in {elapsed:.2f}s")
+    print(
+        f"{stats['symbols']} symbols, {stats['updates']} updates, {stats['published']} deltas published, {stats['stale']} stale events"
+        + (f"; per update p50 {stats['p50_us']}us, p99 {stats['p99_us']}us, max {stats['max_us']}us" if "p50_us" in stats else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Lightweight instrumentation: stage spans, counters and their exporters.
+
+Stages are wrapped in `span("stage", ...)`, which records the wall time in a
+histogram (so dashboards can derive p50/p99 with histogram_quantile), counts
+failures by exception type and, if a log is configured, appends one JSON line
+per span. Counters cover cache hits/misses, API retries and failures.
+
+Exports:
+- JSON lines: configure(log_path=...) appends every span/event as it happens
+- Prometheus text format: render_prometheus() / write_prometheus(path), and the
+  /metrics route of analysis_server.py
+
+Worker processes keep their own registry; hand drain() snapshots back to the
+parent and merge() them there. Only the standard library is used.
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+NAMESPACE = "stock_analysis"
+
+# Histogram bucket upper bounds in seconds (+Inf is implicit)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    "stage_duration_seconds": "Wall time of a pipeline stage.",
+    "stage_failures_total": "Pipeline stages that raised, by exception type.",
+    "api_cache_requests_total": "API response cache lookups by result (hit/miss).",
+    "api_requests_total": "API requests sent, including retries.",
+    "api_retries_total": "API requests retried after a transient error.",
+    "api_failures_total": "API requests that failed for good.",
+    "http_request_duration_seconds": "Analysis server request latency.",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms plus an optional JSON lines log."""
+
+    def __init__(self, namespace=NAMESPACE, buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {} # (name, labels) -> value
+        self._histograms = {} # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self._log = None
+        self._log_path = None
+
+    def configure_log(self, path):
+        """Appends every span/event to path as JSON lines (None disables the log)."""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            self._log, self._log_path = None, path
+            if path:
+                directory = os.path.dirname(os.path.abspath(path))
+                os.makedirs(directory, exist_ok=True)
+                # Line buffered + O_APPEND: each record is a single write, so worker processes can share the file
+                self._log = open(path, "a", buffering=1, encoding="utf-8")
+
+    def incr(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[index] += 1
+                    break
+            else:
+                histogram[len(self.buckets)] += 1
+            histogram[-1] += value
+
+    def event(self, kind, **fields):
+        """Writes one record to the JSON lines log (no-op without a log)."""
+        if self._log is None:
+            return
+        record = {"ts": round(time.time(), 6), "type": kind, "pid": os.getpid()}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._log is not None:
+                self._log.write(line)
+
+    @contextlib.contextmanager
+    def span(self, stage, ticker=None, **labels):
+        """Times the enclosed block as `stage`; exceptions are counted and re-raised.
+
+        `labels` become Prometheus labels (keep them low-cardinality); the ticker only
+        goes to the JSON lines log.
+        """
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            self.incr("stage_failures_total", stage=stage, error=error, **labels)
+            raise
+        finally:
+            duration = time.perf_counter() - wall_start
+            self.observe("stage_duration_seconds", duration, stage=stage, **labels)
+            self.event(
+                "span", stage=stage, ticker=ticker, labels=labels or None,
+                duration_seconds=round(duration, 6), cpu_seconds=round(time.thread_time() - cpu_start, 6),
+                status="error" if error else "ok", error=error,
+            )
+
+    def snapshot(self):
+        """Returns a picklable copy of all counters and histograms."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {key: list(values) for key, values in self._histograms.items()},
+            }
+
+    def drain(self):
+        """Returns a snapshot and resets the registry (for handing worker metrics to the parent)."""
+        with self._lock:
+            snapshot = {"counters": self._counters, "histograms": self._histograms}
+            self._counters, self._histograms = {}, {}
+        return snapshot
+
+    def merge(self, snapshot):
+        """Adds a snapshot (e.g. from a worker process) into this registry."""
+        with self._lock:
+            for key, value in snapshot["counters"].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, values in snapshot["histograms"].items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    self._histograms[key] = list(values)
+                else:
+                    for index, value in enumerate(values):
+                        histogram[index] += value
+
+    def stage_summary(self):
+        """Returns {stage: {"count", "total_seconds", "p50_seconds", "p99_seconds"}} from the histograms.
+
+        Percentiles are bucket upper bounds, like histogram_quantile without interpolation.
+        """
+        summary = {}
+        with self._lock:
+            histograms = {key: list(values) for key, values in self._histograms.items() if key[0] == "stage_duration_seconds"}
+        merged = {}
+        for (_, labels), values in histograms.items():
+            stage = dict(labels)["stage"]
+            totals = merged.setdefault(stage, [0] * len(values))
+            for index, value in enumerate(values):
+                totals[index] += value
+        for stage, values in merged.items():
+            counts, total = values[:-1], values[-1]
+            count = sum(counts)
+            summary[stage] = {
+                "count": count,
+                "total_seconds": round(total, 4),
+                "p50_seconds": self._bucket_quantile(counts, 0.50),
+                "p99_seconds": self._bucket_quantile(counts, 0.99),
+            }
+        return summary
+
+    def _bucket_quantile(self, counts, fraction):
+        # None means "above the largest bucket" (keeps the summary valid JSON)
+        target = fraction * sum(counts)
+        running = 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            if running >= target:
+                return bound
+        return None
+
+    def render_prometheus(self):
+        """Renders all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        by_name = {}
+        for (name, labels), value in snapshot["counters"].items():
+            by_name.setdefault(name, ("counter", []))[1].append((labels, value))
+        for (name, labels), values in snapshot["histograms"].items():
+            by_name.setdefault(name, ("histogram", []))[1].append((labels, values))
+
+        for name in sorted(by_name):
+            kind, series = by_name[name]
+            full_name = f"{self.namespace}_{name}"
+            if name in HELP:
+                lines.append(f"# HELP {full_name} {HELP[name]}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in sorted(series):
+                if kind == "counter":
+                    lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), value[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(value[-1])}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Writes the Prometheus text to path atomically (for node_exporter's textfile collector)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp.{os.getpid()}"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(temp_path, path)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def timed(stage, **labels):
+    """Decorator form of span() for the default registry; a `ticker` keyword argument is logged."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with METRICS.span(stage, ticker=kwargs.get("ticker"), **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Process-wide default registry used by the pipeline
+METRICS = MetricsRegistry()
+span = METRICS.span
+incr = METRICS.incr
+event = METRICS.event
+
+def configure(log_path=None):
+    """Sets up the default registry's JSON lines log."""
+    METRICS.configure_log(log_path)
+
+def init_worker(log_path=None):
+    """Process pool initializer: drops metrics inherited through fork, then configures the log."""
+    METRICS.drain()
+    METRICS.configure_log(log_path)
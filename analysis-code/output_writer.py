@@ -0,0 +1,116 @@
+"""Atomic, skip-if-unchanged writing of the per-ticker outputs.
+
+The front end (and the Vite dev server watching public/) reads the outputs while
+a run writes them, so every file is written under a temporary dot-name in the
+same directory and renamed over the old one; readers see the old file or the new
+one, never a partial write. A file whose new content is byte-identical to the
+current one is left untouched (same mtime, no reload in the browser).
+
+Outputs that are expensive to produce (chart image, chart data, indicators) are
+also keyed by a fingerprint of their inputs: the OHLCV bars plus the parameters
+that shape the output. FingerprintStore remembers the fingerprint each output was
+last generated from, so a rerun over unchanged bars skips the work altogether:
+
+    fingerprint = bars_fingerprint(df, "chart", fmt="png", dpi=100)
+    if not fingerprints.is_current(path, fingerprint):
+        ... write path ...
+        fingerprints.record(path, fingerprint)
+"""
+import contextlib
+import hashlib
+import json
+import os
+
+DEFAULT_FINGERPRINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "output_fingerprints")
+# Part of every fingerprint; bump it when a change to the code alters the outputs
+OUTPUT_VERSION = 1
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def _temp_path(path):
+    directory, name = os.path.split(path)
+    # Dot files are skipped by the dev server's file watcher and by dataset discovery
+    return os.path.join(directory, f".{name}.tmp.{os.getpid()}")
+
+def _same_content(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+def write_bytes(path, data):
+    """Atomically replaces path with data unless it already holds exactly that; returns whether it was written."""
+    if _same_content(path, data):
+        return False
+    temp_path = _temp_path(path)
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return True
+
+@contextlib.contextmanager
+def atomic_path(path):
+    """Yields a temporary path to write to; on success it replaces path, unless the content came out identical."""
+    temp_path = _temp_path(path)
+    try:
+        yield temp_path
+        with open(temp_path, "rb") as f:
+            unchanged = _same_content(path, f.read())
+        if unchanged:
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def bars_fingerprint(df, output, **params):
+    """Hex digest identifying an output generated from the OHLCV bars of df with the given parameters."""
+    import numpy as np
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"version": OUTPUT_VERSION, "output": output, "params": params}, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(df.index.to_numpy(dtype="datetime64[ns]").astype(np.int64).tobytes())
+    for column in BAR_COLUMNS:
+        if column in df.columns:
+            values = df[column].to_numpy()
+            digest.update(f"{column}:{values.dtype}".encode("utf-8"))
+            digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+class FingerprintStore:
+    """Remembers which input fingerprint each output file was generated from.
+
+    One small JSON file per output under root, so batch workers (each writing its
+    own tickers) never contend. An output only counts as current while the file is
+    still the one that was recorded (same size and mtime).
+    """
+
+    def __init__(self, root=DEFAULT_FINGERPRINT_DIR):
+        self.root = root
+
+    def _record_path(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest() # nosec B324 (a file name, not security)
+        return os.path.join(self.root, f"{key}.json")
+
+    def is_current(self, path, fingerprint):
+        """Whether path exists and was generated from fingerprint."""
+        try:
+            with open(self._record_path(path), "r", encoding="utf-8") as f:
+                record = json.load(f)
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            return False
+        return record.get("fingerprint") == fingerprint and record.get("size") == stat.st_size and record.get("mtime_ns") == stat.st_mtime_ns
+
+    def record(self, path, fingerprint):
+        """Records that path now holds the output of fingerprint."""
+        stat = os.stat(path)
+        os.makedirs(self.root, exist_ok=True)
+        record = {"path": os.path.abspath(path), "fingerprint": fingerprint, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        write_bytes(self._record_path(path), json.dumps(record).encode("utf-8"))
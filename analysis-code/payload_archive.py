@@ -0,0 +1,247 @@
+"""Compressed, append-only archive of the raw API payloads.
+
+Each fetched payload is stored once, compressed, under the SHA-256 of its JSON
+bytes, and every run appends one manifest line per payload to a date-partitioned
+run file:
+
+    <root>/objects/3f/3fa2...e1.json.gz          gzip, or .json.zst with the zstandard package
+    <root>/runs/2026-10-18/20261018T031500-4242.jsonl
+        {"ticker": "PLTR", "endpoint": "chart", "interval": "1d", "range": "1y",
+         "digest": "3fa2...e1", "size": 48211, "fetched_at": "2026-10-18T03:15:02"}
+
+Payloads that didn't change since an earlier run (holders, insights, a chart
+without new bars) are not written again, only referenced. Any past run can be read
+back with manifest()/replay(), or re-analyzed through ReplayApiClient:
+
+    archive = PayloadArchive()
+    client = ReplayApiClient(archive, archive.runs()[-1])
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_ARCHIVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".archive")
+CODEC_EXTENSIONS = {"zstd": ".json.zst", "gzip": ".json.gz"}
+ZSTD_LEVEL = 10
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+def default_codec():
+    """zstd if the zstandard package is installed, gzip otherwise."""
+    return "zstd" if _zstandard() is not None else "gzip"
+
+def _compress(data, codec):
+    if codec == "zstd":
+        return _zstandard().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    # mtime=0 keeps the output identical for identical payloads
+    return gzip.compress(data, mtime=0)
+
+def _decompress(data, codec):
+    if codec == "zstd":
+        zstandard = _zstandard()
+        if zstandard is None:
+            raise ImportError("This archive object is zstd-compressed; reading it needs zstandard (pip install zstandard).")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+def _run_date(run_id):
+    """The date partition of a run id ("20261018T031500-4242" -> "2026-10-18")."""
+    return f"{run_id[0:4]}-{run_id[4:6]}-{run_id[6:8]}"
+
+
+class PayloadArchive:
+    """Content-addressed store of compressed payloads plus per-run manifests (see the module docstring)."""
+
+    def __init__(self, root=DEFAULT_ARCHIVE_PATH, codec=None):
+        if codec is not None and codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unsupported archive codec: {codec} (expected one of {', '.join(CODEC_EXTENSIONS)})")
+        self.root = root
+        self.codec = codec or default_codec()
+        self.objects_written = 0
+        self.objects_reused = 0
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest, codec):
+        return os.path.join(self.root, "objects", digest[:2], digest + CODEC_EXTENSIONS[codec])
+
+    def _find_object(self, digest):
+        """(path, codec) of a stored object in any codec, or None."""
+        for codec in CODEC_EXTENSIONS:
+            path = self._object_path(digest, codec)
+            if os.path.exists(path):
+                return path, codec
+        return None
+
+    def put(self, data):
+        """Stores JSON bytes unless they are already archived; returns their digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        if self._find_object(digest) is not None:
+            with self._lock:
+                self.objects_reused += 1
+            return digest
+        path = self._object_path(digest, self.codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name, so a reader never sees a partial object
+        temp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(temp_path, "wb") as f:
+            f.write(_compress(data, self.codec))
+        os.replace(temp_path, path)
+        with self._lock:
+            self.objects_written += 1
+        return digest
+
+    def get(self, digest):
+        """The JSON bytes stored under digest (KeyError if there is no such object)."""
+        found = self._find_object(digest)
+        if found is None:
+            raise KeyError(f"No archived payload {digest}")
+        path, codec = found
+        with open(path, "rb") as f:
+            return _decompress(f.read(), codec)
+
+    def open_run(self, run_id=None):
+        """Starts a new run (named after the current time by default) and returns its ArchiveRun."""
+        run_id = run_id or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        return ArchiveRun(self, run_id)
+
+    def _manifest_path(self, run_id):
+        return os.path.join(self.root, "runs", _run_date(run_id), f"{run_id}.jsonl")
+
+    def runs(self):
+        """The ids of every archived run, oldest first."""
+        runs_dir = os.path.join(self.root, "runs")
+        if not os.path.isdir(runs_dir):
+            return []
+        run_ids = []
+        for date in os.listdir(runs_dir):
+            for name in os.listdir(os.path.join(runs_dir, date)):
+                if name.endswith(".jsonl"):
+                    run_ids.append(name[:-len(".jsonl")])
+        return sorted(run_ids)
+
+    def manifest(self, run_id):
+        """The manifest entries (dicts) of a run, in the order they were archived."""
+        entries = []
+        with open(self._manifest_path(run_id), "r", encoding="utf-8") as f:
+            for line in f:
+                # A run that was killed may have left a partial last line
+                if line.endswith("\n"):
+                    entries.append(json.loads(line))
+        return entries
+
+    def replay(self, run_id):
+        """Yields (entry, payload) for every payload of a run, with the payload decoded."""
+        for entry in self.manifest(run_id):
+            yield entry, json.loads(self.get(entry["digest"]))
+
+
+class ArchiveRun:
+    """The manifest of one run; add() is safe to call from several threads."""
+
+    def __init__(self, archive, run_id):
+        self.archive = archive
+        self.run_id = run_id
+        self.path = archive._manifest_path(run_id)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def add(self, ticker, endpoint, data, interval="", range_str="", analysis_interval=None):
+        """Archives one payload (JSON bytes) and records it in the run's manifest; returns its digest.
+
+        `interval` is the one the payload was fetched at; a chart resampled for the analysis
+        also records the `analysis_interval` it was resampled to.
+        """
+        digest = self.archive.put(data)
+        entry = {
+            "ticker": ticker,
+            "endpoint": endpoint,
+            "interval": interval,
+            "range": range_str,
+            "digest": digest,
+            "size": len(data),
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        if analysis_interval and analysis_interval != interval:
+            entry["analysis_interval"] = analysis_interval
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+        return digest
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayApiClient:
+    """Serves the payloads of an archived run in place of an ApiClient.
+
+    Requests the run didn't archive raise LookupError, which fetch() reports like a failed call.
+    """
+
+    def __init__(self, archive, run_id):
+        self.archive = archive
+        self.run_id = run_id
+        self._digests = {}
+        self._analysis_intervals = {}
+        self._chart_params = None
+        for entry in archive.manifest(run_id):
+            key = (entry["endpoint"], entry["ticker"], entry["interval"], entry["range"])
+            self._digests[key] = entry["digest"]
+            if entry["endpoint"] == "chart":
+                self._analysis_intervals[key] = entry.get("analysis_interval", entry["interval"])
+                if self._chart_params is None:
+                    self._chart_params = (self._analysis_intervals[key], entry["range"])
+
+    def chart_params(self):
+        """(interval, range) the run analyzed its first archived chart at, or None if it has none."""
+        return self._chart_params
+
+    def _load(self, endpoint, ticker, interval="", range_str=""):
+        digest = self._digests.get((endpoint, ticker, interval, range_str))
+        if digest is None:
+            if endpoint != "chart":
+                raise LookupError(f"Run {self.run_id} has no {endpoint} payload for {ticker}")
+            archived = [
+                f"{key[2]}/{key[3]}" + (f" for {analysis_interval}" if analysis_interval != key[2] else "")
+                for key, analysis_interval in self._analysis_intervals.items() if key[1] == ticker
+            ]
+            raise LookupError(
+                f"Run {self.run_id} has no chart payload for {ticker} at {interval}/{range_str}"
+                f" (archived: {', '.join(archived) if archived else 'none'})"
+            )
+        return self.archive.get(digest)
+
+    def get_stock_chart(self, ticker, interval="1d", range="1y"):
+        return json.loads(self._load("chart", ticker, interval, range))
+
+    def get_stock_chart_raw(self, ticker, interval="1d", range="1y"):
+        return self._load("chart", ticker, interval, range)
+
+    def get_stock_insights(self, ticker):
+        return json.loads(self._load("insights", ticker))
+
+    def get_stock_holders(self, ticker):
+        return json.loads(self._load("holders", ticker))
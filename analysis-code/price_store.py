@@ -0,0 +1,162 @@
+"""Memory-mapped columnar OHLCV store shared by batch worker processes.
+
+Instead of pickling every chart payload to a worker, which then decodes the
+`indicators.quote` lists into its own pandas copy, the batch parent appends each
+ticker's bars to one flat file per column:
+
+    <path>/timestamp.i8  int64 epoch seconds
+    <path>/open.f8 ... volume.f8  float64 (missing values are NaN)
+    <path>/index.json    {ticker: {"offset", "length", "meta"}} written on close()
+
+Workers receive a small PriceSlice (file path, offset, length and the chart meta)
+and memory-map just that range, so the bars are read zero-copy from the shared
+page cache and memory doesn't grow with the number of workers. There is one
+writer (the batch parent); any number of processes can read, including while the
+store is still being written, since a slice only covers bytes already flushed.
+
+    store = PriceStore.open("prices")
+    bars = store.slice("PLTR").columns()   # {"timestamp": memmap, "close": memmap, ...}
+"""
+import json
+import os
+
+# numpy and pandas are imported where they are used, so importing this module stays cheap
+COLUMNS = {"timestamp": "<i8", "open": "<f8", "high": "<f8", "low": "<f8", "close": "<f8", "volume": "<f8"}
+INDEX_FILE = "index.json"
+
+
+def _column_path(path, column):
+    return os.path.join(path, f"{column}.{COLUMNS[column][1:]}")
+
+
+class PriceSlice:
+    """One ticker's bars in a PriceStore; cheap to pickle and to hand to a worker process."""
+
+    def __init__(self, path, ticker, offset, length, meta, integer_volume=False):
+        self.path = path
+        self.ticker = ticker
+        self.offset = offset
+        self.length = length
+        self.meta = meta
+        # The JSON path gives pandas an int64 volume column when no volume is missing
+        self.integer_volume = integer_volume
+
+    def columns(self):
+        """Read-only NumPy views of every column, memory-mapped from the store files."""
+        import numpy as np
+        if self.length == 0:
+            return {column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+        return {
+            column: np.memmap(_column_path(self.path, column), dtype=dtype, mode="r", offset=self.offset * np.dtype(dtype).itemsize, shape=(self.length,))
+            for column, dtype in COLUMNS.items()
+        }
+
+    def frame(self):
+        """The OHLCV DataFrame build_price_frame() would build from the chart payload."""
+        import numpy as np
+        import pandas as pd
+
+        columns = self.columns()
+        if self.length == 0:
+            return pd.DataFrame()
+        # Ensure essential data is present; rows are only dropped (copied) when something is missing
+        missing = np.isnan(columns["close"]) | np.isnan(columns["volume"])
+        keep = slice(None) if not missing.any() else ~missing
+        volume = columns["volume"][keep]
+        df = pd.DataFrame(
+            {
+                "open": columns["open"][keep],
+                "high": columns["high"][keep],
+                "low": columns["low"][keep],
+                "close": columns["close"][keep],
+                "volume": volume.astype(np.int64) if self.integer_volume else volume,
+            },
+            # Epoch seconds reinterpreted as datetime64[s], the unit to_datetime(unit="s") gives
+            index=pd.DatetimeIndex(columns["timestamp"][keep].view("datetime64[s]"), name="timestamp"),
+            copy=False,
+        )
+        return df
+
+
+class PriceStore:
+    """Append-only columnar OHLCV store (see the module docstring)."""
+
+    def __init__(self, path, index=None, writable=False):
+        self.path = path
+        self.index = index or {}
+        self._files = None
+        self._length = 0
+        if writable:
+            os.makedirs(path, exist_ok=True)
+            # A new store replaces whatever was there
+            self._files = {column: open(_column_path(path, column), "wb") for column in COLUMNS}
+
+    @classmethod
+    def create(cls, path):
+        """Starts a new, empty store at path for writing."""
+        return cls(path, writable=True)
+
+    @classmethod
+    def open(cls, path):
+        """Opens a closed store for reading."""
+        with open(os.path.join(path, INDEX_FILE), "r", encoding="utf-8") as f:
+            return cls(path, index=json.load(f))
+
+    def append(self, ticker, stock_data_json):
+        """Adds a ticker's bars from a chart payload and returns its PriceSlice (readable right away)."""
+        import numpy as np
+        if self._files is None:
+            raise ValueError(f"Price store {self.path} is not open for writing")
+        meta, timestamps, quote = {}, [], {}
+        if stock_data_json and stock_data_json.get("chart", {}).get("result"):
+            result = stock_data_json["chart"]["result"][0]
+            meta = result.get("meta", {})
+            timestamps = result.get("timestamp")
+            timestamps = [] if timestamps is None else timestamps
+            quote = (result.get("indicators", {}).get("quote") or [{}])[0] or {}
+        if not quote:
+            timestamps = []
+
+        length = len(timestamps)
+        arrays = {"timestamp": np.asarray(timestamps, dtype=COLUMNS["timestamp"])}
+        for column in ("open", "high", "low", "close", "volume"):
+            values = quote.get(column)
+            # None (a missing bar) becomes NaN
+            arrays[column] = np.asarray(values, dtype=COLUMNS[column]) if values is not None else np.full(length, np.nan)
+        volume = arrays["volume"]
+        integer_volume = bool(length) and not np.isnan(volume).any() and bool((volume == np.floor(volume)).all())
+
+        for column, values in arrays.items():
+            self._files[column].write(values.tobytes())
+            # Flushed before the slice is handed out, so readers see the bytes
+            self._files[column].flush()
+        entry = {"offset": self._length, "length": length, "meta": meta, "integer_volume": integer_volume}
+        self.index[ticker] = entry
+        self._length += length
+        return self.slice(ticker)
+
+    def slice(self, ticker):
+        """The PriceSlice of a stored ticker (KeyError if it isn't stored)."""
+        entry = self.index[ticker]
+        return PriceSlice(self.path, ticker, entry["offset"], entry["length"], entry["meta"], entry.get("integer_volume", False))
+
+    def tickers(self):
+        return list(self.index)
+
+    def close(self):
+        """Finishes writing: closes the column files and writes the ticker index."""
+        if self._files is None:
+            return
+        for f in self._files.values():
+            f.close()
+        self._files = None
+        temp_path = os.path.join(self.path, f"{INDEX_FILE}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(temp_path, os.path.join(self.path, INDEX_FILE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,97 @@
+"""Coarser OHLCV bars derived from finer ones.
+
+The chart API serves each interval separately, but weekly, monthly and quarterly
+bars are fully determined by the daily bars (and 15m-1h bars by 5m bars).
+fetch() therefore requests the source interval from SOURCE_INTERVALS and
+aggregates it here: open = first, high = max, low = min, close = last and
+volume = sum per period. With the response cache or the bar store, a weekly 10y
+view after a daily 10y run needs no API call at all.
+
+Periods follow the exchange's local calendar (meta["gmtoffset"]): weeks start on
+Monday, months on the 1st, quarters in January/April/July/October, and intraday
+bins are counted from each session's first bar (a 1h bar covers 9:30-10:30).
+Each output bar carries the timestamp of its first source bar.
+"""
+# Intervals and ranges the chart API accepts (the ranges are meta["validRanges"])
+INTERVALS = ("1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "1d", "1wk", "1mo", "3mo")
+RANGES = ("1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max")
+
+# Interval to fetch for each derived interval
+SOURCE_INTERVALS = {
+    "2m": "1m",
+    "15m": "5m", "30m": "5m", "60m": "5m", "90m": "5m", "1h": "5m",
+    "1wk": "1d", "1mo": "1d", "3mo": "1d",
+}
+_INTRADAY_SECONDS = {"2m": 120, "15m": 900, "30m": 1800, "60m": 3600, "90m": 5400, "1h": 3600}
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def source_interval(interval):
+    """The interval fetch() requests to build `interval` bars (the interval itself if it isn't derived)."""
+    return SOURCE_INTERVALS.get(interval, interval)
+
+def period_keys(timestamps, interval, utc_offset=0):
+    """Integer key of the `interval` period each bar falls in; consecutive equal keys form one output bar."""
+    import numpy as np
+
+    local = np.asarray(timestamps, dtype=np.int64) + utc_offset
+    days = local // 86400
+    if interval == "1wk":
+        # Day 0 of the epoch was a Thursday, so this makes weeks start on Monday
+        return (days + 3) // 7
+    if interval in ("1mo", "3mo"):
+        months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        return months if interval == "1mo" else months // 3
+    seconds = _INTRADAY_SECONDS[interval]
+    # Bins are counted from the first bar of each session
+    session_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    session_open = np.repeat(local[session_starts], np.diff(np.r_[session_starts, len(local)]))
+    return days * 86400 + (local - session_open) // seconds
+
+def resample_bars(timestamps, bars, interval, utc_offset=0):
+    """Aggregates ascending OHLCV bars ({"open": ..., "volume": array}) to interval; returns (timestamps, bars)."""
+    import numpy as np
+
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    # None (a missing bar) becomes NaN
+    columns = {column: np.asarray(bars[column], dtype=np.float64) for column in OHLCV_COLUMNS}
+    integer_volume = np.asarray(bars["volume"]).dtype.kind in "iu"
+    # Bars without a close neither open nor close a period
+    keep = ~np.isnan(columns["close"])
+    if not keep.all():
+        timestamps = timestamps[keep]
+        columns = {column: values[keep] for column, values in columns.items()}
+    if len(timestamps) == 0:
+        return timestamps, columns
+
+    keys = period_keys(timestamps, interval, utc_offset)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    volume = np.add.reduceat(np.nan_to_num(columns["volume"]), starts)
+    resampled = {
+        "open": columns["open"][starts],
+        # fmax/fmin skip a missing high/low unless the whole period lacks one
+        "high": np.fmax.reduceat(columns["high"], starts),
+        "low": np.fmin.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": volume.astype(np.int64) if integer_volume else volume,
+    }
+    return timestamps[starts], resampled
+
+def resample_chart(stock_data_json, interval):
+    """The chart payload with its bars aggregated to interval (lists or NumPy arrays in, NumPy arrays out)."""
+    import numpy as np
+
+    if not stock_data_json or not stock_data_json.get("chart", {}).get("result"):
+        return stock_data_json
+    result = stock_data_json["chart"]["result"][0]
+    timestamps = result.get("timestamp")
+    quote = (result.get("indicators", {}).get("quote") or [{}])[0] or {}
+    if timestamps is None or len(timestamps) == 0 or not quote:
+        return stock_data_json
+
+    meta = dict(result.get("meta", {}))
+    bars = {column: quote[column] if quote.get(column) is not None else np.full(len(timestamps), np.nan) for column in OHLCV_COLUMNS}
+    timestamps, bars = resample_bars(timestamps, bars, interval, utc_offset=meta.get("gmtoffset") or 0)
+    meta["dataGranularity"] = interval
+    return {"chart": {"result": [{"meta": meta, "timestamp": timestamps, "indicators": {"quote": [bars]}}], "error": None}}
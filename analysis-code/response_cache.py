@@ -0,0 +1,201 @@
+"""Persistent on-disk cache for ApiClient responses.
+
+Payloads are stored as JSON in a local SQLite database keyed by
+(endpoint, ticker, interval, range), plus the seed of a seeded dummy client.
+Entries expire after the payload's own `maxAge` hint or a per-endpoint TTL,
+and the database is kept under a size budget by evicting the least recently
+used entries.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import incr
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "api_responses.sqlite")
+
+# Seconds a payload stays fresh when it carries no maxAge hint.
+# Daily bars only change once per session, so a chart stays valid for a trading day.
+DEFAULT_TTLS = {
+    "chart": 12 * 3600,
+    "insights": 86400,
+    "holders": 86400,
+}
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _max_age_hint(payload):
+    """Returns the smallest "maxAge" value found anywhere in the payload, or None."""
+    hints = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "maxAge" and isinstance(value, (int, float)) and value > 0:
+                    hints.append(value)
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
+    return min(hints) if hints else None
+
+
+class ResponseCache:
+    """SQLite-backed payload cache with TTL expiry and LRU size bounding. Thread-safe."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        # TTLs given explicitly override the payload's maxAge hint; the defaults don't.
+        self.ttl_overrides = dict(ttls or {})
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    @staticmethod
+    def make_key(endpoint, ticker, interval="", range_str="", seed=None):
+        key = f"{endpoint}|{ticker}|{interval}|{range_str}"
+        # Payloads of differently seeded clients must not be served for each other
+        return key if seed is None else f"{key}|seed={seed}"
+
+    def ttl_for(self, endpoint, payload):
+        """Returns how long (seconds) a freshly fetched payload may be served from the cache."""
+        if endpoint in self.ttl_overrides:
+            return self.ttl_overrides[endpoint]
+        hint = _max_age_hint(payload)
+        if hint is not None:
+            return hint
+        return DEFAULT_TTLS.get(endpoint, 0)
+
+    def ttl_for_raw(self, endpoint, data):
+        """ttl_for() of an undecoded JSON response; only parsed if it carries a maxAge hint."""
+        if endpoint not in self.ttl_overrides and b'"maxAge"' in data:
+            return self.ttl_for(endpoint, json.loads(data))
+        return self.ttl_for(endpoint, {})
+
+    def get(self, key):
+        """Returns the cached payload for key, or None if it is missing or expired."""
+        data = self.get_raw(key)
+        return json.loads(data) if data is not None else None
+
+    def get_raw(self, key):
+        """Returns the cached payload for key as JSON bytes, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT payload, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                hit = False
+            else:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                hit = True
+        incr("api_cache_requests_total", endpoint=key.split("|", 1)[0], result="hit" if hit else "miss")
+        if not hit:
+            return None
+        # Entries stored by put() are text, those stored by put_raw() bytes
+        return row[0] if isinstance(row[0], bytes) else row[0].encode("utf-8")
+
+    def put(self, key, payload, ttl):
+        """Stores payload under key for ttl seconds, evicting LRU entries if over budget."""
+        if ttl <= 0:
+            return
+        self.put_raw(key, json.dumps(payload, separators=(",", ":")).encode("utf-8"), ttl)
+
+    def put_raw(self, key, data, ttl):
+        """Stores an already serialized JSON payload (bytes) under key for ttl seconds."""
+        if ttl <= 0:
+            return
+        data = bytes(data)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, size, stored_at, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now + ttl, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        # Expired entries go first, then least recently used ones until we fit the budget
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedApiClient:
+    """Wraps an ApiClient so repeated requests are served from a ResponseCache.
+
+    With refresh=True the cache is not read, but fresh responses are still stored.
+    """
+
+    def __init__(self, api_client, cache, refresh=False):
+        self.api_client = api_client
+        self.cache = cache
+        self.refresh = refresh
+
+    def _key(self, endpoint, ticker, interval="", range_str=""):
+        seed = self.api_client.seed if getattr(self.api_client, "seeded", False) else None
+        return ResponseCache.make_key(endpoint, ticker, interval, range_str, seed=seed)
+
+    def _cached(self, endpoint, key, fetch):
+        if not self.refresh:
+            payload = self.cache.get(key)
+            if payload is not None:
+                return payload
+        payload = fetch()
+        if payload:
+            self.cache.put(key, payload, self.cache.ttl_for(endpoint, payload))
+        return payload
+
+    def get_stock_chart(self, ticker, interval="1d", range="1y"):
+        key = self._key("chart", ticker, interval, range)
+        return self._cached("chart", key, lambda: self.api_client.get_stock_chart(ticker=ticker, interval=interval, range=range))
+
+    def get_stock_chart_raw(self, ticker, interval="1d", range="1y"):
+        # Same entry as get_stock_chart(), passed through as JSON bytes without decoding
+        key = self._key("chart", ticker, interval, range)
+        if not self.refresh:
+            data = self.cache.get_raw(key)
+            if data is not None:
+                return data
+        data = self.api_client.get_stock_chart_raw(ticker=ticker, interval=interval, range=range)
+        if data:
+            self.cache.put_raw(key, data, self.cache.ttl_for_raw("chart", data))
+        return data
+
+    def get_stock_insights(self, ticker):
+        key = self._key("insights", ticker)
+        return self._cached("insights", key, lambda: self.api_client.get_stock_insights(ticker=ticker))
+
+    def get_stock_holders(self, ticker):
+        key = self._key("holders", ticker)
+        return self._cached("holders", key, lambda: self.api_client.get_stock_holders(ticker=ticker))
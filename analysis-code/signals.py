@@ -0,0 +1,164 @@
+"""Moving-average trend, cross and volume rules shared by the analyzer and the vectorized paths.
+
+Every rule works on NumPy arrays (or plain scalars) and returns integer state
+codes, so the same logic scores one ticker in stock_analyzer.py or a whole
+universe at once. The *_LABELS tables turn codes into the report text.
+trend_code()/cross_code()/volume_code() are plain-float twins of the array rules
+for the per-bar streaming path, where NumPy's per-call overhead dominates.
+"""
+import numpy as np
+
+# Trend states, evaluated in this order (first match wins)
+TREND_NEUTRAL = 0
+TREND_STRONG_UP = 1
+TREND_UP = 2
+TREND_STRONG_DOWN = 3
+TREND_DOWN = 4
+TREND_UP_ALIGNED = 5 # MAs aligned upwards while the price lags
+TREND_DOWN_ALIGNED = 6
+TREND_NO_DATA = -1
+
+TREND_LABELS = {
+    TREND_NEUTRAL: "중립",
+    TREND_STRONG_UP: "강한 상승",
+    TREND_UP: "상승",
+    TREND_STRONG_DOWN: "강한 하락",
+    TREND_DOWN: "하락",
+    TREND_UP_ALIGNED: "상승 추세",
+    TREND_DOWN_ALIGNED: "하락 추세",
+    TREND_NO_DATA: "데이터 부족",
+}
+
+# Cross states of a fast MA against a slow MA
+CROSS_NO_DATA = -1
+CROSS_GOLDEN = 1 # Fast crossed above slow on the latest bar
+CROSS_DEAD = 2 # Fast crossed below slow on the latest bar
+CROSS_ABOVE = 3
+CROSS_BELOW = 4
+
+# 20/50 (short term) cross text
+SHORT_CROSS_LABELS = {
+    CROSS_NO_DATA: "데이터 부족",
+    CROSS_GOLDEN: "최근 20일/50일 이동평균선 골든크로스 발생 (단기 상승 신호)",
+    CROSS_DEAD: "최근 20일/50일 이동평균선 데드크로스 발생 (단기 하락 신호)",
+    CROSS_ABOVE: "20일 이동평균선이 50일 이동평균선 위에 위치 (단기 상승세 유지)",
+    CROSS_BELOW: "20일 이동평균선이 50일 이동평균선 아래에 위치 (단기 하락세 유지)",
+}
+
+# 50/200 (long term) cross text
+LONG_CROSS_LABELS = {
+    CROSS_NO_DATA: "데이터 부족",
+    CROSS_GOLDEN: "최근 50일/200일 이동평균선 골든크로스 발생 (장기 상승 신호)",
+    CROSS_DEAD: "최근 50일/200일 이동평균선 데드크로스 발생 (장기 하락 신호)",
+    CROSS_ABOVE: "50일 이동평균선이 200일 이동평균선 위에 위치 (장기 상승세 유지)",
+    CROSS_BELOW: "50일 이동평균선이 200일 이동평균선 아래에 위치 (장기 하락세 유지)",
+}
+
+# Bars required before a cross is reported (the slow MA's window)
+SHORT_CROSS_MIN_BARS = 50
+LONG_CROSS_MIN_BARS = 200
+
+# Latest volume against its 20-bar average, evaluated in this order
+VOLUME_NORMAL = 0
+VOLUME_SURGE = 1 # More than 50% above the average
+VOLUME_ACTIVE = 2 # More than 10% above the average
+VOLUME_LOW = 3 # Less than 70% of the average
+VOLUME_NO_DATA = -1 # No (positive) average to compare against
+VOLUME_SURGE_RATIO = 1.5
+VOLUME_ACTIVE_RATIO = 1.1
+VOLUME_LOW_RATIO = 0.7
+
+# Formatted with volume, volume_ma (ints) and change_pct
+VOLUME_LABELS = {
+    VOLUME_NORMAL: "최근 거래량({volume:,})은 20일 평균({volume_ma:,}) 수준을 유지하고 있습니다 ({change_pct:.2f}%).",
+    VOLUME_SURGE: "최근 거래량({volume:,})이 20일 평균({volume_ma:,}) 대비 {change_pct:.2f}% 증가하며 매우 활발합니다.",
+    VOLUME_ACTIVE: "최근 거래량({volume:,})이 20일 평균({volume_ma:,}) 대비 {change_pct:.2f}% 증가하며 활발한 편입니다.",
+    VOLUME_LOW: "최근 거래량({volume:,})이 20일 평균({volume_ma:,}) 대비 {change_pct:.2f}% 감소하며 상대적으로 저조합니다.",
+    VOLUME_NO_DATA: "거래량 정보 부족",
+}
+
+
+def trend_codes(close, ma20, ma50, ma200):
+    """Classifies the trend from the price and MA20/50/200 positions."""
+    close, ma20, ma50, ma200 = (np.asarray(a, dtype=float) for a in (close, ma20, ma50, ma200))
+    conditions = [
+        (close > ma20) & (ma20 > ma50) & (ma50 > ma200),
+        (close > ma20) & (ma20 > ma50),
+        (close < ma20) & (ma20 < ma50) & (ma50 < ma200),
+        (close < ma20) & (ma20 < ma50),
+        (ma20 > ma50) & (ma50 > ma200),
+        (ma20 < ma50) & (ma50 < ma200),
+    ]
+    choices = [TREND_STRONG_UP, TREND_UP, TREND_STRONG_DOWN, TREND_DOWN, TREND_UP_ALIGNED, TREND_DOWN_ALIGNED]
+    return np.select(conditions, choices, default=TREND_NEUTRAL)
+
+
+def cross_codes(prev_fast, prev_slow, fast, slow, has_enough_data=True):
+    """Classifies a fast/slow MA pair on the latest bar given the previous bar's values."""
+    prev_fast, prev_slow, fast, slow = (np.asarray(a, dtype=float) for a in (prev_fast, prev_slow, fast, slow))
+    prev_above = prev_fast > prev_slow
+    curr_above = fast > slow
+    codes = np.select(
+        [curr_above & ~prev_above, ~curr_above & prev_above, curr_above],
+        [CROSS_GOLDEN, CROSS_DEAD, CROSS_ABOVE],
+        default=CROSS_BELOW,
+    )
+    return np.where(has_enough_data, codes, CROSS_NO_DATA)
+
+
+def volume_codes(volume, volume_ma):
+    """Classifies the latest volume against its moving average."""
+    volume, volume_ma = (np.asarray(a, dtype=float) for a in (volume, volume_ma))
+    codes = np.select(
+        [volume > volume_ma * VOLUME_SURGE_RATIO, volume > volume_ma * VOLUME_ACTIVE_RATIO, volume < volume_ma * VOLUME_LOW_RATIO],
+        [VOLUME_SURGE, VOLUME_ACTIVE, VOLUME_LOW],
+        default=VOLUME_NORMAL,
+    )
+    return np.where(volume_ma > 0, codes, VOLUME_NO_DATA)
+
+
+def volume_label(code, volume, volume_ma, change_pct):
+    """The volume_analysis sentence for a volume code."""
+    return VOLUME_LABELS[int(code)].format(volume=int(volume), volume_ma=int(volume_ma), change_pct=change_pct)
+
+
+# --- Scalar forms (same rules, same order) ---
+
+def trend_code(close, ma20, ma50, ma200):
+    """trend_codes() for plain floats."""
+    if close > ma20 and ma20 > ma50 and ma50 > ma200:
+        return TREND_STRONG_UP
+    if close > ma20 and ma20 > ma50:
+        return TREND_UP
+    if close < ma20 and ma20 < ma50 and ma50 < ma200:
+        return TREND_STRONG_DOWN
+    if close < ma20 and ma20 < ma50:
+        return TREND_DOWN
+    if ma20 > ma50 and ma50 > ma200:
+        return TREND_UP_ALIGNED
+    if ma20 < ma50 and ma50 < ma200:
+        return TREND_DOWN_ALIGNED
+    return TREND_NEUTRAL
+
+
+def cross_code(prev_fast, prev_slow, fast, slow, has_enough_data=True):
+    """cross_codes() for plain floats."""
+    if not has_enough_data:
+        return CROSS_NO_DATA
+    prev_above = prev_fast > prev_slow
+    if fast > slow:
+        return CROSS_ABOVE if prev_above else CROSS_GOLDEN
+    return CROSS_DEAD if prev_above else CROSS_BELOW
+
+
+def volume_code(volume, volume_ma):
+    """volume_codes() for plain floats."""
+    if not volume_ma > 0:
+        return VOLUME_NO_DATA
+    if volume > volume_ma * VOLUME_SURGE_RATIO:
+        return VOLUME_SURGE
+    if volume > volume_ma * VOLUME_ACTIVE_RATIO:
+        return VOLUME_ACTIVE
+    if volume < volume_ma * VOLUME_LOW_RATIO:
+        return VOLUME_LOW
+    return VOLUME_NORMAL
@@ -0,0 +1,66 @@
+"""Scan-time benchmark of the universe alert scanner (analysis-code/alert_scanner.py).
+
+Generates dummy daily bars for N tickers straight into (tickers x bars) matrices
+(no API calls or JSON) and times a first scan plus a rescan against the states
+of a scan taken --lag bars earlier, which is what a daily run sees.
+
+Example:
+    python benchmarks/bench_alerts.py --tickers 1000 5000 20000 --range 2y
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(REPO_ROOT) # data_api
+sys.path.append(os.path.join(REPO_ROOT, "analysis-code")) # alert_scanner
+
+import numpy as np
+
+from data_api import generate_dummy_bar_matrix
+from alert_scanner import scan
+
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Universe alert scanner benchmark")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1000, 5000], help="Universe sizes to run")
+    parser.add_argument("--range", dest="range_str", default="1y", help="Range of daily bars (default: 1y)")
+    parser.add_argument("--lag", type=int, default=1, help="Bars between the stored scan and the rescan (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the dummy bars")
+    return parser.parse_args()
+
+def run_scenario(n_tickers, args):
+    tickers = [f"ZZA{i:05d}" for i in range(n_tickers)]
+    timestamps, bars = generate_dummy_bar_matrix(tickers, "1d", args.range_str, seed=args.seed)
+    close = bars["close"].astype(float)
+    volume = bars["volume"].astype(float)
+    timestamps = np.broadcast_to(timestamps, close.shape)
+
+    start = time.perf_counter()
+    events, _ = scan(tickers, timestamps, close, volume)
+    first_scan = time.perf_counter() - start
+
+    lag = args.lag
+    _, previous = scan(tickers, timestamps[:, :-lag], close[:, :-lag], volume[:, :-lag])
+    start = time.perf_counter()
+    rescan_events, _ = scan(tickers, timestamps, close, volume, previous)
+    rescan = time.perf_counter() - start
+    return {
+        "tickers": n_tickers,
+        "bars": close.shape[1],
+        "first_scan_ms": round(first_scan * 1000, 1),
+        "first_scan_events": len(events),
+        "rescan_ms": round(rescan * 1000, 1),
+        "rescan_events": len(rescan_events),
+    }
+
+def main():
+    args = parse_arguments()
+    results = [run_scenario(n, args) for n in args.tickers]
+    print(json.dumps({"range": args.range_str, "lag": args.lag, "results": results}, indent=4))
+
+if __name__ == "__main__":
+    main()
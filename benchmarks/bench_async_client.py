@@ -0,0 +1,73 @@
+"""Benchmark for AsyncApiClient against the in-process FakeTransport.
+
+Fetches chart, insights and holders for N synthetic tickers from a single event loop
+and reports throughput, retries and how many pooled connections were opened.
+
+Example:
+    python benchmarks/bench_async_client.py --tickers 3000 --latency 0.05 0.2 --error-rate 0.02 --concurrency 256
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) # Add repo root to path
+from data_api import AsyncApiClient, FakeTransport
+
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="AsyncApiClient benchmark")
+    parser.add_argument("--tickers", type=int, default=1000, help="Number of synthetic tickers to fetch")
+    parser.add_argument("--latency", type=float, nargs=2, default=[0.1, 0.6], metavar=("MIN", "MAX"), help="Simulated latency range in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail transiently")
+    parser.add_argument("--concurrency", type=int, default=256, help="Connection pool size / max in-flight requests")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second allowed by the token bucket")
+    parser.add_argument("--retries", type=int, default=3, help="Max retries per request")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fake transport")
+    return parser.parse_args()
+
+async def fetch_ticker(client, ticker):
+    """Fetches the three endpoints of one ticker concurrently; returns the number of failed calls."""
+    results = await asyncio.gather(
+        client.get_stock_chart(ticker, interval="1d", range="1y"),
+        client.get_stock_insights(ticker),
+        client.get_stock_holders(ticker),
+        return_exceptions=True,
+    )
+    return sum(1 for r in results if isinstance(r, Exception))
+
+async def run(args):
+    transport = FakeTransport(latency=tuple(args.latency), error_rate=args.error_rate, seed=args.seed)
+    tickers = [f"T{i:05d}" for i in range(args.tickers)]
+    async with AsyncApiClient(transport=transport, max_concurrency=args.concurrency,
+                              rate_limit=args.rate_limit, max_retries=args.retries) as client:
+        start = time.perf_counter()
+        failed = await asyncio.gather(*(fetch_ticker(client, t) for t in tickers))
+        elapsed = time.perf_counter() - start
+        stats = dict(client.stats)
+
+    calls = len(tickers) * 3
+    # The blocking ApiClient needs roughly one mean latency per call, one call at a time
+    sequential_estimate = calls * (args.latency[0] + args.latency[1]) / 2
+    return {
+        "tickers": len(tickers),
+        "calls": calls,
+        "failed_calls": sum(failed),
+        "wall_seconds": round(elapsed, 3),
+        "calls_per_second": round(calls / elapsed, 1) if elapsed else None,
+        "sequential_estimate_seconds": round(sequential_estimate, 1),
+        "connections_opened": transport.connections_opened,
+        "requests": stats["requests"],
+        "retries": stats["retries"],
+        "failures": stats["failures"],
+    }
+
+def main():
+    args = parse_arguments()
+    print(json.dumps(asyncio.run(run(args)), indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""End-to-end benchmark of the analysis pipeline stages.
+
+Runs fetch -> DataFrame build -> analysis -> technical indicators -> result JSON ->
+chart -> chart data -> CSV for N tickers against the dummy ApiClient with its simulated latency
+turned off, and reports wall time, CPU time and the peak RSS reached by each stage.
+Every (tickers, range, interval) scenario runs in a fresh process, so peak RSS is
+per scenario and earlier scenarios don't warm caches for later ones.
+
+Stages are timed separately: "startup" is the one-off pandas import and chart template build,
+"frame" is build_price_frame() on its own, while "analyze" is the whole analyze()
+call (which builds the frame again).
+Chart rendering is slow and the same for every ticker, so by default only the
+first --chart-sample tickers of a scenario are rendered.
+
+Example:
+    python benchmarks/bench_pipeline.py --tickers 1 100 1000 --profiles 1y:1d 10y:1d
+    python benchmarks/bench_pipeline.py --tickers 10 --profiles 10y:1m --skip chart
+    python benchmarks/bench_pipeline.py --save-baseline benchmarks/pipeline_baseline.json
+    python benchmarks/bench_pipeline.py --compare benchmarks/pipeline_baseline.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(REPO_ROOT) # data_api
+sys.path.append(os.path.join(REPO_ROOT, "analysis-code")) # analysis_pipeline
+
+from chart_renderer import ChartOptions, CHART_FORMATS, DEFAULT_CHART_DPI # no heavy imports
+from indicator_output import INDICATOR_FORMATS
+
+STAGES = ["startup", "fetch", "frame", "analyze", "indicators", "json", "chart", "chart_data", "csv"]
+OPTIONAL_STAGES = ["indicators", "json", "chart", "chart_data", "csv"]
+
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Analysis pipeline benchmark")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1, 10, 100], help="Universe sizes to run (e.g. 1 100 10000)")
+    parser.add_argument("--profiles", nargs="+", default=["1y:1d"], help="RANGE:INTERVAL chart profiles (e.g. 1y:1d 10y:1d 10y:1m)")
+    parser.add_argument("--skip", nargs="+", choices=OPTIONAL_STAGES, default=[], help="Stages to leave out")
+    parser.add_argument("--chart-sample", type=int, default=5, help="Render charts for at most this many tickers per scenario (0 = all)")
+    parser.add_argument("--chart-format", choices=CHART_FORMATS, default="png", help="Chart image format")
+    parser.add_argument("--chart-dpi", type=int, default=DEFAULT_CHART_DPI, help="Chart resolution")
+    parser.add_argument("--chart-decimate", action="store_true", help="Decimate long series to the plot's pixel width")
+    parser.add_argument("--indicator-format", choices=INDICATOR_FORMATS, default="csv", help="Format the csv stage writes the technical indicators in (parquet/arrow need pyarrow)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the dummy ApiClient")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs. the baseline (0.25 = 25%%)")
+    return parser.parse_args()
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class StageTimer:
+    """Accumulates wall/CPU time per stage and the peak RSS seen when each stage ends."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def measure(self, stage, func, *args, **kwargs):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        result = func(*args, **kwargs)
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        entry = self.stages.setdefault(stage, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_rss_mb": 0.0})
+        entry["calls"] += 1
+        entry["wall_seconds"] += wall
+        entry["cpu_seconds"] += cpu
+        entry["peak_rss_mb"] = max(entry["peak_rss_mb"], _peak_rss_mb())
+        return result
+
+    def report(self):
+        report = {}
+        for stage in STAGES:
+            if stage not in self.stages:
+                continue
+            entry = self.stages[stage]
+            report[stage] = {
+                "calls": entry["calls"],
+                "wall_seconds": round(entry["wall_seconds"], 4),
+                "cpu_seconds": round(entry["cpu_seconds"], 4),
+                "wall_ms_per_call": round(entry["wall_seconds"] * 1000 / entry["calls"], 3),
+                "peak_rss_mb": entry["peak_rss_mb"],
+            }
+        return report
+
+def _warm_up(chart_options):
+    import pandas # noqa: F401
+    if chart_options:
+        import analysis_pipeline
+        analysis_pipeline.chart_template(chart_options.dpi)
+
+def run_scenario(n_tickers, range_str, interval, skip, chart_sample, seed, chart_options, indicator_format):
+    """Runs one scenario in the current process; returns its result dict."""
+    from data_api import ApiClient
+    import analysis_pipeline
+
+    api_client = ApiClient(seed=seed, latency=False)
+    tickers = [f"B{i:05d}" for i in range(n_tickers)]
+    output_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    timer = StageTimer()
+    bars = None
+    start = time.perf_counter()
+    # Heavy imports and matplotlib setup happen once per process; keep them out of the first ticker's stages
+    timer.measure("startup", _warm_up, chart_options if "chart" not in skip else None)
+    try:
+        for index, ticker in enumerate(tickers):
+            fetched = timer.measure("fetch", analysis_pipeline.fetch, api_client, ticker, interval=interval, range_str=range_str)
+            timer.measure("frame", analysis_pipeline.build_price_frame, fetched.chart)
+            analysis = timer.measure("analyze", analysis_pipeline.analyze, fetched.chart, fetched.insights, fetched.holders, ticker=ticker)
+            bars = len(analysis.price_frame)
+            paths = analysis_pipeline.output_paths(output_dir, ticker, chart_options, indicator_format)
+            if "indicators" not in skip:
+                timer.measure("indicators", analysis.technical_indicators)
+            if "json" not in skip:
+                timer.measure("json", analysis_pipeline.save_result_json, analysis, paths["result_json"])
+            if "chart" not in skip and (chart_sample <= 0 or index < chart_sample):
+                timer.measure("chart", analysis_pipeline.render_chart, analysis, paths["chart"], chart_options)
+            if "chart_data" not in skip:
+                timer.measure("chart_data", analysis_pipeline.save_chart_data, analysis, paths["chart_data"])
+            if "csv" not in skip:
+                timer.measure("csv", analysis_pipeline.save_technical_indicators, analysis, paths["technical_indicators"], indicator_format)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return {
+        "tickers": n_tickers,
+        "range": range_str,
+        "interval": interval,
+        "bars_per_ticker": bars,
+        "total_wall_seconds": round(time.perf_counter() - start, 4),
+        "peak_rss_mb": _peak_rss_mb(),
+        "stages": timer.report(),
+    }
+
+def scenario_key(scenario):
+    return f"{scenario['tickers']}x{scenario['range']}:{scenario['interval']}"
+
+def compare(results, baseline, tolerance):
+    """Prints per-stage changes vs. the baseline; returns the regressed (scenario, stage) names."""
+    before_by_key = {scenario_key(s): s for s in baseline.get("scenarios", [])}
+    regressions = []
+    for scenario in results["scenarios"]:
+        key = scenario_key(scenario)
+        before = before_by_key.get(key)
+        if not before:
+            print(f"{key}: not in baseline")
+            continue
+        for stage, entry in scenario["stages"].items():
+            old = before["stages"].get(stage)
+            if not old or not old["wall_ms_per_call"]:
+                continue
+            change = entry["wall_ms_per_call"] / old["wall_ms_per_call"] - 1
+            status = "REGRESSION" if change > tolerance else "ok"
+            print(f"{key} {stage}: {old['wall_ms_per_call']:.2f}ms -> {entry['wall_ms_per_call']:.2f}ms per call ({change:+.0%}) {status}")
+            if change > tolerance:
+                regressions.append(f"{key} {stage}")
+    return regressions
+
+def main():
+    args = parse_arguments()
+    results = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scenarios": [],
+    }
+    # A fresh interpreter per scenario keeps peak RSS and import/font caches per scenario
+    context = multiprocessing.get_context("spawn")
+    chart_options = ChartOptions(fmt=args.chart_format, dpi=args.chart_dpi, decimate=args.chart_decimate)
+    results["chart"] = {"format": args.chart_format, "dpi": args.chart_dpi, "decimate": args.chart_decimate}
+    results["indicator_format"] = args.indicator_format
+    for profile in args.profiles:
+        range_str, interval = profile.split(":")
+        for n_tickers in args.tickers:
+            print(f"Running {n_tickers} tickers x {range_str} of {interval} bars...", file=sys.stderr)
+            with context.Pool(1) as pool:
+                scenario = pool.apply(run_scenario, (n_tickers, range_str, interval, args.skip, args.chart_sample, args.seed, chart_options, args.indicator_format))
+            results["scenarios"].append(scenario)
+
+    print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Pipeline regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
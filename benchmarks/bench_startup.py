@@ -0,0 +1,130 @@
+"""Import-time and startup benchmark for the analyzer CLI.
+
+Each scenario runs in a fresh interpreter so module caches don't hide import cost:
+bare imports of analysis_pipeline / stock_analyzer, `stock_analyzer.py --help`, and a
+JSON-only single-ticker run. It also reports the slowest direct imports from
+`python -X importtime` and which heavy modules (pandas, numpy, matplotlib) got loaded.
+
+Results can be saved as a baseline and later compared; the script exits non-zero
+when a scenario gets slower than the baseline by more than --tolerance.
+
+Example:
+    python benchmarks/bench_startup.py --runs 5 --save-baseline benchmarks/startup_baseline.json
+    python benchmarks/bench_startup.py --runs 5 --compare benchmarks/startup_baseline.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ANALYSIS_DIR = os.path.join(REPO_ROOT, "analysis-code")
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib")
+BENCH_TICKER = "ZZSTARTUP"
+
+SCENARIOS = {
+    "import_analysis_pipeline": [sys.executable, "-c", "import analysis_pipeline"],
+    "import_stock_analyzer": [sys.executable, "-c", "import stock_analyzer"],
+    "cli_help": [sys.executable, "stock_analyzer.py", "--help"],
+    "cli_json_only": [sys.executable, "stock_analyzer.py", "--ticker", BENCH_TICKER, "--json-only", "--no-cache"],
+}
+
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Analyzer startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (the median is reported)")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS), help="Scenarios to run")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs. the baseline (0.25 = 25%%)")
+    return parser.parse_args()
+
+def time_scenario(command, runs):
+    """Runs command in a fresh interpreter `runs` times; returns the wall times in seconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ANALYSIS_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def import_profile(module, top):
+    """Returns (slowest imports, heavy modules loaded) for `import module` via -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ANALYSIS_DIR, check=True, capture_output=True, text=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((name[1:].rstrip(), int(cumulative))) # Drop the space after the separator
+    # Direct imports of the module are indented by exactly one level (two spaces)
+    direct = [e for e in entries if e[0].startswith("  ") and not e[0].startswith("   ")]
+    direct.sort(key=lambda e: e[1], reverse=True)
+    loaded = sorted({name.strip().split(".")[0] for name, _ in entries} & set(HEAVY_MODULES))
+    return [{"module": name.strip(), "cumulative_ms": round(us / 1000, 1)} for name, us in direct[:top]], loaded
+
+def cleanup_outputs():
+    """Removes the files the JSON-only scenario wrote to public/analysis_outputs."""
+    output_dir = os.path.join(REPO_ROOT, "public", "analysis_outputs")
+    if not os.path.isdir(output_dir):
+        return
+    for name in os.listdir(output_dir):
+        if name.startswith(BENCH_TICKER + "_"):
+            os.remove(os.path.join(output_dir, name))
+
+def compare(results, baseline, tolerance):
+    """Prints the change vs. the baseline; returns the names of scenarios that regressed."""
+    regressions = []
+    for name, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        change = result["median_seconds"] / before["median_seconds"] - 1
+        status = "REGRESSION" if change > tolerance else "ok"
+        print(f"{name}: {before['median_seconds']:.3f}s -> {result['median_seconds']:.3f}s ({change:+.0%}) {status}")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+def main():
+    args = parse_arguments()
+    results = {"python": sys.version.split()[0], "runs": args.runs, "scenarios": {}, "imports": {}}
+    try:
+        for name in args.scenarios:
+            timings = time_scenario(SCENARIOS[name], args.runs)
+            results["scenarios"][name] = {
+                "median_seconds": round(statistics.median(timings), 4),
+                "min_seconds": round(min(timings), 4),
+            }
+    finally:
+        cleanup_outputs()
+    for module in ("analysis_pipeline", "stock_analyzer"):
+        slowest, loaded = import_profile(module, args.top)
+        results["imports"][module] = {"heavy_modules_loaded": loaded, "slowest": slowest}
+
+    print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Startup regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
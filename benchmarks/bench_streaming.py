@@ -0,0 +1,82 @@
+"""Per-update latency benchmark of the streaming analysis (analysis-code/live_stream.py).
+
+Feeds dummy 1-minute bars for N symbols, interleaved in time order like a live
+feed, through one LiveAnalyzer on one thread. With --ticks-per-bar each bar is
+split into that many trades, which exercises the in-progress bar revisions.
+Reports throughput and the nearest-rank p50/p99 processing time per update
+(subscriber callbacks excluded; a no-op subscriber is attached).
+
+Example:
+    python benchmarks/bench_streaming.py --symbols 100 500 --interval 5m
+    python benchmarks/bench_streaming.py --symbols 200 --ticks-per-bar 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(REPO_ROOT) # data_api
+sys.path.append(os.path.join(REPO_ROOT, "analysis-code")) # live_stream
+
+from data_api import generate_dummy_bar_matrix
+from live_stream import LiveAnalyzer, STREAM_INTERVALS
+
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Streaming analysis latency benchmark")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[100, 500], help="Watchlist sizes to run")
+    parser.add_argument("--interval", choices=STREAM_INTERVALS, default="5m", help="Bar interval to aggregate to")
+    parser.add_argument("--range", dest="range_str", default="5d", help="Range of 1m bars to replay")
+    parser.add_argument("--ticks-per-bar", type=int, default=1, help="Split each 1m bar into this many trades (1 = feed bars)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the dummy bars")
+    return parser.parse_args()
+
+def build_feed(n_symbols, range_str, ticks_per_bar, seed):
+    """Time-ordered events for n_symbols tickers (bars, or trades within each bar)."""
+    tickers = [f"ZZS{i:04d}" for i in range(n_symbols)]
+    timestamps, bars = generate_dummy_bar_matrix(tickers, "1m", range_str, seed=seed)
+    opens, highs, lows = bars["open"].tolist(), bars["high"].tolist(), bars["low"].tolist()
+    closes, volumes = bars["close"].tolist(), bars["volume"].tolist()
+    events = []
+    for column, timestamp in enumerate(timestamps.tolist()):
+        for row, ticker in enumerate(tickers):
+            if ticks_per_bar <= 1:
+                events.append({"ticker": ticker, "timestamp": timestamp, "open": opens[row][column], "high": highs[row][column],
+                               "low": lows[row][column], "close": closes[row][column], "volume": volumes[row][column]})
+                continue
+            # Trades at the open, high and low, then the close
+            close = closes[row][column]
+            prices = ([opens[row][column], highs[row][column], lows[row][column]] + [close] * ticks_per_bar)[:ticks_per_bar - 1] + [close]
+            for i, price in enumerate(prices):
+                events.append({"ticker": ticker, "timestamp": timestamp + i, "price": price, "size": volumes[row][column] / ticks_per_bar})
+    return events
+
+def run_scenario(n_symbols, args):
+    events = build_feed(n_symbols, args.range_str, args.ticks_per_bar, args.seed)
+    engine = LiveAnalyzer(args.interval, latency_window=len(events))
+    engine.subscribe(lambda delta: None)
+    start = time.perf_counter()
+    engine.run(events)
+    elapsed = time.perf_counter() - start
+    stats = engine.stats()
+    return {
+        "symbols": n_symbols,
+        "events": len(events),
+        "seconds": round(elapsed, 3),
+        "events_per_second": round(len(events) / elapsed),
+        "p50_us": stats["p50_us"],
+        "p99_us": stats["p99_us"],
+        "max_us": stats["max_us"],
+        "published": stats["published"],
+    }
+
+def main():
+    args = parse_arguments()
+    results = [run_scenario(n, args) for n in args.symbols]
+    print(json.dumps({"interval": args.interval, "range": args.range_str, "ticks_per_bar": args.ticks_per_bar, "results": results}, indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Behavior checks for AsyncApiClient against the in-process FakeTransport.
+
+Where bench_async_client.py measures throughput, this script checks that the
+client does what its docstring promises, using a fake backend with a set error
+rate and latency:
+
+- transient errors are retried with full-jitter exponential backoff and recover
+- a request gives up with TransientApiError after max_retries retries (and on timeouts)
+- the token bucket paces requests to rate_limit per second after the burst
+- no more than max_concurrency requests are ever in flight at once
+- payloads are the same as the blocking ApiClient's for the same seed
+
+Prints one line per check and exits with status 1 if any fails.
+
+Example:
+    python benchmarks/check_async_client.py --seed 3
+"""
+import argparse
+import asyncio
+import random
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) # Add repo root to path
+from data_api import ApiClient, AsyncApiClient, FakeTransport, TransientApiError
+
+
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="AsyncApiClient behavior checks")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fake transport and the backoff jitter")
+    return parser.parse_args()
+
+
+class RecordingRandom(random.Random):
+    """Random generator that remembers the (upper bound, value) of every uniform(0, cap) draw (the backoff delays)."""
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.delays = []
+
+    def uniform(self, a, b):
+        value = super().uniform(a, b)
+        self.delays.append((b, value))
+        return value
+
+
+class CountingTransport(FakeTransport):
+    """FakeTransport that tracks how many requests are in flight at once."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def connect(self):
+        connection = await super().connect()
+        transport = self
+        request = connection.request
+
+        async def counted_request(endpoint, params):
+            transport.in_flight += 1
+            transport.peak_in_flight = max(transport.peak_in_flight, transport.in_flight)
+            try:
+                return await request(endpoint, params)
+            finally:
+                transport.in_flight -= 1
+        connection.request = counted_request
+        return connection
+
+
+async def check_retry_recovers(seed):
+    """With a 30% error rate and enough retries every call succeeds; backoff delays are jittered and capped."""
+    transport = FakeTransport(latency=(0.001, 0.003), error_rate=0.3, seed=seed)
+    async with AsyncApiClient(transport=transport, max_concurrency=16, max_retries=10, backoff_base=0.001, backoff_max=0.004) as client:
+        client._random = RecordingRandom(seed)
+        tickers = [f"R{i:03d}" for i in range(100)]
+        results = await asyncio.gather(*(client.get_stock_insights(t) for t in tickers))
+    stats = client.stats
+    delays = client._random.delays
+    assert all(r["finance"]["result"]["symbol"] == t for r, t in zip(results, tickers)), "payload for the wrong ticker"
+    assert stats["failures"] == 0, f"{stats['failures']} calls failed despite retries"
+    assert stats["retries"] > 0, "a 30% error rate should cause retries"
+    assert stats["requests"] == len(tickers) + stats["retries"], f"requests {stats['requests']} != calls + retries"
+    assert transport.requests_served == len(tickers), "every call should be served exactly once"
+    assert len(delays) == stats["retries"], "one backoff delay per retry"
+    assert all(0 <= value <= cap <= 0.004 for cap, value in delays), "backoff delay outside [0, min(backoff_max, base * 2^attempt)]"
+    assert {cap for cap, _ in delays} > {0.001}, "backoff cap should grow with the attempt"
+    assert len({value for _, value in delays}) == len(delays), "backoff delays should be jittered"
+    return f"{len(tickers)} calls, {stats['retries']} retries, 0 failures"
+
+async def check_gives_up(seed):
+    """With every request failing, a call is tried 1 + max_retries times and then raises TransientApiError."""
+    transport = FakeTransport(latency=(0.001, 0.002), error_rate=1.0, seed=seed)
+    async with AsyncApiClient(transport=transport, max_retries=2, backoff_base=0.001) as client:
+        try:
+            await client.get_stock_chart("FAIL")
+        except TransientApiError:
+            pass
+        else:
+            raise AssertionError("expected TransientApiError after the retry limit")
+    assert client.stats == {"requests": 3, "retries": 2, "failures": 1}, f"unexpected stats {client.stats}"
+
+    # A slow backend hits the per-request timeout, which is retried the same way
+    transport = FakeTransport(latency=(0.2, 0.2), seed=seed)
+    async with AsyncApiClient(transport=transport, max_retries=1, backoff_base=0.001, timeout=0.02) as client:
+        try:
+            await client.get_stock_holders("SLOW")
+        except TransientApiError as e:
+            assert "timed out" in str(e), f"unexpected error {e}"
+        else:
+            raise AssertionError("expected TransientApiError after timeouts")
+    assert client.stats == {"requests": 2, "retries": 1, "failures": 1}, f"unexpected stats {client.stats}"
+    return "3 attempts then TransientApiError; timeouts retried and reported"
+
+async def check_rate_limit(seed):
+    """After a burst of `burst` requests the token bucket lets through `rate_limit` per second."""
+    rate, burst, calls = 100.0, 5, 45
+    transport = FakeTransport(latency=(0.0, 0.0), seed=seed)
+    async with AsyncApiClient(transport=transport, max_concurrency=64, rate_limit=rate, burst=burst) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client.get_stock_insights(f"P{i:03d}") for i in range(calls)))
+        elapsed = time.perf_counter() - start
+    expected = (calls - burst) / rate
+    assert elapsed >= expected * 0.95, f"{calls} calls took {elapsed:.3f}s, faster than {rate:.0f}/s allows ({expected:.3f}s)"
+    assert elapsed <= expected + 0.25, f"{calls} calls took {elapsed:.3f}s, much slower than {rate:.0f}/s ({expected:.3f}s)"
+    return f"{calls} calls in {elapsed:.3f}s (expected {expected:.3f}s at {rate:.0f}/s, burst {burst})"
+
+async def check_concurrency_bound(seed):
+    """No more than max_concurrency requests are in flight, and the pool reuses that many connections."""
+    limit = 8
+    transport = CountingTransport(latency=(0.002, 0.006), error_rate=0.1, seed=seed)
+    async with AsyncApiClient(transport=transport, max_concurrency=limit, max_retries=10, backoff_base=0.001) as client:
+        await asyncio.gather(*(client.get_stock_insights(f"C{i:03d}") for i in range(200)))
+    assert transport.peak_in_flight == limit, f"peak in flight {transport.peak_in_flight}, expected {limit}"
+    # Failed requests discard their connection, so a few more than `limit` may be opened
+    assert transport.connections_opened <= limit + client.stats["retries"], f"{transport.connections_opened} connections opened"
+    return f"peak {transport.peak_in_flight} in flight, {transport.connections_opened} connections for {client.stats['requests']} requests"
+
+async def check_payloads(seed):
+    """The fake serves the blocking ApiClient's payloads for the same seed."""
+    transport = FakeTransport(latency=(0.001, 0.002), seed=seed)
+    blocking = ApiClient(seed=seed, latency=False)
+    async with AsyncApiClient(transport=transport) as client:
+        chart, insights, holders = await asyncio.gather(
+            client.get_stock_chart("PLTR", interval="1d", range="1y"),
+            client.get_stock_insights("PLTR"),
+            client.get_stock_holders("PLTR"),
+        )
+    assert chart == blocking.get_stock_chart("PLTR", "1d", "1y"), "chart payload differs from ApiClient"
+    assert insights == blocking.get_stock_insights("PLTR"), "insights payload differs from ApiClient"
+    assert holders == blocking.get_stock_holders("PLTR"), "holders payload differs from ApiClient"
+    return "chart, insights and holders identical"
+
+CHECKS = (check_retry_recovers, check_gives_up, check_rate_limit, check_concurrency_bound, check_payloads)
+
+def main():
+    args = parse_arguments()
+    failed = 0
+    for check in CHECKS:
+        try:
+            detail = asyncio.run(check(args.seed))
+            print(f"PASS {check.__name__}: {detail}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL {check.__name__}: {e}")
+        except Exception as e: # e.g. an error that should have been retried
+            failed += 1
+            print(f"FAIL {check.__name__}: unexpected {type(e).__name__}: {e}")
+    if failed:
+        print(f"{failed} of {len(CHECKS)} checks failed")
+        sys.exit(1)
+    print(f"All {len(CHECKS)} checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -1,142 +1,99 @@
 import json
 from datetime import datetime, timedelta
 import time
+import asyncio
+import random
+import re
+import threading
+import zlib
 
 class ApiClient:
-    def __init__(self):
-        pass
+    def __init__(self, seed=None, latency=True):
+        # Payloads only depend on (seed, ticker, endpoint, params), so clients with the same
+        # seed return identical data from any thread, asyncio task or worker process.
+        # Without a seed every client gets its own random one.
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(32)
+        # Only an explicit seed promises reproducible payloads (the response cache keys on it)
+        self.seeded = seed is not None
+        # latency=False skips the simulated network delay (for benchmarks)
+        self.latency = latency
+        # Simulated latency doesn't affect payloads; its generator is shared, hence the lock
+        self._latency_random = fixture_random(self.seed, "latency")
+        self._latency_lock = threading.Lock()
 
-    def _generate_dummy_stock_data(self, ticker, interval, range_str):
-        end_date = datetime.now()
-        if range_str == "1y":
-            start_date = end_date - timedelta(days=365)
-        elif range_str == "1mo":
-            start_date = end_date - timedelta(days=30)
-        else: # default
-            start_date = end_date - timedelta(days=7)
-
-        timestamps = []
-        opens = []
-        highs = []
-        lows = []
-        closes = []
-        volumes = []
-
-        current_date = start_date
-        price = 100.0
-        while current_date <= end_date:
-            if current_date.weekday() < 5: # Monday to Friday
-                timestamps.append(int(time.mktime(current_date.timetuple())))
-                opens.append(round(price + (0.5 -_random_float()) * 2, 2)) # nosec B311
-                lows.append(round(opens[-1] - (_random_float() * 2), 2)) # nosec B311
-                highs.append(round(opens[-1] + (_random_float() * 2), 2)) # nosec B311
-                closes.append(round(lows[-1] + (_random_float() * (highs[-1] - lows[-1])), 2) ) # nosec B311
-                volumes.append(int(1000000 + _random_float() * 500000)) # nosec B311
-                price = closes[-1] + (0.5 -_random_float()) # nosec B311
-            current_date += timedelta(days=1)
-        
-        # Ensure at least a few data points for MA calculations
-        min_points = 250 # For 200-day MA
-        if len(timestamps) < min_points:
-            # Add more past data if needed (simplified)
-            price = opens[0] if opens else 100.0
-            for i in range(min_points - len(timestamps)):
-                # Prepend data
-                current_date = start_date - timedelta(days=i+1)
-                if current_date.weekday() < 5:
-                    timestamps.insert(0, int(time.mktime(current_date.timetuple())))
-                    closes.insert(0, round(price + (0.5 -_random_float()) * 2, 2)) # nosec B311
-                    highs.insert(0, round(closes[0] + (_random_float() * 2), 2)) # nosec B311
-                    lows.insert(0, round(closes[0] - (_random_float() * 2), 2)) # nosec B311
-                    opens.insert(0, round(lows[0] + (_random_float() * (highs[0] - lows[0])), 2)) # nosec B311
-                    volumes.insert(0, int(1000000 + _random_float() * 500000)) # nosec B311
-                    price = closes[0]
+    def __getstate__(self):
+        # Picklable for worker processes: the lock is recreated on the other side
+        state = self.__dict__.copy()
+        del state["_latency_lock"]
+        return state
 
-        return {
-            "chart": {
-                "result": [
-                    {
-                        "meta": {
-                            "currency": "USD",
-                            "symbol": ticker,
-                            "exchangeName": "NMS",
-                            "instrumentType": "EQUITY",
-                            "firstTradeDate": int(time.mktime((datetime.now() - timedelta(days=365*5)).timetuple())),
-                            "regularMarketTime": int(time.mktime(datetime.now().timetuple())),
-                            "gmtoffset": -14400,
-                            "timezone": "EDT",
-                            "exchangeTimezoneName": "America/New_York",
-                            "regularMarketPrice": closes[-1] if closes else 150.0,
-                            "chartPreviousClose": opens[0] if opens else 148.0,
-                            "previousClose": opens[0] if opens else 148.0, # For current_price.prev_close
-                            "scale": 3,
-                            "priceHint": 2,
-                            "currentTradingPeriod": {
-                                "pre": {"timezone": "EDT", "start": 1678886400, "end": 1678886400, "gmtoffset": -14400},
-                                "regular": {"timezone": "EDT", "start": 1678886400, "end": 1678910400, "gmtoffset": -14400},
-                                "post": {"timezone": "EDT", "start": 1678910400, "end": 1678910400, "gmtoffset": -14400}
-                            },
-                            "tradingPeriods": [[{"timezone": "EDT", "start": 1678886400, "end": 1678910400, "gmtoffset": -14400}]],
-                            "dataGranularity": interval,
-                            "range": range_str,
-                            "validRanges": ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"],
-                            "fiftyTwoWeekHigh": max(highs) if highs else 180.0,
-                            "fiftyTwoWeekLow": min(lows) if lows else 120.0,
-                            "regularMarketDayHigh": highs[-1] if highs else 155.0,
-                            "regularMarketDayLow": lows[-1] if lows else 145.0,
-                            "regularMarketVolume": volumes[-1] if volumes else 1200000,
-                            "shortName": f"{ticker} Inc.",
-                            "longName": f"{ticker} Corporation Holdings Inc."
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._latency_lock = threading.Lock()
 
-                        },
-                        "timestamp": timestamps,
-                        "indicators": {
-                            "quote": [
-                                {
-                                    "open": opens,
-                                    "high": highs,
-                                    "low": lows,
-                                    "close": closes,
-                                    "volume": volumes
-                                }
-                            ],
-                            "adjclose": [
-                                {"adjclose": closes} # Assuming adjclose is same as close for dummy
-                            ]
-                        }
-                    }
-                ],
-                "error": None
-            }
-        }
+    def _simulate_latency(self):
+        if not self.latency:
+            return
+        with self._latency_lock:
+            delay = self._latency_random.random() * 0.5 + 0.1 # nosec B311
+        time.sleep(delay)
+
+    def _generate_dummy_stock_data(self, ticker, interval, range_str):
+        # Ensure at least a few data points for MA calculations (200-day MA) on daily and finer bars;
+        # weekly/monthly bars keep the requested range (250 of them would span 5-20 years).
+        # Short ranges ("1d"/"5d") are tail requests for incremental updates; they are only
+        # padded to one session, so they are never empty on weekends or before the open.
+        if range_str in ("1d", "5d") or _bar_seconds(interval) > DUMMY_SESSION_SECONDS:
+            min_points = dummy_session_bars(interval)
+        else:
+            min_points = 250
+        # Bars are deterministic per (seed, ticker, interval, timestamp); see generate_dummy_bar_matrix()
+        bars = generate_dummy_bars(ticker, interval, range_str, seed=self.seed, min_points=min_points)
+        # The 52-week high/low come from a year of daily bars, so a short tail request
+        # reports the same values as a full one
+        year = generate_dummy_bars(ticker, "1d", "1y", seed=self.seed)
+        return dummy_chart_payload(ticker, interval, range_str, bars, week52=(float(year["high"].max()), float(year["low"].min())))
 
     def get_stock_chart(self, ticker, interval="1d", range="1y"):
         # Simulate API delay
-        time.sleep(_random_float() * 0.5 + 0.1) # nosec B311
+        self._simulate_latency()
         return self._generate_dummy_stock_data(ticker, interval, range)
 
+    def get_stock_chart_raw(self, ticker, interval="1d", range="1y"):
+        # The undecoded JSON response body, as an HTTP client receives it
+        self._simulate_latency()
+        return json.dumps(self._generate_dummy_stock_data(ticker, interval, range)).encode("utf-8")
+
     def get_stock_insights(self, ticker):
-        time.sleep(_random_float() * 0.5 + 0.1) # nosec B311
+        self._simulate_latency()
+        return self._generate_dummy_insights(ticker)
+
+    def get_stock_holders(self, ticker):
+        self._simulate_latency()
+        return self._generate_dummy_holders(ticker)
+
+    def _generate_dummy_insights(self, ticker):
+        rng = fixture_random(self.seed, "insights", ticker)
         return {
             "finance": {
                 "result": {
                     "symbol": ticker,
                     "instrumentInfo": {
                         "keyTechnicals": {
-                            "support": round(130.0 + (_random_float() * 10),2), # nosec B311
-                            "resistance": round(160.0 + (_random_float() * 10),2), # nosec B311
-                            "stopLossPrice": round(125.0 + (_random_float()*5),2) # nosec B311
+                            "support": round(130.0 + (rng.random() * 10),2), # nosec B311
+                            "resistance": round(160.0 + (rng.random() * 10),2), # nosec B311
+                            "stopLossPrice": round(125.0 + (rng.random()*5),2) # nosec B311
                         }
                     },
                     "recommendationTrend": {
                         "trend": [
-                            {"period": "0m", "strongBuy": int(5 + _random_float()*5), "buy": int(10 + _random_float()*5), "hold": int(5 + _random_float()*3), "sell": int(1 + _random_float()*2), "strongSell": int(_random_float()*1)} # nosec B311
+                            {"period": "0m", "strongBuy": int(5 + rng.random()*5), "buy": int(10 + rng.random()*5), "hold": int(5 + rng.random()*3), "sell": int(1 + rng.random()*2), "strongSell": int(rng.random()*1)} # nosec B311
                         ],
                         "maxAge": 86400
                     },
                     "financialData": {
-                        "targetMeanPrice": {"raw": round(170.0 + (_random_float()*20),2), "fmt": "175.00"}, # nosec B311
-                        "recommendationKey": ["buy", "hold", "sell"][int(_random_float()*3)] # nosec B311
+                        "targetMeanPrice": {"raw": round(170.0 + (rng.random()*20),2), "fmt": "175.00"}, # nosec B311
+                        "recommendationKey": ["buy", "hold", "sell"][int(rng.random()*3)] # nosec B311
                     },
                     "companySnapshot": {
                         "company": {
@@ -154,27 +111,28 @@ class ApiClient:
             }
         }
 
-    def get_stock_holders(self, ticker):
-        time.sleep(_random_float() * 0.5 + 0.1) # nosec B311
+    def _generate_dummy_holders(self, ticker):
+        rng = fixture_random(self.seed, "holders", ticker)
         transactions = []
-        for i in range(int(_random_float() * 5) + 2): # nosec B311
-            shares = int((_random_float() - 0.4) * 10000) # nosec B311 Can be positive (buy) or negative (sell like)
-            transaction_date = datetime.now() - timedelta(days=int(_random_float()*180)) # nosec B311
-            value = abs(shares * (150 + (_random_float()-0.5)*20)) # nosec B311
+        for i in range(int(rng.random() * 5) + 2): # nosec B311
+            shares = int((rng.random() - 0.4) * 10000) # nosec B311 Can be positive (buy) or negative (sell like)
+            # Relative to the latest trading day rather than the clock, so payloads are reproducible
+            transaction_date = dummy_reference_date() - timedelta(days=int(rng.random()*180)) # nosec B311
+            value = abs(shares * (150 + (rng.random()-0.5)*20)) # nosec B311
             
             # Simulate transactionText or construct one
             action = "매수" if shares > 0 else "매도"
-            if _random_float() > 0.3: # nosec B311
+            if rng.random() > 0.3: # nosec B311
                 transaction_text = f"{abs(shares):,}주 {action} ({value:,.0f} USD)"
             else:
                 transaction_text = "" # Let stock_analyzer.py construct it
 
             transactions.append({
-                "filerName": ["Major Holder LLC", "Insider Trading Co", "Big Fund LP"][int(_random_float()*3)], # nosec B311
-                "filerRelation": ["Officer", "Director", "Beneficial Owner"][int(_random_float()*3)], # nosec B311
+                "filerName": ["Major Holder LLC", "Insider Trading Co", "Big Fund LP"][int(rng.random()*3)], # nosec B311
+                "filerRelation": ["Officer", "Director", "Beneficial Owner"][int(rng.random()*3)], # nosec B311
                 "transactionText": transaction_text,
                 "startDate": {"raw": int(time.mktime(transaction_date.timetuple())), "fmt": transaction_date.strftime('%Y-%m-%d')},
-                "filerTitle": ["CEO", "CFO", "Board Member", "Chief Counsel"][int(_random_float()*4)], # nosec B311
+                "filerTitle": ["CEO", "CFO", "Board Member", "Chief Counsel"][int(rng.random()*4)], # nosec B311
                 "shares": {"raw": shares, "longFmt": f"{shares:,}"},
                 "value": {"raw": value, "longFmt": f"{value:,}"} # For constructing transaction text if needed
             })
@@ -184,8 +142,8 @@ class ApiClient:
                 "result": {
                     "symbol": ticker,
                     "majorHoldersBreakdown": {
-                        "insidersPercentHeld": {"raw": 0.05 + _random_float()*0.1, "fmt": "5.00%"}, # nosec B311
-                        "institutionsPercentHeld": {"raw": 0.6 + _random_float()*0.2, "fmt": "60.00%"} # nosec B311
+                        "insidersPercentHeld": {"raw": 0.05 + rng.random()*0.1, "fmt": "5.00%"}, # nosec B311
+                        "institutionsPercentHeld": {"raw": 0.6 + rng.random()*0.2, "fmt": "60.00%"} # nosec B311
                     },
                     "insiderTransactions": {
                         "transactions": transactions,
@@ -196,12 +154,564 @@ class ApiClient:
             }
         }
 
+
+# --- Vectorized dummy bars ---
+# Seeded NumPy generator for offline load tests: any range, any interval, any number of
+# tickers. A bar only depends on (seed, ticker, interval, timestamp), so a short tail
+# request continues the series a longer one returned. numpy is imported lazily so
+# importing data_api stays cheap for callers that never generate bars.
+
+# Calendar days covered by each range
+DUMMY_RANGE_DAYS = {
+    "1d": 1, "5d": 7, "1mo": 30, "3mo": 91, "6mo": 182,
+    "1y": 365, "2y": 730, "5y": 1826, "10y": 3652, "max": 7305,
+}
+
+# Regular session of the dummy exchange (local time), used for intraday bars
+DUMMY_SESSION_OPEN = 9 * 3600 + 30 * 60
+DUMMY_SESSION_SECONDS = 390 * 60
+
+_INTERVAL_UNITS = {"m": 60, "h": 3600, "d": 1, "wk": 1, "mo": 1}
+
+# The walk is anchored on calendar months: a monthly level walk (the same for every
+# interval) fixes the log price at the start of each month, and within a month the bars
+# follow a Brownian bridge between two levels. Months are counted like datetime64[M],
+# from January 1970.
+_DUMMY_EPOCH_MONTH = 0 # January 1970: the monthly walk starts here...
+_DUMMY_WALK_MONTHS = 130 * 12 # ...and runs until 2100
+_DUMMY_ANCHOR_MONTH = 55 * 12 # January 2025: the walk is at the ticker's start price
+_DUMMY_DAILY_SIGMA = 0.02
+_DUMMY_DAYS_PER_MONTH = 21
+
+def _parse_interval(interval):
+    """Splits an interval like "5m", "1h", "1d", "1wk" or "3mo" into (count, unit)."""
+    match = re.fullmatch(r"(\d+)(m|h|d|wk|mo)", interval)
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return int(match.group(1)), match.group(2)
+
+def _bar_seconds(interval):
+    """Approximate trading seconds per bar, used to scale volatility and volume."""
+    count, unit = _parse_interval(interval)
+    if unit in ("m", "h"):
+        return min(count * _INTERVAL_UNITS[unit], DUMMY_SESSION_SECONDS)
+    trading_days = {"d": 1, "wk": 5, "mo": 21}[unit]
+    return count * trading_days * DUMMY_SESSION_SECONDS
+
+def dummy_session_bars(interval):
+    """Number of bars in one regular session (1 for daily and coarser intervals)."""
+    count, unit = _parse_interval(interval)
+    if unit not in ("m", "h"):
+        return 1
+    return -(-DUMMY_SESSION_SECONDS // (count * _INTERVAL_UNITS[unit]))
+
+def _day_starts(days):
+    """Local midnight (int64 epoch seconds) of each datetime64[D] day; one mktime call per day keeps DST handling right."""
+    import numpy as np
+    return np.array([time.mktime(d.timetuple()) for d in days.astype(object)], dtype=np.int64)
+
+def _session_offsets(count, unit):
+    """Offsets (seconds from the open) of the intraday bars of one session."""
+    import numpy as np
+    return np.arange(0, DUMMY_SESSION_SECONDS, count * _INTERVAL_UNITS[unit], dtype=np.int64)
+
+def dummy_reference_date(end=None):
+    """Local midnight of the latest weekday at or before `end` (default now): the date of the latest dummy daily bar."""
+    day = datetime.combine((end or datetime.now()).date(), datetime.min.time())
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+def dummy_timestamps(interval="1d", range_str="1y", end=None, min_points=0):
+    """Bar timestamps (int64 epoch seconds, ascending) for a range on weekdays.
+
+    Daily and coarser bars are stamped at local midnight of their first trading day
+    (a weekly or monthly bar at that of its week or month, even if it starts before the
+    range), intraday bars every interval within the regular session. Bars after `end`
+    (a datetime, default now) are not produced. If fewer than min_points bars fall in
+    the range, the range is extended backwards until there are min_points.
+    """
+    import numpy as np
+
+    count, unit = _parse_interval(interval)
+    end = end or datetime.now()
+    end_ts = time.mktime(end.timetuple())
+    if range_str == "ytd":
+        start = datetime(end.year, 1, 1)
+    elif range_str in DUMMY_RANGE_DAYS:
+        start = end - timedelta(days=DUMMY_RANGE_DAYS[range_str])
+    else: # default, same as the original generator
+        start = end - timedelta(days=7)
+    span_days = max(1, (end - start).days)
+    extended = False
+
+    while True:
+        start_day = np.datetime64(start.date(), "D")
+        # Weekly/monthly bars are stamped at the start of their period, even if it lies before
+        # the range, so look back one whole period for it
+        pad = {"wk": 7, "mo": 31}.get(unit, 0)
+        days = np.arange(start_day - pad, np.datetime64(end.date(), "D") + 1)
+        days = days[np.is_busday(days)]
+        if unit == "wk": # First trading day of each (Monday-based) week
+            week = (days.astype(np.int64) + 3) // 7
+            days = days[np.r_[True, week[1:] != week[:-1]][:len(days)] & (week >= (start_day.astype(np.int64) + 3) // 7)]
+        elif unit == "mo": # First trading day of each month
+            month = days.astype("datetime64[M]")
+            days = days[np.r_[True, month[1:] != month[:-1]][:len(days)] & (month >= start_day.astype("datetime64[M]"))]
+        if count > 1 and unit in ("d", "wk", "mo"):
+            days = days[::-1][::count][::-1] # Anchored at the latest bar
+
+        day_starts = _day_starts(days)
+        if unit in ("m", "h"):
+            offsets = _session_offsets(count, unit)
+            timestamps = (day_starts[:, None] + DUMMY_SESSION_OPEN + offsets[None, :]).ravel()
+        else:
+            timestamps = day_starts
+        timestamps = timestamps[timestamps <= end_ts]
+
+        if len(timestamps) >= min_points:
+            break
+        # Not enough bars: reach further back, then keep only the latest min_points
+        span_days *= 2
+        start = end - timedelta(days=span_days)
+        extended = True
+    if extended:
+        timestamps = timestamps[-min_points:]
+    return timestamps
+
+def _ticker_rng(seed, ticker):
+    """Independent NumPy generator for (seed, ticker); crc32 keeps it stable across processes."""
+    import numpy as np
+    return np.random.default_rng([int(seed) & 0xFFFFFFFF, zlib.crc32(ticker.encode("utf-8"))])
+
+def _month_index(timestamp):
+    """Calendar month (in local time) of an epoch timestamp, counted from January 1970."""
+    day = datetime.fromtimestamp(int(timestamp))
+    return (day.year - 1970) * 12 + day.month - 1
+
+def _walk_grid(interval, first_month, last_month):
+    """Timestamps of every bar of the walk's grid in months first_month..last_month.
+
+    Returns (timestamps, bars per month, capacity), capacity being the most bars a month
+    can have. Intraday intervals walk on their own session grid; daily and coarser ones on
+    the grid of one unit, which "2d" or "3mo" bars are sampled from.
+    """
+    import numpy as np
+
+    count, unit = _parse_interval(interval)
+    months = np.arange(first_month, last_month + 2).astype("datetime64[M]").astype("datetime64[D]")
+    # A week earlier, so the first week and month starts are found as in dummy_timestamps()
+    days = np.arange(months[0] - 7, months[-1])
+    days = days[np.is_busday(days)]
+    if unit == "wk":
+        week = (days.astype(np.int64) + 3) // 7
+        days = days[np.r_[True, week[1:] != week[:-1]]]
+    elif unit == "mo":
+        month = days.astype("datetime64[M]")
+        days = days[np.r_[True, month[1:] != month[:-1]]]
+    days = days[days >= months[0]]
+
+    day_starts = _day_starts(days)
+    if unit in ("m", "h"):
+        offsets = _session_offsets(count, unit)
+        timestamps = (day_starts[:, None] + DUMMY_SESSION_OPEN + offsets[None, :]).ravel()
+        bars_per_day, days_capacity = len(offsets), 23
+    else:
+        timestamps = day_starts
+        bars_per_day, days_capacity = 1, {"d": 23, "wk": 5, "mo": 1}[unit]
+    day_months = (days.astype("datetime64[M]") - months[0].astype("datetime64[M]")).astype(np.int64)
+    sizes = np.bincount(day_months, minlength=len(months) - 1) * bars_per_day
+    return timestamps, sizes, days_capacity * bars_per_day
+
+def generate_dummy_bar_matrix(tickers, interval="1d", range_str="1y", seed=0, end=None, min_points=0, timestamps=None):
+    """Generates OHLCV bars for many tickers at once on a shared timestamp axis.
+
+    Returns (timestamps, {"open"|"high"|"low"|"close"|"volume": (N, T) array}). Each bar
+    only depends on (seed, ticker, interval, timestamp), so a ticker gets the same series
+    whether it is generated alone or with others, and overlapping ranges agree on the bars
+    they share. Memory is about 40 bytes per bar and ticker; use iter_dummy_bar_matrix()
+    for universes that don't fit.
+    """
+    import numpy as np
+
+    if timestamps is None:
+        timestamps = dummy_timestamps(interval, range_str, end=end, min_points=min_points)
+    n_tickers, n_bars = len(tickers), len(timestamps)
+    if n_bars == 0:
+        empty = np.empty((n_tickers, 0))
+        return timestamps, {"open": empty, "high": empty.copy(), "low": empty.copy(), "close": empty.copy(),
+                            "volume": np.empty((n_tickers, 0), dtype=np.int64)}
+    # Per-bar volatility and volume scale with the bar length (2% daily vol, ~1.2M shares a day)
+    bar_fraction = _bar_seconds(interval) / DUMMY_SESSION_SECONDS
+    sigma = _DUMMY_DAILY_SIGMA * np.sqrt(bar_fraction)
+
+    # The walk's grid covers every month the bars fall in (for weekly bars also the month
+    # before, where the week of a first bar in a month's first days may start)
+    _, unit = _parse_interval(interval)
+    walk_interval = interval if unit in ("m", "h") else f"1{unit}"
+    step_sigma = _DUMMY_DAILY_SIGMA * np.sqrt(_bar_seconds(walk_interval) / DUMMY_SESSION_SECONDS)
+    first_month = _month_index(timestamps[0]) - (unit == "wk")
+    last_month = _month_index(timestamps[-1])
+    if first_month < _DUMMY_EPOCH_MONTH or last_month >= _DUMMY_EPOCH_MONTH + _DUMMY_WALK_MONTHS:
+        raise ValueError("Dummy bars only cover 1970-2099")
+    grid, sizes, capacity = _walk_grid(walk_interval, first_month, last_month)
+    n_months = len(sizes)
+    in_month = np.arange(1, capacity + 1) <= sizes[:, None]
+    fraction = np.minimum(np.arange(1, capacity + 1) / sizes[:, None], 1.0)
+    # Position of each requested bar in the (month, slot) layout of the grid ("2d" or "3mo"
+    # bars are a subset of the one-unit grid)
+    positions = np.flatnonzero(in_month.ravel())[np.searchsorted(grid, timestamps, side="right") - 1]
+
+    log_close = np.empty((n_tickers, n_bars))
+    log_open = np.empty((n_tickers, n_bars))
+    gaps = np.empty((n_tickers, n_bars))
+    wicks = np.empty((n_tickers, n_bars))
+    volume_noise = np.empty((n_tickers, n_bars))
+    base_volume = np.empty(n_tickers)
+    month_sigma = _DUMMY_DAILY_SIGMA * np.sqrt(_DUMMY_DAYS_PER_MONTH)
+    # Each interval's noise lives 2^64 draws apart in the ticker's stream; within it every
+    # month has a fixed-size block, so a month's bars don't depend on the other months requested
+    noise_offset = ((zlib.crc32(walk_interval.encode("utf-8")) + 1) << 64) + (first_month - _DUMMY_EPOCH_MONTH) * 4 * capacity
+    for row, ticker in enumerate(tickers):
+        rng = _ticker_rng(seed, ticker)
+        start_price = rng.uniform(80.0, 200.0)
+        base_volume[row] = rng.uniform(0.5e6, 2.0e6)
+
+        # Monthly levels: log price at the start of each month, start_price in the anchor month.
+        # Uniform draws are several times cheaper than normal ones; centered and scaled to
+        # unit variance they make an equally good random walk for load testing.
+        walk = np.empty(_DUMMY_WALK_MONTHS + 1)
+        walk[0] = 0.0
+        rng.random(_DUMMY_WALK_MONTHS, out=walk[1:])
+        walk[1:] -= 0.5
+        np.cumsum(walk, out=walk)
+        walk *= np.sqrt(12.0) * month_sigma
+        levels = walk[first_month - _DUMMY_EPOCH_MONTH:last_month + 2 - _DUMMY_EPOCH_MONTH]
+        levels = levels - walk[_DUMMY_ANCHOR_MONTH - _DUMMY_EPOCH_MONTH] + np.log(start_price)
+
+        rng.bit_generator.advance(noise_offset)
+        noise = rng.random((n_months, 4, capacity))
+        noise -= 0.5
+        noise *= np.sqrt(12.0)
+        # Brownian bridge from one monthly level to the next over the month's bars
+        path = np.cumsum(np.where(in_month, noise[:, 0] * step_sigma, 0.0), axis=1)
+        closes = levels[:-1, None] + path + fraction * (levels[1:] - levels[:-1] - path[:, -1])[:, None]
+        opens = np.concatenate((levels[:-1, None], closes[:, :-1]), axis=1)
+        log_close[row] = closes.ravel()[positions]
+        log_open[row] = opens.ravel()[positions]
+        gaps[row] = noise[:, 1].ravel()[positions]
+        wicks[row] = noise[:, 2].ravel()[positions]
+        volume_noise[row] = noise[:, 3].ravel()[positions]
+
+    # Geometric random walk; the open gaps slightly away from the previous close
+    close = np.exp(log_close)
+    open_ = np.exp(log_open)
+    open_ *= 1 + 0.25 * sigma * gaps
+    high = np.maximum(open_, close)
+    high *= 1 + 0.3 * sigma * np.abs(wicks)
+    low = np.minimum(open_, close)
+    low *= 1 - 0.3 * sigma * np.abs(gaps)
+    volume = np.exp(0.3 * volume_noise) * (base_volume * bar_fraction)[:, None]
+
+    bars = {"open": open_, "high": high, "low": low, "close": close}
+    for prices in bars.values(): # Round to cents in place
+        prices *= 100
+        np.rint(prices, out=prices)
+        prices /= 100
+    bars["volume"] = volume.astype(np.int64)
+    return timestamps, bars
+
+def iter_dummy_bar_matrix(tickers, interval="1d", range_str="1y", seed=0, end=None, min_points=0, batch_size=64):
+    """Yields (ticker batch, timestamps, bars) like generate_dummy_bar_matrix, batch_size tickers at a time."""
+    tickers = list(tickers)
+    timestamps = dummy_timestamps(interval, range_str, end=end, min_points=min_points)
+    for offset in range(0, len(tickers), batch_size):
+        batch = tickers[offset:offset + batch_size]
+        _, bars = generate_dummy_bar_matrix(batch, interval, range_str, seed=seed, timestamps=timestamps)
+        yield batch, timestamps, bars
+
+def generate_dummy_bars(ticker, interval="1d", range_str="1y", seed=0, end=None, min_points=0):
+    """Generates one ticker's bars: {"timestamp", "open", "high", "low", "close", "volume": 1-D array}."""
+    timestamps, bars = generate_dummy_bar_matrix([ticker], interval, range_str, seed=seed, end=end, min_points=min_points)
+    bars = {field: values[0] for field, values in bars.items()}
+    bars["timestamp"] = timestamps
+    return bars
+
+def dummy_chart_payload(ticker, interval, range_str, bars, week52=None):
+    """Wraps generated bars (see generate_dummy_bars) in the `chart.result` response schema.
+
+    `week52` is the (high, low) to report; by default that of the bars themselves.
+    """
+    timestamps = bars["timestamp"].tolist()
+    opens = bars["open"].tolist()
+    highs = bars["high"].tolist()
+    lows = bars["low"].tolist()
+    closes = bars["close"].tolist()
+    volumes = bars["volume"].tolist()
+    # The bars are stamped in the generator's local time (see dummy_timestamps), so the
+    # meta reports that offset; resampling relies on it for day/week/month boundaries
+    # Meta times derive from the bars, never the clock, so equal inputs give equal payloads
+    last_time = timestamps[-1] if timestamps else int(time.mktime(dummy_reference_date().timetuple()))
+    local_time = time.localtime(last_time)
+    return {
+        "chart": {
+            "result": [
+                {
+                    "meta": {
+                        "currency": "USD",
+                        "symbol": ticker,
+                        "exchangeName": "NMS",
+                        "instrumentType": "EQUITY",
+                        "firstTradeDate": last_time - 365 * 5 * 86400,
+                        "regularMarketTime": last_time,
+                        "gmtoffset": local_time.tm_gmtoff,
+                        "timezone": local_time.tm_zone,
+                        "exchangeTimezoneName": "America/New_York",
+                        "regularMarketPrice": closes[-1] if closes else 150.0,
+                        "chartPreviousClose": opens[0] if opens else 148.0,
+                        "previousClose": opens[0] if opens else 148.0, # For current_price.prev_close
+                        "scale": 3,
+                        "priceHint": 2,
+                        "currentTradingPeriod": {
+                            "pre": {"timezone": "EDT", "start": 1678886400, "end": 1678886400, "gmtoffset": -14400},
+                            "regular": {"timezone": "EDT", "start": 1678886400, "end": 1678910400, "gmtoffset": -14400},
+                            "post": {"timezone": "EDT", "start": 1678910400, "end": 1678910400, "gmtoffset": -14400}
+                        },
+                        "tradingPeriods": [[{"timezone": "EDT", "start": 1678886400, "end": 1678910400, "gmtoffset": -14400}]],
+                        "dataGranularity": interval,
+                        "range": range_str,
+                        "validRanges": ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"],
+                        "fiftyTwoWeekHigh": week52[0] if week52 else max(highs) if highs else 180.0,
+                        "fiftyTwoWeekLow": week52[1] if week52 else min(lows) if lows else 120.0,
+                        "regularMarketDayHigh": highs[-1] if highs else 155.0,
+                        "regularMarketDayLow": lows[-1] if lows else 145.0,
+                        "regularMarketVolume": volumes[-1] if volumes else 1200000,
+                        "shortName": f"{ticker} Inc.",
+                        "longName": f"{ticker} Corporation Holdings Inc."
+
+                    },
+                    "timestamp": timestamps,
+                    "indicators": {
+                        "quote": [
+                            {
+                                "open": opens,
+                                "high": highs,
+                                "low": lows,
+                                "close": closes,
+                                "volume": volumes
+                            }
+                        ],
+                        "adjclose": [
+                            {"adjclose": closes} # Assuming adjclose is same as close for dummy
+                        ]
+                    }
+                }
+            ],
+            "error": None
+        }
+    }
+
+class ApiError(Exception):
+    """Raised when an API request fails."""
+    pass
+
+class TransientApiError(ApiError):
+    """A failure that is worth retrying (timeouts, throttling, 5xx-style errors)."""
+    pass
+
+
+class FakeTransport:
+    """In-process stand-in for the HTTP backend used by AsyncApiClient.
+
+    Serves the same dummy payloads as ApiClient with a configurable latency range
+    (seconds) and error rate, so tests and benchmarks run without any network.
+    """
+    def __init__(self, latency=(0.1, 0.6), error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed) # nosec B311
+        self._payloads = ApiClient(seed=seed)
+        self.connections_opened = 0
+        self.requests_served = 0
+
+    async def connect(self):
+        self.connections_opened += 1
+        return _FakeConnection(self)
+
+    def _build_payload(self, endpoint, params):
+        if endpoint == "chart":
+            return self._payloads._generate_dummy_stock_data(params["ticker"], params["interval"], params["range"])
+        if endpoint == "insights":
+            return self._payloads._generate_dummy_insights(params["ticker"])
+        if endpoint == "holders":
+            return self._payloads._generate_dummy_holders(params["ticker"])
+        raise ApiError(f"Unknown endpoint: {endpoint}")
+
+class _FakeConnection:
+    """A pooled 'connection' to FakeTransport; requests on it just sleep and build the payload."""
+    def __init__(self, transport):
+        self._transport = transport
+        self.requests = 0
+
+    async def request(self, endpoint, params):
+        transport = self._transport
+        low, high = transport.latency
+        await asyncio.sleep(transport._random.uniform(low, high)) # nosec B311
+        self.requests += 1
+        if transport._random.random() < transport.error_rate: # nosec B311
+            raise TransientApiError(f"Simulated failure for {endpoint} {params.get('ticker')}")
+        transport.requests_served += 1
+        return transport._build_payload(endpoint, params)
+
+    async def close(self):
+        pass
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` requests per second with bursts of up to `capacity`."""
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock: # Waiters are served in FIFO order
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+class _ConnectionPool:
+    """Bounded pool of reusable transport connections; also caps in-flight requests."""
+    def __init__(self, transport, max_size):
+        self._transport = transport
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._idle = []
+
+    async def acquire(self):
+        await self._semaphore.acquire()
+        try:
+            return self._idle.pop() if self._idle else await self._transport.connect()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, connection, discard=False):
+        if discard:
+            await connection.close()
+        else:
+            self._idle.append(connection)
+        self._semaphore.release()
+
+    async def close(self):
+        while self._idle:
+            await self._idle.pop().close()
+
+
+class AsyncApiClient:
+    """Asyncio counterpart of ApiClient for fetching many tickers from one event loop.
+
+    All requests share one connection pool (at most `max_concurrency` in flight), pass
+    through a token-bucket limiter (`rate_limit` requests/second, None disables it) and are
+    retried up to `max_retries` times on transient errors with full-jitter exponential backoff.
+    Counters for requests, retries and failures are kept in `stats` and, if given, also
+    reported to `metrics` (any object with an incr(name, value=1, **labels) method, such
+    as analysis-code/metrics.py's registry).
+    """
+    def __init__(self, transport=None, max_concurrency=64, rate_limit=None, burst=None,
+                 max_retries=3, backoff_base=0.1, backoff_max=5.0, timeout=30.0, metrics=None):
+        self.transport = transport if transport is not None else FakeTransport()
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._rate_limit = rate_limit
+        self._burst = burst
+        self._pool = None
+        self._limiter = None
+        self._random = random.Random() # nosec B311 Only used for backoff jitter
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+        self.metrics = metrics
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+
+    def _ensure_started(self):
+        # Created lazily so the asyncio primitives belong to the loop that uses them
+        if self._pool is None:
+            self._pool = _ConnectionPool(self.transport, self.max_concurrency)
+            if self._rate_limit:
+                self._limiter = TokenBucket(self._rate_limit, self._burst)
+
+    def _count(self, stat, endpoint):
+        self.stats[stat] += 1
+        if self.metrics is not None:
+            self.metrics.incr(f"api_{stat}_total", endpoint=endpoint)
+
+    async def _request(self, endpoint, params):
+        self._ensure_started()
+        attempt = 0
+        while True:
+            if self._limiter is not None:
+                await self._limiter.acquire()
+            connection = await self._pool.acquire()
+            discard = True # Don't hand a connection in an unknown state back to the pool
+            self._count("requests", endpoint)
+            try:
+                payload = await asyncio.wait_for(connection.request(endpoint, params), self.timeout)
+                discard = False
+                return payload
+            except (TransientApiError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    self._count("failures", endpoint)
+                    if isinstance(e, ApiError):
+                        raise
+                    raise TransientApiError(f"{endpoint} request for {params.get('ticker')} timed out") from e
+            except Exception:
+                self._count("failures", endpoint)
+                raise
+            finally:
+                await self._pool.release(connection, discard=discard)
+            self._count("retries", endpoint)
+            delay = self._random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt))) # nosec B311
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_stock_chart(self, ticker, interval="1d", range="1y"):
+        return await self._request("chart", {"ticker": ticker, "interval": interval, "range": range})
+
+    async def get_stock_insights(self, ticker):
+        return await self._request("insights", {"ticker": ticker})
+
+    async def get_stock_holders(self, ticker):
+        return await self._request("holders", {"ticker": ticker})
+
 # Helper for dummy data generation (not cryptographically secure, just for variability)
-_random_seed = int(time.time())
-def _random_float():
-    global _random_seed
-    _random_seed = (1103515245 * _random_seed + 12345) & 0x7FFFFFFF
-    return _random_seed / 0x7FFFFFFF
+def fixture_random(seed, *key):
+    """Returns an independent random.Random for (seed, *key).
+
+    Seeding with a string is stable across processes (unlike hash()), so the same key
+    yields the same numbers everywhere. Each caller gets its own generator, so there is
+    no shared state to race on.
+    """
+    return random.Random("|".join(str(part) for part in (seed,) + key)) # nosec B311
 
 # Example usage:
 if __name__ == "__main__":
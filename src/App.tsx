@@ -18,42 +18,60 @@ function App() {
   const [analysisData, setAnalysisData] = useState<any | null>(null); // Using 'any' for now
   const [isLoading, setIsLoading] = useState<boolean>(false);
   const [error, setError] = useState<string | null>(null);
+  const [chartPath, setChartPath] = useState<string>('');
+  const [chartDataPath, setChartDataPath] = useState<string>('');
+
+  // Reads an error message from a failed response, preferring the server's JSON "message"
+  const describeFailure = async (response: Response, ticker: string) => {
+    let errorText = `Failed to fetch analysis data: ${response.statusText}`;
+    if (response.status === 404) {
+        errorText = `Analysis data not found for ticker ${ticker}. Please ensure the ticker is correct and the analysis has been run.`;
+    }
+    try {
+        const errorData = await response.json();
+        errorText = errorData.message || errorText;
+    } catch (e) {
+        // Ignore if response is not JSON
+    }
+    return errorText;
+  };
 
   const handleTickerSubmit = async (ticker: string) => {
     setCurrentTicker(ticker);
     setIsLoading(true);
     setError(null);
     setAnalysisData(null); // Clear previous data
-
-    // **Conceptual Trigger for Python Script**
-    // In a real backend setup, this would be an API call that runs the script.
-    // For now, we'll simulate a delay and then try to fetch the files.
-    // This part will be more fleshed out in the data fetching logic step.
     console.log(`Frontend: Requesting analysis for ${ticker}`);
 
-    // Simulate backend processing time
-    await new Promise(resolve => setTimeout(resolve, 2000)); // Simulate 2s delay
-
     try {
-      // Paths are relative to the 'public' directory
+      // 1) On-demand analysis from the analysis server (proxied by the Vite dev server)
+      let serverError: string | null = null;
+      try {
+        const response = await fetch(`/analysis/${encodeURIComponent(ticker)}`);
+        const isJson = (response.headers.get('content-type') || '').includes('application/json');
+        if (response.ok && isJson) {
+          setAnalysisData(await response.json());
+          setChartPath(`/analysis/${encodeURIComponent(ticker)}/chart.png`);
+          setChartDataPath(`/analysis/${encodeURIComponent(ticker)}/chart.json`);
+          console.log(`Frontend: Analysis data for ${ticker} computed by the analysis server.`);
+          return;
+        }
+        if (isJson) {
+          serverError = await describeFailure(response, ticker);
+        }
+      } catch (e) {
+        // Server not running; fall back to the pre-generated files
+      }
+
+      // 2) Pre-generated files (paths are relative to the 'public' directory)
       const response = await fetch(`/analysis_outputs/${ticker}_analysis_result.json`);
       if (!response.ok) {
-        // Try to get a more specific error from the response if possible
-        let errorText = `Failed to fetch analysis data: ${response.statusText}`;
-        if (response.status === 404) {
-            errorText = `Analysis data not found for ticker ${ticker}. Please ensure the ticker is correct and the analysis has been run.`;
-        } else {
-            try {
-                const errorData = await response.json();
-                errorText = errorData.message || errorText;
-            } catch (e) {
-                // Ignore if response is not JSON
-            }
-        }
-        throw new Error(errorText);
+        throw new Error(serverError || await describeFailure(response, ticker));
       }
       const data = await response.json();
       setAnalysisData(data);
+      setChartPath(`/analysis_outputs/${ticker}_stock_chart.png`);
+      setChartDataPath(`/analysis_outputs/${ticker}_chart_data.json`);
       console.log(`Frontend: Analysis data for ${ticker} loaded.`);
     } catch (err: any) {
       console.error("Frontend: Error fetching analysis data:", err);
@@ -94,7 +112,8 @@ function App() {
           <TechnicalAnalysis 
             analysisData={analysisData.technical_analysis} 
             stockSymbol={currentTicker} 
-            chartPath={`/analysis_outputs/${currentTicker}_stock_chart.png`} 
+            chartPath={chartPath} 
+            chartDataPath={chartDataPath}
           />
           <InvestmentRecommendation analysisData={analysisData.investment_recommendation} stockSymbol={currentTicker} />
           <KeyDevelopments analysisData={analysisData.key_developments} stockSymbol={currentTicker} />
@@ -1,10 +1,99 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
+import { Bar, CartesianGrid, ComposedChart, Legend, Line, ResponsiveContainer, Tooltip, XAxis, YAxis } from 'recharts';
+import { ChartPayload, ChartRow, fetchChartData } from '@/lib/chartData';
 
-const TechnicalAnalysis: React.FC = () => {
+interface TechnicalAnalysisProps {
+  analysisData?: any;
+  stockSymbol?: string;
+  chartPath?: string; // server-rendered PNG, shown when no chart data is available
+  chartDataPath?: string; // compact chart payload drawn in the browser
+}
+
+const formatDate = (time: number) => new Date(time).toISOString().slice(0, 10);
+const formatVolume = (value: number) =>
+  value >= 1e9 ? `${(value / 1e9).toFixed(1)}B` : value >= 1e6 ? `${(value / 1e6).toFixed(1)}M` : value >= 1e3 ? `${(value / 1e3).toFixed(0)}K` : `${value}`;
+
+const PriceChart: React.FC<{ stockSymbol?: string; chartPath?: string; chartDataPath?: string }> = ({ stockSymbol, chartPath, chartDataPath }) => {
+  const [chart, setChart] = useState<{ payload: ChartPayload; rows: ChartRow[] } | null>(null);
+  const [failed, setFailed] = useState<boolean>(false);
+  const [imageFailed, setImageFailed] = useState<boolean>(false);
+
+  useEffect(() => {
+    let cancelled = false;
+    setChart(null);
+    setFailed(false);
+    setImageFailed(false);
+    if (!chartDataPath) {
+      setFailed(true);
+      return;
+    }
+    fetchChartData(chartDataPath)
+      .then((result) => { if (!cancelled) setChart(result); })
+      .catch((err) => {
+        console.warn(`Frontend: ${err.message}; falling back to the chart image.`);
+        if (!cancelled) setFailed(true);
+      });
+    return () => { cancelled = true; };
+  }, [chartDataPath]);
+
+  if (failed) {
+    if (!chartPath || imageFailed) {
+      return <p className="text-gray-500">차트 데이터가 없습니다.</p>;
+    }
+    return <img src={chartPath} alt={`${stockSymbol} 주가 차트`} className="w-full h-auto" onError={() => setImageFailed(true)} />;
+  }
+  if (!chart) {
+    return <p className="text-gray-500">차트를 불러오는 중...</p>;
+  }
+
+  const { payload, rows } = chart;
+  const xAxis = { dataKey: 'time', type: 'number' as const, scale: 'time' as const, domain: ['dataMin', 'dataMax'], tickFormatter: formatDate, minTickGap: 40 };
+  return (
+    <div>
+      <ResponsiveContainer width="100%" height={360}>
+        <ComposedChart data={rows} syncId="price-volume" margin={{ top: 8, right: 16, bottom: 0, left: 8 }}>
+          <CartesianGrid strokeDasharray="3 3" />
+          <XAxis {...xAxis} />
+          <YAxis domain={['auto', 'auto']} width={64} />
+          <Tooltip labelFormatter={(time) => formatDate(Number(time))} formatter={(value) => Number(value).toFixed(2)} />
+          <Legend />
+          <Line dataKey="close" name={`${payload.ticker} 종가`} stroke="#2563eb" dot={false} strokeWidth={1.5} isAnimationActive={false} />
+          <Line dataKey="MA20" name="MA20" stroke="#f97316" strokeDasharray="5 3" dot={false} isAnimationActive={false} />
+          <Line dataKey="MA50" name="MA50" stroke="#16a34a" strokeDasharray="5 3" dot={false} isAnimationActive={false} />
+          <Line dataKey="MA200" name="MA200" stroke="#dc2626" strokeDasharray="5 3" dot={false} isAnimationActive={false} />
+        </ComposedChart>
+      </ResponsiveContainer>
+      <ResponsiveContainer width="100%" height={140}>
+        <ComposedChart data={rows} syncId="price-volume" margin={{ top: 8, right: 16, bottom: 0, left: 8 }}>
+          <CartesianGrid strokeDasharray="3 3" />
+          <XAxis {...xAxis} />
+          <YAxis width={64} tickFormatter={formatVolume} />
+          <Tooltip labelFormatter={(time) => formatDate(Number(time))} formatter={(value) => formatVolume(Number(value))} />
+          <Bar dataKey="volume" name="거래량" fill="#9ca3af" isAnimationActive={false} />
+          <Line dataKey="VolumeMA20" name="거래량 MA20" stroke="#9333ea" strokeDasharray="5 3" dot={false} isAnimationActive={false} />
+        </ComposedChart>
+      </ResponsiveContainer>
+      {payload.downsampling && (
+        <p className="mt-2 text-xs text-gray-500">
+          {payload.source_points.toLocaleString()}개 데이터 중 {payload.points.toLocaleString()}개로 축약 ({payload.downsampling.toUpperCase()})
+        </p>
+      )}
+    </div>
+  );
+};
+
+const TechnicalAnalysis: React.FC<TechnicalAnalysisProps> = ({ stockSymbol, chartPath, chartDataPath }) => {
   return (
     <section className="py-8 px-4 sm:px-6 lg:px-8 bg-white">
       <div className="max-w-7xl mx-auto">
         <h2 className="text-3xl font-bold text-gray-900 mb-6">3. 기술적 분석</h2>
+
+        <div className="mb-8">
+          <h3 className="text-2xl font-semibold text-gray-800 mb-4">주가 및 거래량 차트</h3>
+          <div className="bg-white rounded-lg p-6 shadow-sm border border-gray-200">
+            <PriceChart stockSymbol={stockSymbol} chartPath={chartPath} chartDataPath={chartDataPath} />
+          </div>
+        </div>
         
         <div className="mb-8">
           <h3 className="text-2xl font-semibold text-gray-800 mb-4">3.1 이동평균선 분석</h3>
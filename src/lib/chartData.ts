@@ -0,0 +1,75 @@
+// Decoder for the compact chart payload written by analysis-code/chart_data.py
+// ({ticker}_chart_data.json, or GET /analysis/{ticker}/chart.json on the analysis server).
+
+export interface ChartPayload {
+  version: number;
+  ticker: string;
+  company_name?: string | null;
+  currency?: string | null;
+  points: number;
+  source_points: number;
+  downsampling: string | null;
+  time: string; // base64 uint32 epoch seconds
+  columns: Record<string, string>; // base64 float32 per series
+}
+
+export interface ChartRow {
+  time: number; // epoch milliseconds
+  close: number | null;
+  MA20: number | null;
+  MA50: number | null;
+  MA200: number | null;
+  volume: number | null;
+  VolumeMA20: number | null;
+}
+
+const SERIES = ['close', 'MA20', 'MA50', 'MA200', 'volume', 'VolumeMA20'] as const;
+
+const decodeBase64 = (encoded: string): ArrayBuffer => {
+  const binary = atob(encoded);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes.buffer;
+};
+
+// Typed arrays use the platform byte order; the payload is little-endian, like every browser platform
+export const decodeChartPayload = (payload: ChartPayload): ChartRow[] => {
+  const time = new Uint32Array(decodeBase64(payload.time));
+  const columns: Partial<Record<(typeof SERIES)[number], Float32Array>> = {};
+  for (const name of SERIES) {
+    if (payload.columns[name]) {
+      columns[name] = new Float32Array(decodeBase64(payload.columns[name]));
+    }
+  }
+  // NaN (e.g. before a moving average has enough bars) becomes null so the chart leaves a gap
+  const valueAt = (name: (typeof SERIES)[number], i: number) => {
+    const value = columns[name]?.[i];
+    return value === undefined || Number.isNaN(value) ? null : value;
+  };
+
+  const rows: ChartRow[] = new Array(time.length);
+  for (let i = 0; i < time.length; i++) {
+    rows[i] = {
+      time: time[i] * 1000,
+      close: valueAt('close', i),
+      MA20: valueAt('MA20', i),
+      MA50: valueAt('MA50', i),
+      MA200: valueAt('MA200', i),
+      volume: valueAt('volume', i),
+      VolumeMA20: valueAt('VolumeMA20', i),
+    };
+  }
+  return rows;
+};
+
+export const fetchChartData = async (path: string): Promise<{ payload: ChartPayload; rows: ChartRow[] }> => {
+  const response = await fetch(path);
+  const isJson = (response.headers.get('content-type') || '').includes('application/json');
+  if (!response.ok || !isJson) {
+    throw new Error(`Chart data not available: ${response.status} ${response.statusText}`);
+  }
+  const payload: ChartPayload = await response.json();
+  return { payload, rows: decodeChartPayload(payload) };
+};
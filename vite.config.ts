@@ -9,5 +9,14 @@ export default defineConfig({
       "@": path.resolve(__dirname, "./src"),
     },
   },
+  server: {
+    proxy: {
+      // On-demand analysis from analysis-code/analysis_server.py (not /analysis_outputs/)
+      "^/analysis/": {
+        target: process.env.ANALYSIS_SERVER_URL || "http://127.0.0.1:8765",
+        changeOrigin: true,
+      },
+    },
+  },
 })
 